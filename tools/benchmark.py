@@ -0,0 +1,615 @@
+#!/usr/bin/env python3
+"""
+SysMLcheap Validator Benchmark
+Times loading, indexing, validation and diagram generation on synthetic
+models (see sysmlcheap.synthetic) of increasing size.
+
+Usage: benchmark.py [SIZE ...]                 (default: 1000 10000 100000)
+       benchmark.py --suite [SIZE ...] [--json OUT] [--compare BASELINE]
+       benchmark.py --generate DIR [SIZE]      (write a synthetic model, default: 10000)
+       benchmark.py --incremental [SIZE]       (default: 50000)
+       benchmark.py --load [SIZE]              (default: 100000, split across 200 files)
+       benchmark.py --memory [SIZE]            (default: 100000)
+       benchmark.py --rules [SIZE]             (default: 100000)
+       benchmark.py --graphs [SIZE ...]        (default: 10000 100000 nodes deep)
+       benchmark.py --refs [SIZE ...]          (default: 10000 100000 200000, ~1M edges)
+       benchmark.py --trace [SIZE ...]         (default: 5000 50000 requirements)
+       benchmark.py --interfaces [SIZE ...]    (default: 10000 100000 300000 connectors)
+       benchmark.py --behavior [SIZE ...]      (default: 1000 10000 100000 steps per behavior)
+       benchmark.py --regenerate [SIZE]        (default: 100000)
+       benchmark.py --diagram-memory [BLOCKS]  (default: 100000)
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import yaml
+
+import validate
+from generate_diagrams import (
+    DIAGRAMS, generate_package_diagram, manifest_path, stream, write_diagram,
+)
+from sysmlcheap import coverage
+from sysmlcheap.model import build_index, iter_unit, load_model
+from sysmlcheap.store import load_compact
+from sysmlcheap.synthetic import SHAPE, synthetic_model, write_model
+
+
+# ── Benchmark ────────────────────────────────────────────────────────────────
+
+def run(n):
+    model = synthetic_model(n)
+    total = sum(len(v) for v in model.values())
+
+    start = time.perf_counter()
+    index = build_index(model)
+    t_index = time.perf_counter() - start
+
+    start = time.perf_counter()
+    issues = validate.validate_model(model, index)
+    t_validate = time.perf_counter() - start
+
+    return total, t_index, t_validate, len(issues)
+
+
+def issue_keys(issues):
+    return [(i.rule, i.element_id, i.severity, i.message) for i in issues]
+
+
+def run_incremental(n, n_files=100):
+    """Edit single elements on disk and compare incremental vs cold re-validation."""
+    model = synthetic_model(n)
+    with tempfile.TemporaryDirectory() as model_dir:
+        files = write_model(model, model_dir, n_files)
+        incremental = validate.IncrementalValidator(model_dir)
+        start = time.perf_counter()
+        incremental.full_run()
+        print(f"   cold start: {len(incremental.units)} elements in {time.perf_counter() - start:.2f} s\n")
+
+        # Each edit rewrites one file; the second drops an include chain head's
+        # includeRefs, so the included use cases lose their incoming include,
+        # the next two close and reopen an ownership cycle at the root package,
+        # the next two break and mend the connector (in another file) that
+        # targets a block's conjugated port, and the last unguards a choice.
+        edits = [
+            ("drop a requirement trace", "requirements", 0, lambda e: e.pop("traceRefs")),
+            ("drop an include chain", "useCases", 0, lambda e: e.pop("includeRefs")),
+            ("rename a use case", "useCases", 0, lambda e: e.update(name="")),
+            ("close an ownership cycle", "packages", 0, lambda e: e.update(ownerRef="pkg_1")),
+            ("reopen it", "packages", 0, lambda e: e.pop("ownerRef")),
+            ("unconjugate a port", "blocks", 1, lambda e: e["ports"][1].update(conjugated=False)),
+            ("conjugate it again", "blocks", 1, lambda e: e["ports"][1].update(conjugated=True)),
+            ("drop a choice guard", "stateMachines", 0, lambda e: e["transitions"][-1].pop("guard")),
+        ]
+        print(f"   {'edit':<26} {'re-checked':>10} {'update ms':>10} {'equivalent':>11}")
+        for label, key, position, edit in edits:
+            target = files[0][key][position]
+            edit(target)
+            path = os.path.join(model_dir, "part_0000.yaml")
+            with open(path, "w") as f:
+                yaml.dump(files[0], f, Dumper=getattr(yaml, "CSafeDumper", yaml.SafeDumper),
+                          sort_keys=False)
+
+            start = time.perf_counter()
+            rechecked = incremental.update(incremental.scan())
+            issues = incremental.issues()
+            elapsed = (time.perf_counter() - start) * 1000
+
+            cold_model = load_model(model_dir)
+            cold = validate.validate_model(cold_model, build_index(cold_model))
+            same = issue_keys(issues) == issue_keys(cold)
+            print(f"   {label:<26} {rechecked:>10} {elapsed:>10.1f} {'yes' if same else 'NO':>11}")
+            if not same:
+                return 1
+            files[0][key][position] = target
+    return 0
+
+
+def run_load(n, n_files=200, worker_counts=(1, 2, 4, 8)):
+    """Time uncached parsing of a many-file model with 1/2/4/8 worker processes."""
+    model = synthetic_model(n)
+    with tempfile.TemporaryDirectory() as model_dir:
+        write_model(model, model_dir, n_files)
+        print(f"   {n} elements across {n_files} files, {os.cpu_count()} CPUs\n")
+        print(f"   {'jobs':>5} {'load s':>8} {'speedup':>8} {'same result':>12}")
+        baseline = None
+        for jobs in worker_counts:
+            start = time.perf_counter()
+            loaded = load_model(model_dir, jobs=jobs, use_cache=False)
+            elapsed = time.perf_counter() - start
+            if baseline is None:
+                baseline, reference = elapsed, loaded
+            same = loaded == reference
+            print(f"   {jobs:>5} {elapsed:>8.2f} {baseline / elapsed:>7.2f}x {'yes' if same else 'NO':>12}")
+            if not same:
+                return 1
+    return 0
+
+
+def run_memory(n, n_files=100):
+    """Compare resident memory of the dict model and the compact store."""
+    model = synthetic_model(n)
+    with tempfile.TemporaryDirectory() as model_dir:
+        write_model(model, model_dir, n_files)
+        del model
+        gc.collect()
+
+        def dict_model():
+            loaded = load_model(model_dir, use_cache=False)
+            return loaded, build_index(loaded)
+
+        def compact_model():
+            return load_compact(model_dir, use_cache=False)
+
+        print(f"   {'store':<8} {'resident MB':>12} {'peak MB':>8} {'validate s':>11} {'issues':>7}")
+        results = {}
+        for label, loader in (("dict", dict_model), ("compact", compact_model)):
+            tracemalloc.start()
+            loaded, index = loader()
+            resident, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            start = time.perf_counter()
+            issues = validate.validate_model(loaded, index)
+            elapsed = time.perf_counter() - start
+            results[label] = issue_keys(issues)
+            print(f"   {label:<8} {resident / 2**20:>12.1f} {peak / 2**20:>8.1f} {elapsed:>11.2f} {len(issues):>7}")
+            del loaded, index
+            gc.collect()
+        same = results["dict"] == results["compact"]
+        print(f"\n   Same issues from both stores: {'yes' if same else 'NO'}")
+    return 0 if same else 1
+
+
+def run_rules(n, worker_counts=(1, 2, 4, 8)):
+    """Time the rule scheduler with different worker counts on one loaded model."""
+    model = synthetic_model(n)
+    for req in model["requirements"][::97]:
+        # seed some REQTRACE issues so ordering is exercised
+        req.pop("traceRefs")
+        req.pop("deriveRefs", None)
+        req.pop("refineRefs", None)
+    index = build_index(model)
+    print(f"   {'workers':>8} {'validate s':>11} {'speedup':>8} {'issues':>7}  same")
+    baseline = reference = None
+    for jobs in worker_counts:
+        start = time.perf_counter()
+        issues = validate.validate_model(model, index, jobs)
+        elapsed = time.perf_counter() - start
+        keys = [(i.rule, i.element_id, i.message) for i in issues]
+        if baseline is None:
+            baseline, reference = elapsed, keys
+        same = keys == reference
+        print(f"   {jobs:>8} {elapsed:>11.3f} {baseline / elapsed:>7.2f}x {len(issues):>7}  "
+              f"{'yes' if same else 'NO'}")
+        if not same:
+            return 1
+    print(f"\n   {os.cpu_count()} CPUs available; issue order must match the 1-worker run exactly.")
+    return 0
+
+
+def run_refs(sizes):
+    """Time the bulk reference-integrity pass; ns/edge should stay flat as edges grow."""
+    print(f"   {'elements':>10} {'edges':>10} {'refs s':>8} {'ns/edge':>8} {'issues':>7}")
+    for n in sizes:
+        model = synthetic_model(n)
+        for req in model["requirements"][::101]:
+            req["traceRefs"] = req["traceRefs"] + ["missing_source", "blk_1"]  # seed misses
+        index = build_index(model)
+        issues = []
+        gc.collect()
+        start = time.perf_counter()
+        edges = validate.validate_references(model, index, issues)
+        elapsed = time.perf_counter() - start
+        print(f"   {len(index):>10} {edges:>10} {elapsed:>8.3f} {elapsed / edges * 1e9:>8.0f} {len(issues):>7}")
+    return 0
+
+
+def run_graphs(sizes):
+    """Time the graph rules and the package renderer on chains deeper than the
+    recursion limit: a package spine `n` deep, and an n-block generalization
+    chain closed into one cycle."""
+    print(f"   Recursion limit: {sys.getrecursionlimit()}\n")
+    print(f"   {'nodes':>8} {'graph rules s':>14} {'cycle issues':>13} {'package diagram s':>18} {'lines':>8}")
+    for n in sizes:
+        model = synthetic_model(n, depth=n, n_blocks=n)
+        blocks = model["blocks"]
+        for blk, parent in zip(blocks, blocks[1:] + blocks[:1]):
+            blk["generalizationRefs"] = [parent["id"]]
+        index = build_index(model)
+        issues = []
+        start = time.perf_counter()
+        validate.validate_graphs(model, index, issues)
+        t_rules = time.perf_counter() - start
+        cycle_issues = sum(issue.rule == "GENERALIZATIONCYCLE" for issue in issues)
+        start = time.perf_counter()
+        lines = sum(1 for _ in generate_package_diagram(model, index))
+        t_packages = time.perf_counter() - start
+        print(f"   {n:>8} {t_rules:>14.3f} {cycle_issues:>13} {t_packages:>18.3f} {lines:>8}")
+        if cycle_issues != len(blocks):
+            return 1
+    return 0
+
+
+def run_trace(sizes):
+    """Time the traceability matrix: gather + closure cold, the cached reload,
+    and the coverage pass. Every other requirement is verified by its own test
+    case instead of satisfied by a block, so there are about as many columns
+    as rows."""
+    print(f"   {'reqs':>8} {'columns':>8} {'cold s':>8} {'cached s':>9} {'coverage s':>11} {'verified':>9}")
+    for n in sizes:
+        model = synthetic_model(n * 10 // 3)
+        tests = []
+        for i, req in enumerate(model["requirements"]):
+            if i % 2:
+                del req["satisfiedByRefs"]
+                tests.append({"id": f"tc_{i}", "name": f"Test {i}", "verifiesRefs": [req["id"]]})
+        model["testCases"] = tests
+        index = build_index(model)
+        start = time.perf_counter()
+        matrix = coverage.build_matrix(model, use_cache=False)
+        t_cold = time.perf_counter() - start
+        coverage.build_matrix(model)  # writes the cache
+        start = time.perf_counter()
+        coverage.build_matrix(model)
+        t_cached = time.perf_counter() - start
+        start = time.perf_counter()
+        totals = coverage.summarize(coverage.coverage(matrix, model, index))
+        t_coverage = time.perf_counter() - start
+        print(f"   {len(matrix.rows):>8} {len(matrix.cols):>8} {t_cold:>8.3f} {t_cached:>9.3f}"
+              f" {t_coverage:>11.3f} {totals['verified']:>9}")
+    return 0
+
+
+def run_interfaces(sizes):
+    """Time the connector and item flow rules; µs/connector should stay flat.
+    Every 97th connector's target port loses its conjugation; only those
+    connectors and their flows may be flagged (not all of them are: where the
+    sent signal specializes one the plain port still receives, it fits)."""
+    print(f"   {'connectors':>10} {'interfaces s':>13} {'µs/conn':>8} {'issues':>7}")
+    for n in sizes:
+        model = synthetic_model(n // 5, n_blocks=n * 8 // 7 + 2)
+        connectors = [conn for blk in model["blocks"] for conn in blk.get("connectors", ())]
+        index = build_index(model)
+        broken = connectors[::97]
+        for conn in broken:
+            index[conn["targetPortRef"]]["conjugated"] = False
+        issues = []
+        gc.collect()
+        start = time.perf_counter()
+        validate.validate_interfaces(model, index, issues)
+        elapsed = time.perf_counter() - start
+        print(f"   {len(connectors):>10} {elapsed:>13.3f} {elapsed / len(connectors) * 1e6:>8.2f} {len(issues):>7}")
+        flagged = {issue.element_id for issue in issues}
+        expected = {conn["id"] for conn in broken} | {conn["itemFlowRefs"][0] for conn in broken}
+        if not issues or not flagged <= expected:
+            return 1
+    return 0
+
+
+def run_behavior(sizes):
+    """Time the activity and state machine rules on a few behaviors of SIZE
+    steps each; µs/element should stay flat however long the behaviors get.
+    The generated behaviors are clean, so any issue is a regression."""
+    print(f"   {'steps':>8} {'elements':>9} {'activities s':>13} {'machines s':>11} {'µs/elem':>8} {'issues':>7}")
+    for n in sizes:
+        model = synthetic_model(1000, steps=n)
+        index = build_index(model)
+        elements = sum(1 for key in ("activities", "stateMachines")
+                       for behavior in model[key] for _ in iter_unit(behavior))
+        issues = []
+        gc.collect()
+        start = time.perf_counter()
+        validate.validate_activities(model, index, issues)
+        t_activities = time.perf_counter() - start
+        start = time.perf_counter()
+        validate.validate_state_machines(model, index, issues)
+        validate.validate_graphs(model, index, issues, ("STATEREACHABILITY",))
+        t_machines = time.perf_counter() - start
+        per_elem = (t_activities + t_machines) / elements * 1e6
+        print(f"   {n:>8} {elements:>9} {t_activities:>13.3f} {t_machines:>11.3f} {per_elem:>8.2f} {len(issues):>7}")
+        if issues:
+            return 1
+    return 0
+
+
+# ── Scaling Suite ────────────────────────────────────────────────────────────
+# Times every stage of a build on synthetic models, one row per stage and one
+# column per size, and stores the numbers as JSON. Comparing against an
+# earlier JSON flags stages that got slower by more than the threshold.
+
+SUITE_SIZES = [1000, 10000, 100000]
+NOISE_FLOOR = 0.005  # seconds; stages faster than this are never called regressions
+
+
+def best_of(repeat, fn):
+    """(result, fastest wall time) over `repeat` calls."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def suite_row(n, shape, repeat):
+    """Generate, write and time one model size; returns its result record."""
+    model = synthetic_model(n, **shape)
+    n_files = max(1, min(200, n // 500))
+    with tempfile.TemporaryDirectory() as model_dir:
+        write_model(model, model_dir, n_files)
+        del model
+        gc.collect()
+        seconds = {}
+        loaded, seconds["load"] = best_of(repeat, lambda: load_model(model_dir, use_cache=False))
+    index, seconds["index"] = best_of(repeat, lambda: build_index(loaded))
+    issues, seconds["validate"] = best_of(repeat, lambda: validate.validate_model(loaded, index))
+    with open(os.devnull, "w") as sink:
+        for filename, generator, args, _ in DIAGRAMS:
+            _, seconds[filename] = best_of(
+                repeat, lambda: stream(generator(loaded, index, *args), sink))
+    return {
+        "elements": sum(len(elems) for elems in loaded.values()),
+        "indexed": len(index),
+        "files": n_files,
+        "issues": len(issues),
+        "seconds": seconds,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True, cwd=os.path.dirname(__file__)).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_matrix(results, baseline=None):
+    """Stages down, sizes across; with a baseline, each cell also shows new/old."""
+    sizes = [r["elements"] for r in results]
+    print(f"   {'stage':<32}" + "".join(f"{n:>18}" for n in sizes))
+    for stage in results[0]["seconds"]:
+        cells = []
+        for r in results:
+            cell = f"{r['seconds'][stage] * 1000:.1f} ms"
+            old = (baseline or {}).get(r["elements"], {}).get(stage)
+            if old:
+                cell += f" {r['seconds'][stage] / old:>4.2f}x"
+            cells.append(f"{cell:>18}")
+        print(f"   {stage:<32}" + "".join(cells))
+    print(f"   {'indexed elements':<32}" + "".join(f"{r['indexed']:>18}" for r in results))
+    print(f"   {'issues':<32}" + "".join(f"{r['issues']:>18}" for r in results))
+
+
+def regressions(results, baseline, threshold):
+    """(elements, stage, old s, new s) for every stage slower than threshold × baseline."""
+    found = []
+    for r in results:
+        old_seconds = baseline.get(r["elements"], {})
+        for stage, new in r["seconds"].items():
+            old = old_seconds.get(stage)
+            if old and max(old, new) >= NOISE_FLOOR and new > old * threshold:
+                found.append((r["elements"], stage, old, new))
+    return found
+
+
+def run_suite(sizes, shape, repeat=1, json_path=None, compare_path=None, threshold=1.25):
+    results = []
+    for n in sizes:
+        print(f"   … {n} elements", flush=True)
+        results.append(suite_row(n, shape, repeat))
+    print()
+
+    baseline = None
+    if compare_path:
+        with open(compare_path) as f:
+            baseline = {r["elements"]: r["seconds"] for r in json.load(f)["results"]}
+    print_matrix(results, baseline)
+
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump({
+                "meta": {
+                    "commit": git_commit(),
+                    "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "cpus": os.cpu_count(),
+                    "repeat": repeat,
+                    "shape": shape,
+                },
+                "results": results,
+            }, f, indent=2)
+        print(f"\n   Results written to {json_path}")
+
+    exit_code = 0
+    if any(r["issues"] for r in results):
+        print("\n   ❌ Synthetic models should validate clean; the validator now reports issues.")
+        exit_code = 1
+    if baseline is not None:
+        slower = regressions(results, baseline, threshold)
+        for n, stage, old, new in slower:
+            print(f"   ⚠️  {stage} at {n} elements: {old * 1000:.1f} → {new * 1000:.1f} ms")
+        if slower:
+            exit_code = 1
+        else:
+            print(f"\n   ✅ No stage slower than {threshold:.2f}x the baseline.")
+    return exit_code
+
+
+def run_regenerate(n, n_files=100):
+    """Time generate_diagrams.py --incremental: cold, no-op, and after one edit."""
+    model = synthetic_model(n)
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "generate_diagrams.py")
+    with tempfile.TemporaryDirectory() as model_dir, tempfile.TemporaryDirectory() as output_dir:
+        files = write_model(model, model_dir, n_files)
+
+        def regenerate():
+            start = time.perf_counter()
+            out = subprocess.run([sys.executable, script, model_dir, output_dir, "--incremental"],
+                                 capture_output=True, text=True, check=True).stdout
+            elapsed = time.perf_counter() - start
+            mtimes = {f: os.stat(os.path.join(output_dir, f)).st_mtime_ns
+                      for f in os.listdir(output_dir)}
+            return elapsed, out.count("✅"), mtimes
+
+        def rewrite_first_file(edit):
+            edit(files[0])
+            with open(os.path.join(model_dir, "part_0000.yaml"), "w") as f:
+                yaml.dump(files[0], f, Dumper=getattr(yaml, "CSafeDumper", yaml.SafeDumper),
+                          sort_keys=False)
+
+        print(f"   {'run':<34} {'wall s':>8} {'written':>8}")
+        steps = [
+            ("cold (empty cache)", None),
+            ("no-op", None),
+            ("touch a file, same content", lambda data: None),
+            ("edit one requirement's text", lambda data: data["requirements"][0].update(text="Edited.")),
+        ]
+        mtimes = None
+        for label, edit in steps:
+            if edit:
+                rewrite_first_file(edit)
+            elapsed, written, new_mtimes = regenerate()
+            print(f"   {label:<34} {elapsed:>8.2f} {written:>8}")
+            if mtimes and label != "edit one requirement's text" and new_mtimes != mtimes:
+                print("\n   ❌ Outputs were rewritten although nothing they depend on changed.")
+                return 1
+            mtimes = new_mtimes
+        os.remove(manifest_path(output_dir))
+    return 0
+
+
+def run_diagram_memory(n_blocks, shape):
+    """Peak memory of each generator: whole diagram as one string vs streamed to disk."""
+    model = synthetic_model(n_blocks // 4, n_blocks=n_blocks, **shape)
+    index = build_index(model)
+    print(f"   {n_blocks} blocks, {len(index)} indexed elements\n")
+    print(f"   {'diagram':<32} {'MB':>8} {'joined peak MB':>15} {'streamed peak MB':>17}")
+    with tempfile.TemporaryDirectory() as output_dir:
+        for filename, generator, args, _ in DIAGRAMS:
+            gc.collect()
+            tracemalloc.start()
+            text = "\n".join(generator(model, index, *args))
+            joined_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            size = len(text.encode())
+            del text
+
+            filepath = os.path.join(output_dir, filename)
+            gc.collect()
+            tracemalloc.start()
+            write_diagram(generator(model, index, *args), filepath)
+            streamed_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            if os.path.getsize(filepath) != size:
+                print(f"\n   ❌ {filename}: streamed output differs from the joined string.")
+                return 1
+            print(f"   {filename:<32} {size / 2**20:>8.1f} {joined_peak / 2**20:>15.1f} "
+                  f"{streamed_peak / 2**20:>17.1f}")
+    return 0
+
+
+def run_generate(model_dir, n, shape):
+    """Write a synthetic model to disk for manual runs of the tools."""
+    os.makedirs(model_dir, exist_ok=True)
+    model = synthetic_model(n, **shape)
+    n_files = max(1, min(200, n // 500))
+    write_model(model, model_dir, n_files)
+    print(f"   Wrote {sum(len(v) for v in model.values())} elements across {n_files} files "
+          f"to {model_dir}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the SysMLcheap validator.")
+    parser.add_argument("sizes", nargs="*", type=int)
+    parser.add_argument("--incremental", action="store_true",
+                        help="time incremental re-validation after single-element edits")
+    parser.add_argument("--load", action="store_true",
+                        help="time parallel model loading with 1/2/4/8 worker processes")
+    parser.add_argument("--memory", action="store_true",
+                        help="compare memory of the dict model and the compact store")
+    parser.add_argument("--rules", action="store_true",
+                        help="time rule families across 1/2/4/8 worker processes")
+    parser.add_argument("--refs", action="store_true",
+                        help="time the bulk reference-integrity pass per edge")
+    parser.add_argument("--graphs", action="store_true",
+                        help="time cycle/reachability rules and the package renderer on 100k-deep graphs")
+    parser.add_argument("--trace", action="store_true",
+                        help="time the traceability closure, cold and cached (SIZE = requirements)")
+    parser.add_argument("--interfaces", action="store_true",
+                        help="time connector/item flow compatibility (SIZE = connectors)")
+    parser.add_argument("--behavior", action="store_true",
+                        help="time activity and state machine analysis (SIZE = steps per behavior)")
+    parser.add_argument("--regenerate", action="store_true",
+                        help="time incremental diagram regeneration: cold, no-op and after an edit")
+    parser.add_argument("--diagram-memory", action="store_true",
+                        help="peak memory per diagram generator, joined vs streamed (SIZE = blocks)")
+    parser.add_argument("--suite", action="store_true",
+                        help="time load, index, validate and every diagram generator per size")
+    parser.add_argument("--json", metavar="FILE", help="write --suite results as JSON")
+    parser.add_argument("--compare", metavar="FILE",
+                        help="compare --suite results against an earlier --json file")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="slowdown ratio --compare reports as a regression (default: 1.25)")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="time each --suite stage this many times and keep the fastest")
+    parser.add_argument("--generate", metavar="DIR",
+                        help="write a synthetic model of the first SIZE to DIR and exit")
+    for knob, default in SHAPE.items():
+        parser.add_argument(f"--{knob}", type=int, default=default,
+                            help=f"synthetic model shape (default: {default})")
+    args = parser.parse_args()
+    shape = {knob: getattr(args, knob) for knob in SHAPE}
+
+    print("⏱️  SysMLcheap Validator Benchmark\n")
+    if args.generate:
+        return run_generate(args.generate, args.sizes[0] if args.sizes else 10000, shape)
+    if args.suite:
+        return run_suite(args.sizes or SUITE_SIZES, shape, args.repeat,
+                         args.json, args.compare, args.threshold)
+    if args.incremental:
+        return run_incremental(args.sizes[0] if args.sizes else 50000)
+    if args.load:
+        return run_load(args.sizes[0] if args.sizes else 100000)
+    if args.memory:
+        return run_memory(args.sizes[0] if args.sizes else 100000)
+    if args.rules:
+        return run_rules(args.sizes[0] if args.sizes else 100000)
+    if args.graphs:
+        return run_graphs(args.sizes or [10000, 100000])
+    if args.refs:
+        return run_refs(args.sizes or [10000, 100000, 200000])
+    if args.trace:
+        return run_trace(args.sizes or [5000, 50000])
+    if args.interfaces:
+        return run_interfaces(args.sizes or [10000, 100000, 300000])
+    if args.behavior:
+        return run_behavior(args.sizes or [1000, 10000, 100000])
+    if args.diagram_memory:
+        return run_diagram_memory(args.sizes[0] if args.sizes else 100000, shape)
+    if args.regenerate:
+        return run_regenerate(args.sizes[0] if args.sizes else 100000)
+
+    sizes = args.sizes or [1000, 10000, 100000]
+    print(f"   {'elements':>10} {'index s':>9} {'validate s':>11} {'µs/elem':>9} {'issues':>7}")
+    for n in sizes:
+        total, t_index, t_validate, n_issues = run(n)
+        per_elem = (t_index + t_validate) / total * 1e6
+        print(f"   {total:>10} {t_index:>9.3f} {t_validate:>11.3f} {per_elem:>9.2f} {n_issues:>7}")
+    print("\n   Linear scaling shows as a roughly constant µs/elem column.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,40 +4,27 @@ SysMLcheap Diagram Generator v0.1
 Generates PlantUML diagrams from YAML model files.
 """
 
-import yaml
-import sys
 import os
+import argparse
+import hashlib
+import json
+import multiprocessing
+import pickle
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-
-def load_model(model_dir):
-    """Load all YAML files from the model directory."""
-    model = {}
-    for yaml_file in sorted(Path(model_dir).glob("*.yaml")):
-        with open(yaml_file) as f:
-            data = yaml.safe_load(f)
-            if data:
-                for key, val in data.items():
-                    model.setdefault(key, []).extend(val if isinstance(val, list) else [val])
-    return model
-
-
-def build_index(model):
-    index = {}
-    for key in model:
-        for elem in model[key]:
-            index[elem["id"]] = elem
-            for sub_key in ("parts", "ports", "flowProperties", "operations"):
-                for sub in elem.get(sub_key, []):
-                    index[sub["id"]] = sub
-    return index
+from sysmlcheap import cache, profile, view
+from sysmlcheap.graph import walk_tree
+from sysmlcheap.model import RecordingIndex, load
+from sysmlcheap.render import FORMATS, find_plantuml, render_files
 
 
 # ── Use Case Diagram ─────────────────────────────────────────────────────────
 
-def generate_use_case_diagram(model, index):
-    lines = [
-        "@startuml Use Case Diagram",
+def generate_use_case_diagram(model, index, title="Use Case Diagram"):
+    yield from [
+        f"@startuml {title}",
         "left to right direction",
         'skinparam packageStyle rectangle',
         "",
@@ -45,45 +32,45 @@ def generate_use_case_diagram(model, index):
 
     # Actors
     for actor in model.get("actors", []):
-        lines.append(f'actor "{actor["name"]}" as {actor["id"]}')
-    lines.append("")
+        yield f'actor "{actor["name"]}" as {actor["id"]}'
+    yield ""
 
     # Use cases in a rectangle
-    lines.append('rectangle "Croatian Learning App" {')
+    yield 'rectangle "Croatian Learning App" {'
     for uc in model.get("useCases", []):
-        lines.append(f'  usecase "{uc["name"]}" as {uc["id"]}')
-    lines.append("}")
-    lines.append("")
+        yield f'  usecase "{uc["name"]}" as {uc["id"]}'
+    yield "}"
+    yield ""
 
     # Actor → UseCase associations
     for actor in model.get("actors", []):
         for uc_ref in actor.get("useCaseRefs", []):
-            lines.append(f"{actor['id']} --> {uc_ref}")
+            yield f"{actor['id']} --> {uc_ref}"
 
     # Include relationships
     for uc in model.get("useCases", []):
         for inc_ref in uc.get("includeRefs", []):
-            lines.append(f"{uc['id']} ..> {inc_ref} : <<include>>")
+            yield f"{uc['id']} ..> {inc_ref} : <<include>>"
 
     # Extend relationships
     for uc in model.get("useCases", []):
         for ext_ref in uc.get("extendRefs", []):
-            lines.append(f"{uc['id']} ..> {ext_ref} : <<extend>>")
+            yield f"{uc['id']} ..> {ext_ref} : <<extend>>"
 
-    lines.append("")
-    lines.append("@enduml")
-    return "\n".join(lines)
+    yield ""
+    yield "@enduml"
 
 
 # ── Block Definition Diagram ─────────────────────────────────────────────────
 
-def generate_bdd(model, index, stereotype_filter=None):
+def generate_bdd(model, index, stereotype_filter=None, title=None):
     """Generate a Block Definition Diagram for blocks of a given stereotype."""
-    title = f"Block Definition Diagram"
-    if stereotype_filter:
-        title += f" — {stereotype_filter.title()} Architecture"
+    if title is None:
+        title = f"Block Definition Diagram"
+        if stereotype_filter:
+            title += f" — {stereotype_filter.title()} Architecture"
 
-    lines = [
+    yield from [
         f"@startuml {title}",
         "skinparam class {",
         "  BackgroundColor<<logical>> LightBlue",
@@ -104,25 +91,25 @@ def generate_bdd(model, index, stereotype_filter=None):
     for blk in blocks:
         stereo = blk.get("stereotype", "")
         stereo_tag = f" <<{stereo}>>" if stereo else ""
-        lines.append(f'class "{blk["name"]}"{stereo_tag} as {blk["id"]} {{')
+        yield f'class "{blk["name"]}"{stereo_tag} as {blk["id"]} {{'
 
         # Value properties
         for vp in blk.get("valueProperties", []):
             vp_type = index.get(vp.get("typeRef", ""), {}).get("name", "?")
-            lines.append(f"  {vp.get('name', '?')} : {vp_type}")
+            yield f"  {vp.get('name', '?')} : {vp_type}"
 
         # Operations
         for op in blk.get("operations", []):
-            lines.append(f"  {op.get('name', '?')}()")
+            yield f"  {op.get('name', '?')}()"
 
         # Ports (shown as fields for BDD)
         for port in blk.get("ports", []):
             port_type = index.get(port.get("typeRef", ""), {}).get("name", "?")
             conj = "~" if port.get("conjugated") else ""
-            lines.append(f"  <<port>> {conj}{port.get('name', '?')} : {port_type}")
+            yield f"  <<port>> {conj}{port.get('name', '?')} : {port_type}"
 
-        lines.append("}")
-        lines.append("")
+        yield "}"
+        yield ""
 
     # Composition relationships (owner → part type)
     for blk in blocks:
@@ -130,23 +117,22 @@ def generate_bdd(model, index, stereotype_filter=None):
             type_ref = part.get("typeRef", "")
             if type_ref in index:
                 part_name = part.get("name", "")
-                lines.append(f'{blk["id"]} *-- {type_ref} : {part_name}')
+                yield f'{blk["id"]} *-- {type_ref} : {part_name}'
 
     # Realization relationships
     for blk in blocks:
         for real_ref in blk.get("realizationRefs", []):
             if real_ref in index:
-                lines.append(f'{blk["id"]} ..|> {real_ref} : <<realize>>')
+                yield f'{blk["id"]} ..|> {real_ref} : <<realize>>'
 
     # Generalization relationships
     for blk in blocks:
         for gen_ref in blk.get("generalizationRefs", []):
             if gen_ref in index:
-                lines.append(f'{blk["id"]} --|> {gen_ref}')
+                yield f'{blk["id"]} --|> {gen_ref}'
 
-    lines.append("")
-    lines.append("@enduml")
-    return "\n".join(lines)
+    yield ""
+    yield "@enduml"
 
 
 # ── Interface Block Diagram ──────────────────────────────────────────────────
@@ -156,7 +142,7 @@ def generate_interface_diagram(model, index, stereotype_filter=None):
     if stereotype_filter:
         title += f" — {stereotype_filter.title()}"
 
-    lines = [
+    yield from [
         f"@startuml {title}",
         "skinparam class {",
         "  BackgroundColor<<logical>> LightBlue",
@@ -172,13 +158,13 @@ def generate_interface_diagram(model, index, stereotype_filter=None):
     for ib in ibs:
         stereo = ib.get("stereotype", "")
         stereo_tag = f" <<{stereo}>>" if stereo else ""
-        lines.append(f'class "{ib["name"]}"{stereo_tag} as {ib["id"]} {{')
+        yield f'class "{ib["name"]}"{stereo_tag} as {ib["id"]} {{'
         for fp in ib.get("flowProperties", []):
             sig_name = index.get(fp.get("typeRef", ""), {}).get("name", "?")
             direction = fp.get("direction", "?")
-            lines.append(f"  {direction} {fp.get('name', '?')} : {sig_name}")
-        lines.append("}")
-        lines.append("")
+            yield f"  {direction} {fp.get('name', '?')} : {sig_name}"
+        yield "}"
+        yield ""
 
     # Signal taxonomy
     signals = model.get("signals", [])
@@ -187,26 +173,25 @@ def generate_interface_diagram(model, index, stereotype_filter=None):
                    or not s.get("stereotype")]
 
     for sig in signals:
-        lines.append(f'class "{sig["name"]}" <<signal>> as {sig["id"]}')
+        yield f'class "{sig["name"]}" <<signal>> as {sig["id"]}'
 
-    lines.append("")
+    yield ""
 
     # Flow property → signal dependencies
     for ib in ibs:
         for fp in ib.get("flowProperties", []):
             type_ref = fp.get("typeRef", "")
             if type_ref in index:
-                lines.append(f'{ib["id"]} ..> {type_ref} : <<conveys>>')
+                yield f'{ib["id"]} ..> {type_ref} : <<conveys>>'
 
-    lines.append("")
-    lines.append("@enduml")
-    return "\n".join(lines)
+    yield ""
+    yield "@enduml"
 
 
 # ── Requirements Diagram ─────────────────────────────────────────────────────
 
 def generate_requirements_diagram(model, index):
-    lines = [
+    yield from [
         "@startuml Requirements Diagram",
         "skinparam class {",
         "  BackgroundColor<<functional>> LightBlue",
@@ -224,33 +209,30 @@ def generate_requirements_diagram(model, index):
         text = req.get("text", "").strip()[:80].replace('"', "'")
         if len(req.get("text", "").strip()) > 80:
             text += "..."
-        lines.append(f'class "{req.get("name", req["id"])}" <<{kind}>> as {req["id"]} {{')
-        lines.append(f'  {text}')
-        lines.append("}")
-        lines.append("")
+        yield f'class "{req.get("name", req["id"])}" <<{kind}>> as {req["id"]} {{'
+        yield f'  {text}'
+        yield "}"
+        yield ""
 
     # Derive relationships
     for req in model.get("requirements", []):
         for ref in req.get("deriveRefs", []):
-            lines.append(f'{req["id"]} ..> {ref} : <<deriveReqt>>')
+            yield f'{req["id"]} ..> {ref} : <<deriveReqt>>'
         for ref in req.get("refineRefs", []):
-            lines.append(f'{req["id"]} ..> {ref} : <<refine>>')
+            yield f'{req["id"]} ..> {ref} : <<refine>>'
         for ref in req.get("traceRefs", []):
             if ref in index and index[ref].get("_kind") == "SourceContent":
                 pass  # Skip source traces to reduce clutter
 
-    lines.append("")
-    lines.append("@enduml")
-    return "\n".join(lines)
+    yield ""
+    yield "@enduml"
 
 
 # ── Package Diagram ──────────────────────────────────────────────────────────
 
 def generate_package_diagram(model, index):
-    lines = [
-        "@startuml Package Structure",
-        "",
-    ]
+    yield "@startuml Package Structure"
+    yield ""
 
     # Build tree
     root_pkgs = [p for p in model.get("packages", []) if not p.get("ownerRef")]
@@ -260,60 +242,581 @@ def generate_package_diagram(model, index):
         if owner:
             child_map.setdefault(owner, []).append(p)
 
-    def render_package(pkg, indent=0):
+    def children(pkg):
+        return child_map.get(pkg["id"], [])
+
+    # Iterative, so package trees of any depth render.
+    for event, pkg, indent in walk_tree(root_pkgs, children):
         prefix = "  " * indent
-        children = child_map.get(pkg["id"], [])
-        if children:
-            lines.append(f'{prefix}package "{pkg["name"]}" as {pkg["id"]} {{')
-            for child in children:
-                render_package(child, indent + 1)
-            lines.append(f"{prefix}}}")
+        if event == "exit":
+            if children(pkg):
+                yield f"{prefix}}}"
+        elif children(pkg):
+            yield f'{prefix}package "{pkg["name"]}" as {pkg["id"]} {{'
         else:
-            lines.append(f'{prefix}package "{pkg["name"]}" as {pkg["id"]}')
-
-    for pkg in root_pkgs:
-        render_package(pkg)
+            yield f'{prefix}package "{pkg["name"]}" as {pkg["id"]}'
 
-    lines.append("")
-    lines.append("@enduml")
-    return "\n".join(lines)
+    yield ""
+    yield "@enduml"
 
 
 # ── Main ─────────────────────────────────────────────────────────────────────
 
-def main():
-    model_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), "..", "model")
-    output_dir = sys.argv[2] if len(sys.argv) > 2 else os.path.join(os.path.dirname(__file__), "..", "diagrams")
+# Output file → (generator, extra arguments, model keys it iterates), in
+# generation order. Every other element a generator needs it must look up
+# through the index, which incremental mode records (see run).
+DIAGRAMS = [
+    ("use-case-diagram.puml", generate_use_case_diagram, (), ("actors", "useCases")),
+    ("bdd-logical.puml", generate_bdd, ("logical",), ("blocks",)),
+    ("interface-blocks-logical.puml", generate_interface_diagram, ("logical",),
+     ("interfaceBlocks", "signals")),
+    ("requirements-diagram.puml", generate_requirements_diagram, (), ("requirements",)),
+    ("package-structure.puml", generate_package_diagram, (), ("packages",)),
+]
+
+
+# ── Streaming Output ─────────────────────────────────────────────────────────
+# Generators yield their diagram line by line; lines are joined and written in
+# fixed-size batches, so memory use does not grow with the size of a diagram.
+
+BATCH_LINES = 4096          # lines joined per write
+WRITE_BUFFER = 1 << 20      # bytes buffered by the output file
+READ_CHUNK = 1 << 20        # characters per read when hashing an existing output
+
+
+def stream(lines, f, digest=None):
+    """Write lines to an open file, newline-separated with no trailing newline
+    (the same text str.join would give), updating digest if given."""
+    def flush(text):
+        f.write(text)
+        if digest is not None:
+            digest.update(text.encode())
+
+    batch = []
+    separator = ""
+    for line in lines:
+        batch.append(line)
+        if len(batch) == BATCH_LINES:
+            flush(separator + "\n".join(batch))
+            batch.clear()
+            separator = "\n"
+    if batch:
+        flush(separator + "\n".join(batch))
+
+
+def write_diagram(lines, filepath):
+    """Stream a diagram into filepath; returns (content hash, whether it was written).
+
+    Output goes to a temporary file first, which only replaces filepath when
+    its content differs, so a byte-identical diagram keeps its mtime.
+    """
+    digest = hashlib.sha256()
+    tmp_path = filepath + ".tmp"
+    try:
+        with open(tmp_path, "w", buffering=WRITE_BUFFER) as f:
+            stream(lines, f, digest)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    content_hash = digest.hexdigest()
+    if content_hash == output_digest(filepath):
+        os.remove(tmp_path)
+        return content_hash, False
+    os.replace(tmp_path, filepath)
+    return content_hash, True
+
+
+# ── Incremental Regeneration ─────────────────────────────────────────────────
+# The manifest remembers, per output, a fingerprint of its inputs (the model
+# keys it iterates plus every element it looked up in the index), the IDs it
+# looked up and a hash of what was written. It also records a stat + hash of
+# every model file, so a run where nothing changed is answered without even
+# loading the model. Manifests live in the cache directory, one per output
+# directory, and are dropped whenever this file changes.
+
+MANIFEST_FORMAT = 1
+
+
+def manifest_path(output_dir):
+    name = hashlib.sha256(str(Path(output_dir).resolve()).encode()).hexdigest()[:16]
+    return cache.CACHE_ROOT / "diagrams" / f"{name}.json"
+
+
+def generator_version():
+    return hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:16]
+
+
+def load_manifest(output_dir):
+    try:
+        manifest = json.loads(manifest_path(output_dir).read_text())
+        if (manifest.get("format") == MANIFEST_FORMAT
+                and manifest.get("generators") == generator_version()):
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {"format": MANIFEST_FORMAT, "generators": generator_version(),
+            "files": {}, "outputs": {}}
+
+
+def save_manifest(output_dir, manifest):
+    path = manifest_path(output_dir)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(manifest))
+        os.replace(tmp_path, path)
+    except OSError:
+        pass  # read-only checkout: the next run just regenerates
+
+
+def scan_model_files(model_dir, previous):
+    """path → [mtime_ns, size, sha256]; files whose stat is unchanged are not re-read."""
+    files = {}
+    for yaml_file in sorted(Path(model_dir).glob("*.yaml")):
+        path = str(yaml_file.resolve())
+        st = yaml_file.stat()
+        old = previous.get(path)
+        if old and old[:2] == [st.st_mtime_ns, st.st_size]:
+            files[path] = old
+        else:
+            digest = hashlib.sha256(yaml_file.read_bytes()).hexdigest()
+            files[path] = [st.st_mtime_ns, st.st_size, digest]
+    return files
+
+
+def same_files(a, b):
+    """Same set of model files with the same content (mtimes may differ)."""
+    return a.keys() == b.keys() and all(a[p][2] == b[p][2] for p in a)
+
+
+def output_digest(filepath):
+    """Hash of a written diagram, read in chunks; None if it does not exist."""
+    h = hashlib.sha256()
+    try:
+        with open(filepath) as f:
+            for chunk in iter(lambda: f.read(READ_CHUNK), ""):
+                h.update(chunk.encode())
+    except OSError:
+        return None
+    return h.hexdigest()
 
+
+def outputs_intact(output_dir, manifest):
+    """Every output exists and is exactly what the manifest says was written."""
+    outputs = manifest["outputs"]
+    return all(filename in outputs and
+               output_digest(os.path.join(output_dir, filename)) == outputs[filename]["output"]
+               for filename, _, _, _ in DIAGRAMS)
+
+
+def fingerprint(model, index, keys, reads):
+    """Hash of everything a generator read: its model keys and its index lookups."""
+    h = hashlib.sha256()
+    for key in keys:
+        h.update(pickle.dumps(list(model.get(key, ())), protocol=4))
+    for elem_id in sorted(reads):
+        h.update(pickle.dumps((elem_id, index.get(elem_id)), protocol=4))
+    return h.hexdigest()
+
+
+def regenerate(model_dir, output_dir, jobs=1, compact=False):
+    """Incremental mode: regenerate only the diagrams whose inputs changed."""
     model_dir = os.path.abspath(model_dir)
+    manifest = load_manifest(output_dir)
+    files = scan_model_files(model_dir, manifest["files"])
+    if same_files(files, manifest["files"]) and outputs_intact(output_dir, manifest):
+        print(f"   Output: {os.path.abspath(output_dir)}\n")
+        print(f"   No model file changed; all {len(DIAGRAMS)} diagrams are up to date.")
+        manifest["files"] = files  # remember new mtimes so the next scan skips hashing
+        save_manifest(output_dir, manifest)
+        return
+    model, index = load(model_dir, jobs, compact)
+    run(model, index, output_dir, manifest)
+    manifest["files"] = files
+    save_manifest(output_dir, manifest)
+
+
+# ── Sharded Diagrams ─────────────────────────────────────────────────────────
+# One BDD or use-case diagram for the whole model stops being renderable once
+# the model grows. Sharded mode splits the output into bounded diagrams, either
+# per package (by ownerRef) or per block of each context block's decomposition
+# (following parts[].typeRef), plus an index.puml linking to every shard.
+# Elements a shard points at but does not own are drawn as name-only stubs,
+# so every edge stays inside its diagram. Shards are planned here as lists of
+# IDs and rendered in parallel from a forked copy of the loaded model.
+
+SHARD_MODES = ("package", "context")
+SHARD_SIZE = 150       # most owned elements (or parts) drawn in one shard
+SHARD_DEPTH = 3        # decomposition levels below a context block that get a shard
+STUB_FIELDS = ("id", "name", "stereotype")
+
+
+def chunked(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)] or [[]]
+
+
+def shard_name(base, part, n_parts):
+    return f"{base}-{part + 1}" if n_parts > 1 else base
+
+
+def stub(elem, **fields):
+    """A name-only copy of an element for drawing it in someone else's shard."""
+    copy = {k: elem[k] for k in STUB_FIELDS if k in elem}
+    copy.update(fields)
+    return copy
+
+
+def is_block(index, elem_id):
+    return elem_id in index and index[elem_id].get("_kind") == "Block"
+
+
+def scoped_blocks(blocks, index):
+    """The shard's blocks followed by stubs for the blocks they point at."""
+    ids = {blk["id"] for blk in blocks}
+    stubs = {}
+    for blk in blocks:
+        targets = [part.get("typeRef", "") for part in blk.get("parts", [])]
+        targets += blk.get("realizationRefs", []) + blk.get("generalizationRefs", [])
+        for target in targets:
+            if target not in ids and target not in stubs and is_block(index, target):
+                stubs[target] = stub(index[target])
+    return blocks + list(stubs.values())
+
+
+def scoped_use_cases(actors, use_cases, index):
+    """Sub-model for one use-case shard, with stubs for actors and use cases
+    outside it that its associations, includes and extends point at."""
+    uc_ids = {uc["id"] for uc in use_cases}
+    actor_ids = {actor["id"] for actor in actors}
+    actor_stubs, uc_stubs = {}, {}
+    for uc in use_cases:
+        for actor_id in uc.get("actorRefs", []):
+            if actor_id not in actor_ids and actor_id not in actor_stubs and actor_id in index:
+                actor = index[actor_id]
+                actor_stubs[actor_id] = stub(actor, useCaseRefs=[
+                    ref for ref in actor.get("useCaseRefs", []) if ref in uc_ids])
+        for ref in uc.get("includeRefs", []) + uc.get("extendRefs", []):
+            if ref not in uc_ids and ref in index:
+                uc_stubs.setdefault(ref, stub(index[ref]))
+    for actor in actors:
+        for ref in actor.get("useCaseRefs", []):
+            if ref not in uc_ids and ref in index:
+                uc_stubs.setdefault(ref, stub(index[ref]))
+    return {"actors": actors + list(actor_stubs.values()),
+            "useCases": use_cases + list(uc_stubs.values())}
+
+
+def plan_package_shards(model, index, size=SHARD_SIZE):
+    """Shard specs per owning package, and the index diagram's lines.
+
+    A spec is (filename, kind, title, ids...) with kind "bdd" (block IDs) or
+    "usecases" (actor IDs, use case IDs).
+    """
+    owned = {}  # package id (None when unowned) → model key → elements
+    for key in ("blocks", "actors", "useCases"):
+        for elem in model.get(key, []):
+            owned.setdefault(elem.get("ownerRef"), {}).setdefault(key, []).append(elem)
+
+    specs, artifacts = [], {}  # artifacts: package id → [(label, filename)]
+    for pkg_id, groups in owned.items():
+        base = pkg_id or "unowned"
+        pkg_name = index[pkg_id].get("name", pkg_id) if pkg_id in index else "(no package)"
+        blocks = chunked(groups.get("blocks", []), size)
+        if groups.get("blocks"):
+            for part, chunk in enumerate(blocks):
+                filename = f"{shard_name(base, part, len(blocks))}.bdd.puml"
+                specs.append((filename, "bdd", f"BDD — {pkg_name}", [b["id"] for b in chunk]))
+                artifacts.setdefault(pkg_id, []).append((f"BDD ({len(chunk)} blocks)", filename))
+        actors = groups.get("actors", [])
+        ucs = chunked(groups.get("useCases", []), max(1, size - len(actors)))
+        if actors or groups.get("useCases"):
+            for part, chunk in enumerate(ucs):
+                filename = f"{shard_name(base, part, len(ucs))}.use-cases.puml"
+                specs.append((filename, "usecases", f"Use Cases — {pkg_name}",
+                              [a["id"] for a in actors], [uc["id"] for uc in chunk]))
+                artifacts.setdefault(pkg_id, []).append(
+                    (f"Use cases ({len(chunk)})", filename))
+    return specs, package_index(model, artifacts)
+
+
+def package_index(model, artifacts):
+    """Package tree with a linked artifact per shard inside its package."""
+    yield "@startuml Sharded Diagrams — by Package"
+    yield ""
+    packages = model.get("packages", [])
+    children = {}
+    for pkg in packages:
+        children.setdefault(pkg.get("ownerRef"), []).append(pkg)
+    counter = iter(range(1, 1 << 62))
+
+    def inner(pkg):
+        return children.get(pkg["id"], [])
+
+    for event, pkg, indent in walk_tree(children.get(None, []), inner):
+        prefix = "  " * indent
+        shards = artifacts.get(pkg["id"], [])
+        if event == "exit":
+            if inner(pkg) or shards:
+                yield f"{prefix}}}"
+        elif not inner(pkg) and not shards:
+            yield f'{prefix}package "{pkg["name"]}" as {pkg["id"]}'
+        else:
+            yield f'{prefix}package "{pkg["name"]}" as {pkg["id"]} {{'
+            for label, filename in shards:
+                yield f'{prefix}  artifact "{label}" as shard_{next(counter)} [[{svg_name(filename)}]]'
+    for label, filename in artifacts.get(None, []):
+        yield f'artifact "{label}" as shard_{next(counter)} [[{svg_name(filename)}]]'
+    yield ""
+    yield "@enduml"
+
+
+def plan_context_shards(model, index, size=SHARD_SIZE, depth=SHARD_DEPTH):
+    """Shard specs for every decomposed block within `depth` levels of a context
+    block, and the index diagram's lines. Specs are ("context", title, block ID,
+    first part, last part + 1) so wide decompositions split across shards."""
+    queue = [blk for blk in model.get("blocks", []) if blk.get("stereotype") == "context"]
+    level = {blk["id"]: 0 for blk in queue}
+    specs, shards, edges = [], [], []
+    for blk in queue:  # breadth first; queue grows while we walk it
+        parts = blk.get("parts", [])
+        if not parts:
+            continue
+        if level[blk["id"]] < depth:
+            ranges = chunked(list(range(len(parts))), size)
+            for part, chunk in enumerate(ranges):
+                filename = f"{shard_name(blk['id'], part, len(ranges))}.bdd.puml"
+                specs.append((filename, "context", f"Decomposition — {blk['name']}",
+                              blk["id"], chunk[0], chunk[-1] + 1))
+            shards.append((blk, specs[-len(ranges)][0]))
+        for p in parts:
+            type_ref = p.get("typeRef", "")
+            if is_block(index, type_ref):
+                edges.append((blk["id"], type_ref))
+                if type_ref not in level:
+                    level[type_ref] = level[blk["id"]] + 1
+                    queue.append(index[type_ref])
+    return specs, context_index(shards, edges)
+
+
+def context_index(shards, edges):
+    """One linked class per sharded block, with composition edges between them."""
+    yield "@startuml Sharded Diagrams — by Context Decomposition"
+    yield ""
+    sharded = set()
+    for blk, filename in shards:
+        sharded.add(blk["id"])
+        yield f'class "{blk["name"]}" as {blk["id"]} [[{svg_name(filename)}]]'
+    yield ""
+    for owner, part_type in dict.fromkeys(edges):
+        if owner in sharded and part_type in sharded:
+            yield f"{owner} *-- {part_type}"
+    yield ""
+    yield "@enduml"
+
+
+def svg_name(filename):
+    return filename[:-len(".puml")] + ".svg"
+
+
+def shard_lines(model, index, spec):
+    """The lines of one planned shard."""
+    filename, kind, title, *ids = spec
+    if kind == "bdd":
+        blocks = scoped_blocks([index[i] for i in ids[0]], index)
+        return generate_bdd({"blocks": blocks}, index, title=title)
+    if kind == "usecases":
+        sub_model = scoped_use_cases([index[i] for i in ids[0]], [index[i] for i in ids[1]], index)
+        return generate_use_case_diagram(sub_model, index, title=title)
+    root_id, start, stop = ids
+    root = dict(index[root_id], parts=index[root_id]["parts"][start:stop])
+    part_types = {}
+    for part in root["parts"]:
+        type_ref = part.get("typeRef", "")
+        if is_block(index, type_ref) and type_ref != root_id:
+            part_types.setdefault(type_ref, stub(index[type_ref]))
+    return generate_bdd({"blocks": [root] + list(part_types.values())}, index, title=title)
+
+
+def render_shard(model, index, shard_dir, spec):
+    """Write one shard; returns (filename, whether it was written)."""
+    filepath = os.path.join(shard_dir, spec[0])
+    with profile.span("shard", spec[0]):
+        _, changed = write_diagram(shard_lines(model, index, spec), filepath)
+    return spec[0], changed
+
+
+_snapshot = None  # (model, index, shard_dir) inherited by forked shard workers
+
+
+def _init_shard_worker(model, index, shard_dir):
+    global _snapshot
+    _snapshot = (model, index, shard_dir)
+
+
+def _render_shard_in_worker(spec):
+    return render_shard(*_snapshot, spec)
+
+
+def run_sharded(model, index, output_dir, mode, jobs=1, size=SHARD_SIZE, depth=SHARD_DEPTH):
+    """Generate one mode's shards plus index.puml into output_dir/by-<mode>/."""
+    shard_dir = os.path.join(os.path.abspath(output_dir), f"by-{mode}")
+    os.makedirs(shard_dir, exist_ok=True)
+    print(f"   Output: {shard_dir}\n")
+
+    if mode == "package":
+        specs, index_lines = plan_package_shards(model, index, size)
+    else:
+        specs, index_lines = plan_context_shards(model, index, size, depth)
+
+    if jobs > 1 and len(specs) > 1 and "fork" in multiprocessing.get_all_start_methods():
+        with ProcessPoolExecutor(max_workers=jobs,
+                                 mp_context=multiprocessing.get_context("fork"),
+                                 initializer=_init_shard_worker,
+                                 initargs=(model, index, shard_dir)) as pool:
+            results = list(pool.map(_render_shard_in_worker, specs,
+                                    chunksize=max(1, len(specs) // (jobs * 4))))
+    else:
+        results = [render_shard(model, index, shard_dir, spec) for spec in specs]
+    results.append(("index.puml", write_diagram(index_lines, os.path.join(shard_dir, "index.puml"))[1]))
+
+    # Shards that no longer exist (a package emptied, a block removed) go too.
+    current = {filename for filename, _ in results}
+    for stale in sorted(set(os.listdir(shard_dir)) - current):
+        if stale.endswith(".puml"):
+            os.remove(os.path.join(shard_dir, stale))
+
+    written = sum(changed for _, changed in results)
+    print(f"   Generated {len(specs)} shards plus index.puml, {written} written.")
+
+
+# ── Rendering ────────────────────────────────────────────────────────────────
+
+def add_render_arguments(parser):
+    parser.add_argument("--render", nargs="?", const="svg", choices=FORMATS,
+                        help="render the diagrams with a local PlantUML (default format: svg)")
+    parser.add_argument("--plantuml", metavar="PATH",
+                        help="plantuml.jar or plantuml launcher to render with "
+                             "(default: $PLANTUML, then the usual install locations)")
+
+
+def diagram_dir(output_dir, shard=None):
+    """Where a run writes its .puml files."""
     output_dir = os.path.abspath(output_dir)
-    os.makedirs(output_dir, exist_ok=True)
+    return os.path.join(output_dir, f"by-{shard}") if shard else output_dir
+
+
+def render_stage(directory, fmt, jobs=1, plantuml=None):
+    """Render every .puml in directory with --jobs persistent PlantUML processes;
+    returns the exit code."""
+    command = find_plantuml(plantuml)
+    if command is None:
+        print("\n❌ --render needs a local PlantUML: pass --plantuml PATH or set $PLANTUML "
+              "to a plantuml.jar (with java on PATH) or a plantuml launcher.")
+        return 1
+    puml_files = sorted(str(p) for p in Path(directory).glob("*.puml"))
+    print(f"\n🖼️  Rendering {len(puml_files)} diagrams to {fmt} with {max(1, jobs)} PlantUML process(es)")
+    with profile.span("phase", "render"):
+        stats = render_files(puml_files, command, fmt, max(1, jobs))
+    for puml, message in stats.failed:
+        print(f"  ❌ {os.path.basename(puml)}: {message}")
+    print(f"   {stats.summary()}")
+    return 1 if stats.failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate PlantUML diagrams from SysMLcheap YAML model files.")
+    parser.add_argument("model_dir", nargs="?",
+                        default=os.path.join(os.path.dirname(__file__), "..", "model"))
+    parser.add_argument("output_dir", nargs="?",
+                        default=os.path.join(os.path.dirname(__file__), "..", "diagrams"))
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="parse model files across N worker processes")
+    parser.add_argument("--compact", action="store_true",
+                        help="hold the model in the compact columnar store (large models)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only regenerate diagrams whose model inputs changed")
+    parser.add_argument("--shard", choices=SHARD_MODES,
+                        help="write bounded diagrams per package or per context decomposition "
+                             "(rendered across --jobs processes) instead of the full set")
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE,
+                        help=f"most elements per shard (default: {SHARD_SIZE})")
+    parser.add_argument("--depth", type=int, default=SHARD_DEPTH,
+                        help=f"decomposition levels sharded in context mode (default: {SHARD_DEPTH})")
+    add_render_arguments(parser)
+    view.add_arguments(parser)
+    profile.add_arguments(parser)
+    args = parser.parse_args()
+    model_dir = os.path.abspath(args.model_dir)
+    # --shard always draws from a freshly loaded model; --incremental only applies without it.
+    incremental = args.incremental and not args.shard
+    if incremental and (args.status or args.context):
+        parser.error("--status / --context cannot be combined with --incremental")
 
     print(f"📊 SysMLcheap Diagram Generator v0.1")
     print(f"   Model: {model_dir}")
-    print(f"   Output: {output_dir}\n")
-
-    model = load_model(model_dir)
-    index = build_index(model)
 
-    diagrams = {
-        "use-case-diagram.puml": generate_use_case_diagram(model, index),
-        "bdd-logical.puml": generate_bdd(model, index, "logical"),
-        "interface-blocks-logical.puml": generate_interface_diagram(model, index, "logical"),
-        "requirements-diagram.puml": generate_requirements_diagram(model, index),
-        "package-structure.puml": generate_package_diagram(model, index),
-    }
+    profile.start_from_args(args)
+    if not incremental:
+        try:
+            model, index = view.from_args(args, *load(model_dir, args.jobs, args.compact))
+        except KeyError as e:
+            print(f"❌ {e.args[0]}")
+            return 1
+    if args.shard:
+        run_sharded(model, index, args.output_dir, args.shard, args.jobs,
+                    args.shard_size, args.depth)
+    elif args.incremental:
+        regenerate(model_dir, args.output_dir, args.jobs, args.compact)
+    else:
+        run(model, index, args.output_dir)
+    exit_code = 0
+    if args.render:
+        exit_code = render_stage(diagram_dir(args.output_dir, args.shard), args.render,
+                                 args.jobs, args.plantuml)
+    print(f"   {cache.stats.summary()}")
+    profile.finish_from_args(args)
+    return exit_code
+
+
+def run(model, index, output_dir, manifest=None):
+    """Generate every diagram from an already loaded model into output_dir.
+
+    Each generator streams straight into its output file, which is only
+    replaced when its content changed. With a manifest
+    (incremental mode), generators whose inputs fingerprint the same as in
+    the manifest are skipped entirely, and the manifest is updated in place.
+    """
+    output_dir = os.path.abspath(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    print(f"   Output: {output_dir}\n")
 
-    for filename, content in diagrams.items():
+    written = 0
+    for filename, generator, args, keys in DIAGRAMS:
         filepath = os.path.join(output_dir, filename)
-        with open(filepath, "w") as f:
-            f.write(content)
-        print(f"  ✅ {filename}")
+        previous = manifest["outputs"].get(filename) if manifest else None
+        if previous and output_digest(filepath) == previous["output"] and \
+                fingerprint(model, index, keys, previous["reads"]) == previous["inputs"]:
+            print(f"  ⏭️  {filename} (inputs unchanged)")
+            continue
+
+        recorder = RecordingIndex(index)
+        with profile.span("generator", filename):
+            content_hash, changed = write_diagram(generator(model, recorder, *args), filepath)
+        if manifest is not None:
+            manifest["outputs"][filename] = {
+                "inputs": fingerprint(model, index, keys, recorder.reads),
+                "reads": sorted(recorder.reads),
+                "output": content_hash,
+            }
+        if changed:
+            written += 1
+            print(f"  ✅ {filename}")
+        else:
+            print(f"  ➖ {filename} (unchanged)")
 
-    print(f"\n   Generated {len(diagrams)} diagrams.")
-    print(f"   View them at: https://www.plantuml.com/plantuml/uml/")
-    print(f"   Or install PlantUML locally: apt install plantuml")
+    print(f"\n   Generated {len(DIAGRAMS)} diagrams, {written} written.")
+    print(f"   Render them locally with --render (needs java and plantuml.jar).")
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,512 @@
+#!/usr/bin/env python3
+"""
+SysMLcheap Language Server
+Serves the model's YAML files to editors over the Language Server Protocol
+(JSON-RPC on stdin/stdout): the validator's issues as diagnostics while you
+type, go to definition and find references on element IDs, and completion of
+IDs in ref fields, offering only the kinds the metamodel lets the field target.
+
+The model stays resident in an IncrementalValidator. An edit reparses just
+the edited buffer and re-checks the elements it touched.
+
+Usage: lsp.py [MODEL_DIR]     (default: the workspace root's model/ directory)
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import re
+import sys
+import time
+import traceback
+from bisect import bisect_left, insort
+from collections import defaultdict
+from urllib.parse import quote, unquote, urlparse
+
+import yaml
+
+from sysmlcheap.model import KIND_CODES, KIND_MAP, NESTED_KINDS, iter_unit
+from sysmlcheap.positions import DocumentMap, DocumentParser, parse
+from sysmlcheap.view import top_level
+from validate import IncrementalValidator
+
+SEVERITIES = {"error": 1, "warning": 2, "info": 3}
+COMPLETION_LIMIT = 200
+ID_WORD = re.compile(r"[\w.-]+")
+ID_TAIL = re.compile(r"[\w.-]*$")
+KEY_LINE = re.compile(r"^(\s*)(?:-\s+)?([A-Za-z_]\w*):(.*)$")
+
+
+# ── Transport ────────────────────────────────────────────────────────────────
+
+def read_message(stream):
+    """The next JSON-RPC message, or None at end of input."""
+    length = None
+    while True:
+        line = stream.readline()
+        if not line:
+            return None
+        if not line.strip():
+            if length is not None:
+                break
+            continue
+        name, _, value = line.decode("ascii").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return json.loads(stream.read(length))
+
+
+def write_message(stream, message):
+    body = json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    stream.write(b"Content-Length: %d\r\n\r\n" % len(body) + body)
+    stream.flush()
+
+
+def log(message):
+    print(message, file=sys.stderr, flush=True)
+
+
+# ── Documents ────────────────────────────────────────────────────────────────
+
+class Document:
+    """One model file's text and the ID positions of its last version that
+    parsed. LSP counts columns in UTF-16 code units, YAML in code points."""
+
+    def __init__(self, text, positions):
+        self.lines = text.split("\n")
+        self.positions = positions
+
+    def line(self, n):
+        return self.lines[n] if 0 <= n < len(self.lines) else ""
+
+    def utf16(self, n, column):
+        text = self.line(n)
+        if text.isascii():
+            return column
+        return len(text[:column].encode("utf-16-le")) // 2
+
+    def column(self, n, character):
+        text = self.line(n)
+        if text.isascii():
+            return character
+        return len(text.encode("utf-16-le")[:character * 2].decode("utf-16-le", "ignore"))
+
+    def range(self, line, start, end):
+        return {"start": {"line": line, "character": self.utf16(line, start)},
+                "end": {"line": line, "character": self.utf16(line, end)}}
+
+    def word_at(self, position):
+        """The ID-like word under an LSP position, or None."""
+        n = position["line"]
+        column = self.column(n, position["character"])
+        for match in ID_WORD.finditer(self.line(n)):
+            if match.start() <= column <= match.end():
+                return match.group()
+        return None
+
+
+def path_of(uri):
+    return os.path.realpath(unquote(urlparse(uri).path))
+
+
+def uri_of(path):
+    return "file://" + quote(path)
+
+
+def ref_context(lines, n, before):
+    """(ref field, owning kind) for a value typed after `before` on line n:
+    either `field: ...` on the same line or a `- ...` item under `field:`.
+    The kind is None when no enclosing element list is found."""
+    match = KEY_LINE.match(before)
+    if match:
+        field, field_line, field_column = match.group(2), n, match.start(2)
+    elif before.strip() == "-":
+        indent = len(before) - len(before.lstrip())
+        for field_line in range(n - 1, -1, -1):
+            match = KEY_LINE.match(lines[field_line])
+            if match and match.start(2) <= indent:
+                break
+        else:
+            return None, None
+        if match.group(3).strip():
+            return None, None
+        field, field_column = match.group(2), match.start(2)
+    else:
+        return None, None
+    if not field.endswith(("Ref", "Refs")):
+        return None, None
+    for owner_line in range(field_line - 1, -1, -1):
+        match = KEY_LINE.match(lines[owner_line])
+        if match and match.start(2) < field_column:
+            key = match.group(2)
+            return field, KIND_MAP.get(key) or NESTED_KINDS.get(key)
+    return field, None
+
+
+# ── Server ───────────────────────────────────────────────────────────────────
+
+class Server:
+    def __init__(self, out, model_dir=None, jobs=1):
+        self.out = out
+        self.model_dir = model_dir
+        self.jobs = jobs
+        self.validator = None
+        self.open = {}          # path → Document for files open in the editor
+        self.parsers = {}       # path → DocumentParser for each open file
+        self.on_disk = {}       # path → (mtime_ns, Document) for the rest, read on demand
+        self.published = {}     # path → diagnostics last sent
+        self.elsewhere = {}     # path → uniqueness and graph issues located in it
+        self.ids = []           # every defined ID, sorted, for prefix completion
+        self.targets = {}       # path → (its units list, IDs it references), for references
+        self.shutting_down = False
+        self.handlers = {
+            "initialize": self.initialize,
+            "initialized": self.initialized,
+            "shutdown": self.shutdown,
+            "textDocument/didOpen": self.did_open,
+            "textDocument/didChange": self.did_change,
+            "textDocument/didClose": self.did_close,
+            "textDocument/definition": self.definition,
+            "textDocument/references": self.references,
+            "textDocument/completion": self.completion,
+            "workspace/didChangeWatchedFiles": self.did_change_watched_files,
+        }
+
+    def serve(self, stream):
+        """Answer messages until `exit`; returns the process exit code."""
+        while True:
+            message = read_message(stream)
+            if message is None or message.get("method") == "exit":
+                return 0 if self.shutting_down else 1
+            self.dispatch(message)
+
+    def dispatch(self, message):
+        method = message.get("method")
+        handler = self.handlers.get(method)
+        if "id" not in message:
+            if handler:
+                try:
+                    handler(message.get("params") or {})
+                except Exception:
+                    log(traceback.format_exc())
+            return
+        reply = {"jsonrpc": "2.0", "id": message["id"]}
+        if handler is None:
+            reply["error"] = {"code": -32601, "message": f"Unhandled method {method}"}
+        elif self.validator is None and method != "initialize":
+            reply["error"] = {"code": -32002, "message": "Server not initialized"}
+        else:
+            try:
+                reply["result"] = handler(message.get("params") or {})
+            except Exception as e:
+                log(traceback.format_exc())
+                reply["error"] = {"code": -32603, "message": str(e)}
+        write_message(self.out, reply)
+
+    def notify(self, method, params):
+        write_message(self.out, {"jsonrpc": "2.0", "method": method, "params": params})
+
+    # ── Lifecycle ────────────────────────────────────────────────────────────
+
+    def initialize(self, params):
+        if self.model_dir is None:
+            root = params.get("rootUri")
+            folders = params.get("workspaceFolders")
+            if folders:
+                root = folders[0]["uri"]
+            if not root:
+                raise ValueError("no model directory: pass one on the command line or open a workspace")
+            self.model_dir = os.path.realpath(os.path.join(path_of(root), "model"))
+        start = time.perf_counter()
+        self.validator = IncrementalValidator(self.model_dir, self.jobs)
+        self.validator.full_run()
+        self.ids = sorted(self.validator.index)
+        self.locate_elsewhere()
+        log(f"🔍 Loaded {len(self.validator.units)} top-level elements from {self.model_dir} "
+            f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return {
+            "capabilities": {
+                "textDocumentSync": {"openClose": True, "change": 1, "save": {"includeText": False}},
+                "definitionProvider": True,
+                "referencesProvider": True,
+                "completionProvider": {"triggerCharacters": ["[", ",", " "]},
+            },
+            "serverInfo": {"name": "SysMLcheap", "version": "0.1"},
+        }
+
+    def initialized(self, params):
+        self.publish(list(self.validator.files))
+
+    def shutdown(self, params):
+        self.shutting_down = True
+        return None
+
+    # ── Synchronization ──────────────────────────────────────────────────────
+
+    def model_path(self, uri):
+        """The validator's path for a document, or None if it is not a model file."""
+        path = path_of(uri)
+        if os.path.dirname(path) != self.model_dir or not path.endswith(".yaml"):
+            return None
+        return str(self.validator.model_dir / os.path.basename(path))
+
+    def did_open(self, params):
+        document = params["textDocument"]
+        self.edit(document["uri"], document["text"])
+
+    def did_change(self, params):
+        changes = params["contentChanges"]
+        if changes:
+            self.edit(params["textDocument"]["uri"], changes[-1]["text"])
+
+    def did_close(self, params):
+        path = self.model_path(params["textDocument"]["uri"])
+        self.parsers.pop(path, None)
+        if path and self.open.pop(path, None) is not None:
+            self.apply([path])  # back to what is on disk
+
+    def did_change_watched_files(self, params):
+        changed = [path for path in self.validator.scan() if path not in self.open]
+        if changed:
+            self.apply(changed)
+
+    def edit(self, uri, text):
+        path = self.model_path(uri)
+        if path is None:
+            return
+        previous = self.open.get(path)
+        parser = self.parsers.setdefault(path, DocumentParser())
+        try:
+            data, positions = parser.parse(text)
+        except yaml.YAMLError as e:
+            # Keep checking against the last version that parsed; report the syntax error.
+            self.open[path] = Document(text, previous.positions if previous else DocumentMap())
+            self.send(path, [syntax_diagnostic(self.open[path], e)])
+            return
+        self.open[path] = Document(text, positions)
+        self.apply([path], {path: data})
+
+    def apply(self, paths, contents=None):
+        """Re-validate edited files, then republish every file whose issues moved."""
+        validator = self.validator
+        results = dict(validator.results)
+        graph_issues = dict(validator.graph_issues)
+        unique_issues = validator.unique_issues
+        defined = self.defined(paths)
+        start = time.perf_counter()
+        rechecked = validator.update(paths, contents)
+
+        for elem_id in defined - self.defined(paths):
+            if elem_id not in validator.index:
+                i = bisect_left(self.ids, elem_id)
+                if i < len(self.ids) and self.ids[i] == elem_id:
+                    del self.ids[i]
+        for elem_id in self.defined(paths) - defined:
+            i = bisect_left(self.ids, elem_id)
+            if i == len(self.ids) or self.ids[i] != elem_id:
+                insort(self.ids, elem_id)
+
+        stale = set(paths)
+        for unit in results.keys() | validator.results.keys():
+            if results.get(unit) is not validator.results.get(unit):
+                stale.add(unit[0])  # units are (path, position)
+        if validator.unique_issues is not unique_issues or any(
+                issues is not graph_issues.get(rule) for rule, issues in validator.graph_issues.items()):
+            stale |= self.elsewhere.keys()
+            self.locate_elsewhere()
+            stale |= self.elsewhere.keys()
+        self.publish(stale)
+        names = ", ".join(os.path.basename(p) for p in paths)
+        log(f"🔁 {names} — re-checked {rechecked} elements, {len(stale)} files republished "
+            f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    def defined(self, paths):
+        return {sub["id"] for path in paths for _, elem in self.validator.files.get(path, ())
+                for sub in iter_unit(elem)}
+
+    # ── Diagnostics ──────────────────────────────────────────────────────────
+
+    def locate(self, elem_id):
+        """Path of the file that defines an element, or None."""
+        validator = self.validator
+        if elem_id not in validator.index:
+            return None
+        where = validator.order.get(top_level(validator.index, elem_id))
+        return where and where[0]
+
+    def locate_elsewhere(self):
+        """Group the model-wide (uniqueness and graph) issues by file."""
+        validator = self.validator
+        elsewhere = defaultdict(list)
+        for issues in [validator.unique_issues, *validator.graph_issues.values()]:
+            for issue in issues:
+                path = self.locate(issue.element_id)
+                if path:
+                    elsewhere[path].append(issue)
+        self.elsewhere = dict(elsewhere)
+
+    def publish(self, paths):
+        validator = self.validator
+        for path in paths:
+            issues = [issue for i in range(len(validator.files.get(path, ())))
+                      for found in validator.results.get((path, i), {}).values() for issue in found]
+            issues += self.elsewhere.get(path, ())
+            document = self.document(path) if issues else None
+            self.send(path, [diagnostic(document, issue) for issue in issues])
+
+    def send(self, path, diagnostics):
+        if self.published.get(path, []) == diagnostics:
+            return
+        self.published[path] = diagnostics
+        self.notify("textDocument/publishDiagnostics",
+                    {"uri": uri_of(path), "diagnostics": diagnostics})
+
+    def document(self, path):
+        """The open buffer for a path, else the file on disk (reparsed when it changes)."""
+        document = self.open.get(path)
+        if document is not None:
+            return document
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return Document("", DocumentMap())
+        cached = self.on_disk.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        with open(path, encoding="utf-8", newline="") as f:
+            text = f.read()
+        try:
+            _, positions = parse(text)
+        except yaml.YAMLError:
+            positions = DocumentMap()
+        document = Document(text, positions)
+        self.on_disk[path] = (mtime, document)
+        return document
+
+    # ── Navigation ───────────────────────────────────────────────────────────
+
+    def definition(self, params):
+        elem_id = self.word(params)
+        path = elem_id and self.locate(elem_id)
+        if not path:
+            return None
+        document = self.document(path)
+        position = document.positions.defs.get(elem_id)
+        if position is None:
+            return None
+        return {"uri": uri_of(path), "range": document.range(*position)}
+
+    def references(self, params):
+        elem_id = self.word(params)
+        if not elem_id:
+            return []
+        locations = []
+        if params.get("context", {}).get("includeDeclaration"):
+            declaration = self.definition(params)
+            if declaration:
+                locations.append(declaration)
+        for path in sorted(self.validator.files):
+            units = self.validator.files[path]
+            cached = self.targets.get(path)
+            if cached is None or cached[0] is not units:
+                cached = self.targets[path] = (units, referenced(units))
+            if elem_id not in cached[1]:
+                continue
+            document = self.document(path)
+            locations += [{"uri": uri_of(path), "range": document.range(*position)}
+                          for position in document.positions.ref_positions(elem_id)]
+        return locations
+
+    def completion(self, params):
+        path = self.model_path(params["textDocument"]["uri"])
+        if path is None:
+            return None
+        document = self.document(path)
+        n = params["position"]["line"]
+        text = document.line(n)[:document.column(n, params["position"]["character"])]
+        prefix = ID_TAIL.search(text).group()
+        field, kind = ref_context(document.lines, n, text[:len(text) - len(prefix)])
+        if field is None:
+            return None
+        allowed = None
+        plan = self.validator.plans.get(kind)
+        for step in plan.refs if plan else ():
+            if step.prop == field and step.targets is not None:
+                allowed = {KIND_CODES[target] for target in step.targets if target in KIND_CODES}
+        index = self.validator.index
+        edit_range = document.range(n, len(text) - len(prefix), len(text))
+        items = []
+        incomplete = False
+        for i in range(bisect_left(self.ids, prefix), len(self.ids)):
+            elem_id = self.ids[i]
+            if not elem_id.startswith(prefix):
+                break
+            if allowed is not None and index.kinds.get(elem_id) not in allowed:
+                continue
+            if len(items) == COMPLETION_LIMIT:
+                incomplete = True
+                break
+            elem = index[elem_id]
+            items.append({"label": elem_id, "kind": 18, "detail": f"{elem['_kind']} {elem.get('name', '')}",
+                          "textEdit": {"range": edit_range, "newText": elem_id}})
+        return {"isIncomplete": incomplete, "items": items}
+
+    def word(self, params):
+        path = self.model_path(params["textDocument"]["uri"])
+        return path and self.document(path).word_at(params["position"])
+
+
+def referenced(units):
+    """Every ID the ref fields of some (model key, element) units mention."""
+    targets = set()
+    for _, elem in units:
+        for sub in iter_unit(elem):
+            for field, value in sub.items():
+                if value and field.endswith(("Ref", "Refs")):
+                    for ref_id in (value if isinstance(value, list) else (value,)):
+                        if isinstance(ref_id, str):
+                            targets.add(ref_id)
+    return targets
+
+
+def diagnostic(document, issue):
+    """An LSP diagnostic for an issue, on the reference it names if any, else
+    on the element's ID."""
+    positions = document.positions
+    position = positions.defs.get(issue.element_id, (0, 0, 0))
+    named = set(ID_WORD.findall(issue.message))
+    for ref_position, ref_id in positions.refs_from(issue.element_id):
+        if ref_id in named:
+            position = ref_position
+            break
+    return {"range": document.range(*position), "severity": SEVERITIES.get(issue.severity, 1),
+            "code": issue.rule, "source": "sysmlcheap", "message": issue.message}
+
+
+def syntax_diagnostic(document, error):
+    mark = getattr(error, "problem_mark", None) or getattr(error, "context_mark", None)
+    line, column = (mark.line, mark.column) if mark else (0, 0)
+    message = getattr(error, "problem", None) or str(error)
+    return {"range": document.range(line, column, column + 1), "severity": 1,
+            "code": "YAML_SYNTAX", "source": "sysmlcheap", "message": f"YAML: {message}"}
+
+
+# ── Main ─────────────────────────────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve SysMLcheap model files to editors over the Language Server Protocol (stdio).")
+    parser.add_argument("model_dir", nargs="?",
+                        help="model directory (default: model/ under the editor's workspace root)")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="parse model files across N worker processes at startup")
+    args = parser.parse_args()
+    server = Server(sys.stdout.buffer, args.model_dir and os.path.realpath(args.model_dir), args.jobs)
+    # stdout carries the protocol; anything else printed goes to the editor's log.
+    with contextlib.redirect_stdout(sys.stderr):
+        return server.serve(sys.stdin.buffer)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+SysMLcheap Toolchain
+Runs several tools against one in-memory model, so the YAML is loaded once.
+
+Usage: mbse.py build [MODEL_DIR] [OUTPUT_DIR] [OPTIONS]    validate, then generate diagrams
+       mbse.py export [MODEL_DIR] [OUTPUT] [OPTIONS]        write the JSON snapshot the docs pages read
+       mbse.py trace [MODEL_DIR] [OPTIONS]                  requirements traceability coverage report
+       mbse.py sync [MODEL_DIR] [--db FILE]                 mirror the model into a SQLite database
+       mbse.py query [QUERY] [--param NAME=VALUE ...]       run a named query or ad-hoc SQL against it
+       mbse.py diff [OLD] [NEW] [OPTIONS]                   element changes between git revisions and their impact
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+
+import generate_diagrams
+import validate
+from sysmlcheap import cache, coverage, database, diff, profile, view
+from sysmlcheap.model import STATUSES, load
+from sysmlcheap.snapshot import build_snapshot, write_snapshot
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MODEL_DIR = os.path.join(TOOLS_DIR, "..", "model")
+DEFAULT_OUTPUT_DIR = os.path.join(TOOLS_DIR, "..", "diagrams")
+DEFAULT_SNAPSHOT = os.path.join(TOOLS_DIR, "..", "docs", "model.json")
+
+
+def cmd_build(args):
+    model_dir = os.path.abspath(args.model_dir)
+    print("🔧 SysMLcheap build")
+    print(f"   Model directory: {model_dir}\n")
+
+    profile.start_from_args(args)
+    model, index = load(model_dir, args.jobs, args.compact)
+    try:
+        model, sliced_index = view.from_args(args, model, index)
+    except KeyError as e:
+        print(f"❌ {e.args[0]}")
+        return 1
+    # References resolve model-wide; only the diagrams are drawn from the slice.
+    exit_code = validate.run(model, index, args.jobs)
+    index = sliced_index
+    print()
+    with profile.span("phase", "generate"):
+        if args.shard:
+            generate_diagrams.run_sharded(model, index, args.output_dir, args.shard, args.jobs)
+        elif args.incremental:
+            generate_diagrams.regenerate(model_dir, args.output_dir, args.jobs, args.compact)
+        else:
+            generate_diagrams.run(model, index, args.output_dir)
+    if args.render:
+        render_code = generate_diagrams.render_stage(
+            generate_diagrams.diagram_dir(args.output_dir, args.shard),
+            args.render, args.jobs, args.plantuml)
+        exit_code = exit_code or render_code
+    print(f"   {cache.stats.summary()}")
+    profile.finish_from_args(args)
+    return exit_code
+
+
+def cmd_export(args):
+    model_dir = os.path.abspath(args.model_dir)
+    print("📦 SysMLcheap export")
+    print(f"   Model directory: {model_dir}\n")
+
+    profile.start_from_args(args)
+    model, index = load(model_dir, args.jobs)
+    with profile.span("phase", "export") as span:
+        snapshot = build_snapshot(model, index)
+        span.elements = len(snapshot["ids"])
+        try:
+            written = write_snapshot(snapshot, args.output, args.compress or ())
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            return 1
+    for path, size in written.items():
+        print(f"  ✅ {path} ({size / 1024:.1f} KiB)")
+    print(f"\nExported {len(snapshot['ids'])} elements and {len(snapshot['views'])} views.")
+    profile.finish_from_args(args)
+    return 0
+
+
+def cmd_trace(args):
+    model_dir = os.path.abspath(args.model_dir)
+    # A report on stdout keeps it clean: the summary goes to stderr instead.
+    out = sys.stderr if args.format and args.output is None else sys.stdout
+    print("🔗 SysMLcheap traceability", file=out)
+    print(f"   Model directory: {model_dir}\n", file=out)
+    profile.start_from_args(args)
+    model, index = load(model_dir, args.jobs, args.compact)
+    matrix = coverage.build_matrix(model, use_cache=not args.no_cache)
+    rows = coverage.coverage(matrix, model, index, set(args.status or ()))
+    with profile.span("phase", "trace.report") as span:
+        if args.format is None:
+            totals = coverage.summarize(rows)
+        elif args.output is None:
+            totals = coverage.write_report(rows, sys.stdout, args.format)
+        else:
+            with open(args.output, "w", encoding="utf-8", newline="") as f:
+                totals = coverage.write_report(rows, f, args.format)
+        span.elements = totals["requirements"]
+
+    n = totals["requirements"]
+    filtered = f" with status {', '.join(sorted(args.status))}" if args.status else ""
+    print(f"   {n} requirements{filtered}", file=out)
+    for key, icon in (("satisfied", "✅"), ("verified", "🧪"), ("orphaned", "⚠️ ")):
+        share = f" ({100 * totals[key] / n:.0f}%)" if n else ""
+        print(f"   {icon} {key}: {totals[key]}{share}", file=out)
+    if args.output:
+        print(f"   Report: {args.output}", file=out)
+    profile.finish_from_args(args)
+    if args.fail_uncovered and (totals["satisfied"] < n or totals["verified"] < n):
+        return 1
+    return 0
+
+
+def cmd_sync(args):
+    model_dir = os.path.abspath(args.model_dir)
+    print("🗄️  SysMLcheap sync")
+    print(f"   Model directory: {model_dir}")
+    print(f"   Database: {args.db}\n")
+    profile.start_from_args(args)
+    start = time.perf_counter()
+    changed, removed, total = database.sync(model_dir, args.db)
+    elapsed = (time.perf_counter() - start) * 1000
+    if changed or removed:
+        print(f"  ✅ {changed} files rewritten, {removed} removed in {elapsed:.0f} ms")
+    else:
+        print(f"  ⏭️  up to date ({elapsed:.0f} ms)")
+    print(f"\n   {total} elements in the database.")
+    profile.finish_from_args(args)
+    return 0
+
+
+def cmd_query(args):
+    if args.list or not args.query:
+        print("Named queries (parameters with their defaults):\n")
+        for name, (description, sql, defaults) in database.QUERIES.items():
+            params = dict.fromkeys(re.findall(r":(\w+)", sql))
+            shown = " ".join(f"{p}={defaults[p]!r}" if p in defaults else p for p in params)
+            print(f"  {name:<14} {description}")
+            if shown:
+                print(f"  {'':<14} {shown}")
+        print("\nAnything else is run as SQL against the elements, refs, ref_<field> and search tables.")
+        return 0
+
+    params = {}
+    for param in args.param or ():
+        name, sep, value = param.partition("=")
+        if not sep:
+            print(f"❌ --param {param}: expected NAME=VALUE")
+            return 1
+        params[name] = value
+    if not args.no_sync:
+        database.sync(os.path.abspath(args.model), args.db)
+    start = time.perf_counter()
+    try:
+        conn = database.connect_readonly(args.db)
+        columns, rows = database.run_query(conn, args.query, params)
+    except sqlite3.Error as e:
+        print(f"❌ {e}")
+        return 1
+    elapsed = (time.perf_counter() - start) * 1000
+    conn.close()
+
+    if args.format == "json":
+        json.dump([dict(zip(columns, row)) for row in rows], sys.stdout, ensure_ascii=False, indent=1)
+        print()
+    elif args.format == "csv":
+        writer = csv.writer(sys.stdout, lineterminator="\n")
+        writer.writerow(columns)
+        writer.writerows(rows)
+    else:
+        cells = [[("" if v is None else str(v)) for v in row] for row in rows]
+        widths = [min(60, max([len(c)] + [len(row[i]) for row in cells])) for i, c in enumerate(columns)]
+        print("  ".join(c.ljust(w) for c, w in zip(columns, widths)).rstrip())
+        print("  ".join("─" * w for w in widths))
+        for row in cells:
+            print("  ".join(v[:w].ljust(w) for v, w in zip(row, widths)).rstrip())
+        print(f"\n{len(rows)} rows in {elapsed:.1f} ms", file=sys.stderr)
+    return 0
+
+
+def cmd_diff(args):
+    model_dir = os.path.abspath(args.model)
+    # JSON on stdout gets it to itself; the banner goes to stderr instead.
+    out = sys.stderr if args.format == "json" else sys.stdout
+    print("🔀 SysMLcheap diff", file=out)
+    print(f"   Model directory: {model_dir}", file=out)
+    profile.start_from_args(args)
+    start = time.perf_counter()
+    diagrams = [(filename, keys) for filename, _, _, keys in generate_diagrams.DIAGRAMS]
+    try:
+        result = diff.diff(model_dir, args.old, args.new, diagrams)
+    except RuntimeError as e:
+        print(f"❌ {e}", file=out)
+        return 1
+    elapsed = time.perf_counter() - start
+    if args.format == "json":
+        json.dump(result.to_dict(), sys.stdout, ensure_ascii=False, indent=1)
+        print()
+    else:
+        diff.print_report(result, sys.stdout, args.limit)
+    print(f"   Compared in {elapsed:.2f} s. {cache.stats.summary()}", file=out)
+    profile.finish_from_args(args)
+    return 1 if args.exit_code and result.changed_ids else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SysMLcheap toolchain.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="validate the model, then generate diagrams")
+    build.add_argument("model_dir", nargs="?", default=DEFAULT_MODEL_DIR)
+    build.add_argument("output_dir", nargs="?", default=DEFAULT_OUTPUT_DIR)
+    build.add_argument("--jobs", "-j", type=int, default=1,
+                       help="parse model files and run rule families across N worker processes")
+    build.add_argument("--compact", action="store_true",
+                       help="hold the model in the compact columnar store")
+    build.add_argument("--incremental", action="store_true",
+                       help="only regenerate diagrams whose model inputs changed")
+    build.add_argument("--shard", choices=generate_diagrams.SHARD_MODES,
+                       help="write bounded diagrams per package or per context decomposition")
+    generate_diagrams.add_render_arguments(build)
+    view.add_arguments(build)
+    profile.add_arguments(build)
+    build.set_defaults(func=cmd_build)
+
+    export = commands.add_parser("export", help="write the pre-indexed JSON snapshot the docs pages load")
+    export.add_argument("model_dir", nargs="?", default=DEFAULT_MODEL_DIR)
+    export.add_argument("output", nargs="?", default=DEFAULT_SNAPSHOT)
+    export.add_argument("--jobs", "-j", type=int, default=1,
+                        help="parse model files across N worker processes")
+    export.add_argument("--gzip", dest="compress", action="append_const", const="gzip",
+                        help="also write a gzip copy (OUTPUT.gz) for servers that serve precompressed files")
+    export.add_argument("--brotli", dest="compress", action="append_const", const="brotli",
+                        help="also write a brotli copy (OUTPUT.br); needs the brotli package")
+    profile.add_arguments(export)
+    export.set_defaults(func=cmd_export)
+
+    trace = commands.add_parser("trace", help="report which requirements are satisfied, verified or orphaned")
+    trace.add_argument("model_dir", nargs="?", default=DEFAULT_MODEL_DIR)
+    trace.add_argument("--status", action="append", choices=STATUSES,
+                       help="only report requirements with this status (repeatable)")
+    trace.add_argument("--format", choices=coverage.REPORT_FORMATS,
+                       help="write the full matrix in this format (default: summary only)")
+    trace.add_argument("--output", "-o", metavar="FILE",
+                       help="write the report here instead of stdout")
+    trace.add_argument("--fail-uncovered", action="store_true",
+                       help="exit 1 unless every reported requirement is satisfied and verified")
+    trace.add_argument("--no-cache", action="store_true",
+                       help="recompute the closure instead of reusing the cached matrix")
+    trace.add_argument("--jobs", "-j", type=int, default=1,
+                       help="parse model files across N worker processes")
+    trace.add_argument("--compact", action="store_true",
+                       help="hold the model in the compact columnar store")
+    profile.add_arguments(trace)
+    trace.set_defaults(func=cmd_trace)
+
+    sync = commands.add_parser("sync", help="mirror the model into a SQLite database for queries")
+    sync.add_argument("model_dir", nargs="?", default=DEFAULT_MODEL_DIR)
+    sync.add_argument("--db", default=str(database.DEFAULT_DB),
+                      help=f"database file (default: {database.DEFAULT_DB})")
+    profile.add_arguments(sync)
+    sync.set_defaults(func=cmd_sync)
+
+    query = commands.add_parser("query", help="run a named query or ad-hoc SQL against the model database")
+    query.add_argument("query", nargs="?", help="a named query (see --list) or SQL")
+    query.add_argument("--param", "-p", action="append", metavar="NAME=VALUE",
+                       help="value for a :NAME parameter (repeatable)")
+    query.add_argument("--list", action="store_true", help="list the named queries")
+    query.add_argument("--format", choices=("table", "csv", "json"), default="table")
+    query.add_argument("--model", default=DEFAULT_MODEL_DIR,
+                       help="model directory synced before querying (default: ../model)")
+    query.add_argument("--no-sync", action="store_true",
+                       help="query the database as it is, without checking model files first")
+    query.add_argument("--db", default=str(database.DEFAULT_DB),
+                       help=f"database file (default: {database.DEFAULT_DB})")
+    query.set_defaults(func=cmd_query)
+
+    compare = commands.add_parser("diff", help="changed elements and edges between git revisions, and their impact")
+    compare.add_argument("old", nargs="?", default="HEAD", help="old revision (default: HEAD)")
+    compare.add_argument("new", nargs="?", default=diff.WORKTREE,
+                         help="new revision (default: the working tree)")
+    compare.add_argument("--model", default=DEFAULT_MODEL_DIR,
+                         help="model directory inside the repository (default: ../model)")
+    compare.add_argument("--format", choices=("text", "json"), default="text")
+    compare.add_argument("--limit", type=int, default=50, metavar="N",
+                         help="most lines listed per section in the text report (default: 50)")
+    compare.add_argument("--exit-code", action="store_true",
+                         help="exit 1 when any element changed, like git diff --exit-code")
+    profile.add_arguments(compare)
+    compare.set_defaults(func=cmd_diff)
+
+    args = parser.parse_args()
+    if args.command == "build" and args.incremental and not args.shard and (args.status or args.context):
+        parser.error("--status / --context cannot be combined with --incremental")
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,4 @@
+"""
+SysMLcheap shared library: the model loader, index and caches used by the
+command-line tools in this directory.
+"""
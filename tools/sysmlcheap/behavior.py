@@ -0,0 +1,374 @@
+"""
+SysMLcheap Behavior
+Static analysis of activities and state machines, one behavior at a time.
+A behavior's nodes (pins and parameter nodes included) or states are
+numbered locally and its flows laid out as CSR arrays, so reachability from
+the initial nodes and the reverse walk back from the final ones are each a
+single linear pass marking a bytearray, whatever the size of the behavior.
+Each rule is a function of its own; the rules run on one behavior share the
+layout worked out for it.
+"""
+
+from array import array
+from collections import defaultdict
+
+from .graph import csr, reachable
+from .issues import Issue
+from .model import iter_unit
+
+CONTROL_NODES = frozenset({"fork", "join", "decision", "merge"})
+FINAL_NODES = ("activityFinal", "flowFinal")
+# Node kinds whose rules inspect their incoming or outgoing edges.
+WATCHED_NODES = frozenset({"initial", "activityFinal", "fork", "decision"})
+# Node kinds an object flow may end on directly; actions, initial nodes and
+# events exchange objects through their pins (activity finals are left to
+# ACTIVITYFINALINCOMING).
+OBJECT_FLOW_NODES = CONTROL_NODES | {"centralBuffer", "dataStore", *FINAL_NODES}
+# State kinds that are not entered directly, so need not be reachable.
+ENTERED_VIA_SUBSTATES = ("composite", "orthogonal")
+
+
+class FlowGraph:
+    """Directed graph over one behavior's elements, numbered in the order added."""
+
+    def __init__(self):
+        self.elems = []            # number → element
+        self.numbers = {}          # element ID → number
+        self.sources = array("l")
+        self.targets = array("l")
+
+    def add(self, elem):
+        if isinstance(elem, dict) and "id" in elem and elem["id"] not in self.numbers:
+            self.numbers[elem["id"]] = len(self.elems)
+            self.elems.append(elem)
+
+    def connect(self, source, target):
+        self.sources.append(source)
+        self.targets.append(target)
+
+    def forward(self, roots):
+        """Bytearray flagging what the roots reach."""
+        return reachable(*csr(len(self.elems), self.sources, self.targets), roots)
+
+    def backward(self, sinks):
+        """Bytearray flagging what reaches the sinks."""
+        return reachable(*csr(len(self.elems), self.targets, self.sources), sinks)
+
+
+def last_analyses(index):
+    return {}  # build → (element, build(element)) for the element analysed last
+
+
+def analysis(elem, index, build):
+    """build(elem), shared by the rules run on elem. Rules run element by
+    element, so each index keeps only the one for the element seen last."""
+    last = index.derived(last_analyses)
+    if build not in last or last[build][0] is not elem:
+        last[build] = (elem, build(elem))
+    return last[build][1]
+
+
+def guard_of(elem):
+    guard = elem.get("guard")
+    return guard.strip() if isinstance(guard, str) else ""
+
+
+def check_guard_coverage(owner, what, ways, outgoing, issues):
+    """GUARDCOVERAGE: a decision or choice needs two or more ways out, with
+    no guard repeated (unguarded ones are reported by their own rules)."""
+    guards = [guard_of(elem) for elem in outgoing if guard_of(elem)]
+    repeated = sorted({guard for guard in guards if guards.count(guard) > 1})
+    if len(outgoing) < 2:
+        issues.append(Issue("GUARDCOVERAGE", owner["id"], owner.get("name", ""), "warning",
+                           f"{what} has {len(outgoing)} outgoing {ways}; it needs at least two"))
+    elif repeated:
+        issues.append(Issue("GUARDCOVERAGE", owner["id"], owner.get("name", ""), "warning",
+                           f"{what} guards repeat: {', '.join(repeated)}"))
+
+
+# ── Activities ───────────────────────────────────────────────────────────────
+
+class ActivityFlow:
+    """One activity's nodes, pins, parameter nodes and edges, numbered and laid
+    out once for all of its rules; reachability is worked out on first use."""
+
+    def __init__(self, activity):
+        self.activity = activity
+        graph = self.graph = FlowGraph()
+        nodes, pins = self.nodes, self.pins = [], []
+        for node in activity.get("nodes") or ():
+            if isinstance(node, dict) and "id" in node:
+                nodes.append(node)
+                graph.add(node)
+                for field in ("inputPins", "outputPins"):
+                    for pin in node.get(field) or ():
+                        if isinstance(pin, dict) and "id" in pin:
+                            graph.add(pin)
+                            pins.append((field, pin, node))
+        # Tokens pass from input pins into their node, and from a node to its output pins.
+        for field, pin, node in pins:
+            pin_number, node_number = graph.numbers[pin["id"]], graph.numbers[node["id"]]
+            if field == "inputPins":
+                graph.connect(pin_number, node_number)
+            else:
+                graph.connect(node_number, pin_number)
+        self.parameters = [p for p in activity.get("parameterNodes") or ()
+                           if isinstance(p, dict) and "id" in p]
+        for parameter in self.parameters:
+            graph.add(parameter)
+
+        numbers = graph.numbers
+        # Edge lists are kept only for the nodes whose rules look at them; for the
+        # rest a bit per element says whether anything flows in.
+        watched = {numbers[node["id"]] for node in nodes if node.get("kind") in WATCHED_NODES}
+        self.incoming, self.outgoing = defaultdict(list), defaultdict(list)
+        self.fed = bytearray(len(graph.elems))
+        # Edges sorted by what the guard and object flow rules look at.
+        self.from_decisions = []  # edges leaving a decision node
+        self.guarded = []         # guarded edges leaving anything else
+        self.object_flows = []    # (edge, source number or None, target number or None)
+        for edge in activity.get("edges") or ():
+            if not isinstance(edge, dict) or "id" not in edge:
+                continue
+            source, target = numbers.get(edge.get("sourceRef")), numbers.get(edge.get("targetRef"))
+            if source is not None:
+                if self.node_kind(source) == "decision":
+                    self.from_decisions.append(edge)
+                elif guard_of(edge):
+                    self.guarded.append(edge)
+            if edge.get("kind") == "objectFlow":
+                self.object_flows.append((edge, source, target))
+            if source in watched:
+                self.outgoing[source].append(edge)
+            if target is not None:
+                self.fed[target] = 1
+                if target in watched:
+                    self.incoming[target].append(edge)
+                if source is not None:
+                    graph.connect(source, target)
+
+        self.by_kind = {}
+        for node in nodes:
+            self.by_kind.setdefault(node.get("kind"), []).append(node)
+        self._walked = False
+        self._reach = None
+
+    def node_kind(self, number):
+        elem = self.graph.elems[number]
+        return elem.get("kind") if elem.get("_kind") == "ActivityNode" else None
+
+    def number(self, elem):
+        return self.graph.numbers[elem["id"]]
+
+    def reach(self):
+        """(what the token sources reach, what reaches a sink or None without
+        sinks), or None when nothing starts a token.
+
+        Tokens start at initial nodes, input parameters and accept events
+        nothing flows into, and should be able to reach a final node or an
+        output parameter from wherever they get.
+        """
+        if not self._walked:
+            self._walked = True
+            by_kind, number, fed = self.by_kind, self.number, bytearray(self.fed)
+            roots = [number(node) for node in by_kind.get("initial", ())]
+            roots += [number(p) for p in self.parameters if p.get("direction") != "out"]
+            for field, pin, node in self.pins:
+                if field == "inputPins" and fed[number(pin)]:
+                    fed[number(node)] = 1
+            roots += [number(node) for node in by_kind.get("acceptEvent", ()) if not fed[number(node)]]
+            sinks = [number(node) for kind in FINAL_NODES for node in by_kind.get(kind, ())]
+            sinks += [number(p) for p in self.parameters if p.get("direction") == "out"]
+            if roots:
+                self._reach = (self.graph.forward(roots),
+                               self.graph.backward(sinks) if sinks else None)
+        return self._reach
+
+    def own_nodes(self):
+        """(number, node) for each node, skipping repeats of an ID (the
+        uniqueness rule reports those)."""
+        elems = self.graph.elems
+        for node in self.nodes:
+            number = self.number(node)
+            if elems[number] is node:
+                yield number, node
+
+
+def lay_out_activity(activity, index, issues):
+    """Not a rule: works out the ActivityFlow (reachability included) that the
+    activity's rules share, so a profile shows its cost on its own line."""
+    analysis(activity, index, ActivityFlow).reach()
+
+
+def check_edge_guards(activity, index, issues):
+    """ACTIVITYEDGEGUARD: edges leaving a decision must have guards."""
+    for edge in analysis(activity, index, ActivityFlow).from_decisions:
+        if not guard_of(edge):
+            issues.append(Issue("ACTIVITYEDGEGUARD", edge["id"], edge.get("name", ""), "error",
+                               f"Edge leaving decision {edge['sourceRef']} must have a guard"))
+
+
+def check_guard_source(activity, index, issues):
+    """GUARDSOURCE: ...and only those may."""
+    for edge in analysis(activity, index, ActivityFlow).guarded:
+        issues.append(Issue("GUARDSOURCE", edge["id"], edge.get("name", ""), "error",
+                           "Only edges leaving a decision node may have guards"))
+
+
+def check_object_flow_ends(activity, index, issues):
+    """OBJECTFLOWENDS: object flows go pin to pin, not straight into actions."""
+    flow = analysis(activity, index, ActivityFlow)
+    for edge, source, target in flow.object_flows:
+        for end, field in ((source, "sourceRef"), (target, "targetRef")):
+            kind = None if end is None else flow.node_kind(end)
+            if kind is not None and kind not in OBJECT_FLOW_NODES:
+                issues.append(Issue("OBJECTFLOWENDS", edge["id"], edge.get("name", ""), "error",
+                                   f"Object flow {field} must be a pin, not the {kind} node "
+                                   f"{edge[field]}"))
+
+
+def check_activity_initial(activity, index, issues):
+    """ACTIVITYINITIAL: a diagrammed activity starts at one initial node with
+    one outgoing control flow."""
+    if not activity.get("diagrams"):
+        return
+    flow = analysis(activity, index, ActivityFlow)
+    initials = flow.by_kind.get("initial", [])
+    if len(initials) != 1:
+        issues.append(Issue("ACTIVITYINITIAL", activity["id"], activity.get("name", ""), "error",
+                           f"Activity must own one initial node (found {len(initials)})"))
+        return
+    flows = flow.outgoing[flow.number(initials[0])]
+    if len(flows) != 1 or flows[0].get("kind") != "controlFlow":
+        issues.append(Issue("ACTIVITYINITIAL", activity["id"], activity.get("name", ""), "error",
+                           f"Initial node {initials[0]['id']} must have one outgoing control "
+                           f"flow (found {len(flows)} flow(s))"))
+
+
+def check_activity_final(activity, index, issues):
+    """ACTIVITYFINAL: a diagrammed activity ends."""
+    if activity.get("diagrams") and not analysis(activity, index, ActivityFlow).by_kind.get("activityFinal"):
+        issues.append(Issue("ACTIVITYFINAL", activity["id"], activity.get("name", ""), "error",
+                           "Activity must own an activity final node"))
+
+
+def check_final_incoming(activity, index, issues):
+    """ACTIVITYFINALINCOMING: one incoming control flow, no object flows."""
+    flow = analysis(activity, index, ActivityFlow)
+    for node in flow.by_kind.get("activityFinal", ()):
+        flows = flow.incoming[flow.number(node)]
+        objects = sum(edge.get("kind") == "objectFlow" for edge in flows)
+        if objects or len(flows) != 1:
+            issues.append(Issue("ACTIVITYFINALINCOMING", node["id"], node.get("name", ""), "error",
+                               f"Activity final must have one incoming control flow and no object "
+                               f"flows (found {len(flows) - objects} control, {objects} object)"))
+
+
+def check_edge_mismatch(activity, index, issues):
+    """ACTIVITYEDGEMISMATCH: every edge at a fork or decision is of one kind."""
+    flow = analysis(activity, index, ActivityFlow)
+    for node in flow.by_kind.get("fork", []) + flow.by_kind.get("decision", []):
+        number = flow.number(node)
+        kinds = sorted({edge.get("kind") for edge in flow.incoming[number] + flow.outgoing[number]} - {None})
+        if len(kinds) > 1:
+            issues.append(Issue("ACTIVITYEDGEMISMATCH", node["id"], node.get("name", ""), "error",
+                               f"Edges into and out of a {node['kind']} node must be of one kind "
+                               f"(found {', '.join(kinds)})"))
+
+
+def check_decision_coverage(activity, index, issues):
+    """GUARDCOVERAGE for every decision node."""
+    flow = analysis(activity, index, ActivityFlow)
+    for node in flow.by_kind.get("decision", ()):
+        check_guard_coverage(node, "Decision", "edge(s)", flow.outgoing[flow.number(node)], issues)
+
+
+def check_activity_reachability(activity, index, issues):
+    """ACTIVITYREACHABILITY: every node is reached from where tokens start
+    (with nothing to start from, ACTIVITYINITIAL speaks for diagrammed ones)."""
+    flow = analysis(activity, index, ActivityFlow)
+    reach = flow.reach()
+    if reach is None:
+        return
+    reached = reach[0]
+    for number, node in flow.own_nodes():
+        if not reached[number]:
+            issues.append(Issue("ACTIVITYREACHABILITY", node["id"], node.get("name", ""), "warning",
+                               f"Node is not reachable from the initial nodes of {activity['id']}"))
+
+
+def check_activity_dead_ends(activity, index, issues):
+    """ACTIVITYDEADEND: from every reached node a flow leads on to a final one."""
+    flow = analysis(activity, index, ActivityFlow)
+    reach = flow.reach()
+    if reach is None or reach[1] is None:
+        return
+    reached, finishes = reach
+    for number, node in flow.own_nodes():
+        if reached[number] and not finishes[number]:
+            issues.append(Issue("ACTIVITYDEADEND", node["id"], node.get("name", ""), "warning",
+                               f"No flow leads from this node to a final node of {activity['id']}"))
+
+
+# ── State Machines ───────────────────────────────────────────────────────────
+
+def choices_of(machine):
+    """choice state ID → (state, transitions leaving it), in model order."""
+    choices, transitions = {}, []
+    for sub in iter_unit(machine):
+        if sub["_kind"] == "State" and sub.get("kind") == "choice":
+            choices[sub["id"]] = (sub, [])
+        elif sub["_kind"] == "Transition":
+            transitions.append(sub)
+    if choices:
+        for transition in transitions:
+            choice = choices.get(transition.get("sourceRef"))
+            if choice is not None:
+                choice[1].append(transition)
+    return choices
+
+
+def lay_out_choices(machine, index, issues):
+    """Not a rule: gathers the choices the machine's rules share."""
+    analysis(machine, index, choices_of)
+
+
+def check_transition_choice(machine, index, issues):
+    """TRANSITIONCHOICE: transitions leaving a choice must have guards."""
+    for _, leaving in analysis(machine, index, choices_of).values():
+        for transition in leaving:
+            if not guard_of(transition):
+                issues.append(Issue("TRANSITIONCHOICE", transition["id"], transition.get("name", ""),
+                                   "error", f"Transition leaving choice {transition['sourceRef']} "
+                                   f"must have a guard"))
+
+
+def check_choice_coverage(machine, index, issues):
+    """GUARDCOVERAGE for every choice state."""
+    for state, leaving in analysis(machine, index, choices_of).values():
+        check_guard_coverage(state, "Choice", "transition(s)", leaving, issues)
+
+
+def check_state_reachability(machine, issues):
+    """STATEREACHABILITY: every state must be reachable by transitions from an
+    initial state, taken to be the first state of each states list in the machine
+    (composite and orthogonal states are exempt: they are entered via substates)."""
+    graph, roots, transitions = FlowGraph(), [], []
+    for sub in iter_unit(machine):
+        if sub["_kind"] == "State":
+            graph.add(sub)
+        elif sub["_kind"] == "Transition":
+            transitions.append(sub)
+        first = (sub.get("states") or [None])[0]
+        if isinstance(first, dict) and "id" in first:
+            roots.append(first["id"])
+    numbers = graph.numbers
+    for transition in transitions:
+        source, target = numbers.get(transition.get("sourceRef")), numbers.get(transition.get("targetRef"))
+        if source is not None and target is not None:
+            graph.connect(source, target)
+    reached = graph.forward([numbers[r] for r in roots if r in numbers])
+    for number, state in enumerate(graph.elems):
+        if not reached[number] and state.get("kind") not in ENTERED_VIA_SUBSTATES:
+            issues.append(Issue("STATEREACHABILITY", state["id"], state.get("name", ""), "error",
+                               f"State is not reachable from the initial state of {machine['id']}"))
@@ -0,0 +1,97 @@
+"""
+SysMLcheap YAML Cache
+Parses YAML with the libyaml C loader when PyYAML was built with it, and
+keeps the parsed result of every file on disk so unchanged files skip
+parsing entirely.
+"""
+
+import hashlib
+import os
+import pickle
+import time
+from pathlib import Path
+
+import yaml
+
+# Everything the tools cache lives under one git-ignored directory.
+CACHE_ROOT = Path(__file__).resolve().parents[2] / ".sysmlcheap-cache"
+CACHE_DIR = CACHE_ROOT / "yaml"
+
+Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+# Part of every cache key: a different PyYAML or loader may parse differently.
+LOADER_VERSION = f"{yaml.__version__}/{Loader.__name__}/1"
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.parse_seconds = 0.0   # spent parsing on misses
+        self.saved_seconds = 0.0   # original parse time of hits, minus unpickling
+
+    def merge(self, other):
+        self.hits += other.hits
+        self.misses += other.misses
+        self.parse_seconds += other.parse_seconds
+        self.saved_seconds += other.saved_seconds
+
+    def summary(self):
+        total = self.hits + self.misses
+        if not total:
+            return "YAML cache: no files loaded"
+        return (f"YAML cache: {self.hits}/{total} hits ({self.hits / total:.0%}), "
+                f"{self.saved_seconds * 1000:.0f} ms parse time saved "
+                f"[{Loader.__name__}]")
+
+
+stats = CacheStats()
+
+
+def cache_file_for(path):
+    """One cache entry per source path; stale entries are simply overwritten."""
+    name = hashlib.sha256(str(Path(path).resolve()).encode()).hexdigest()[:24]
+    return CACHE_DIR / f"{name}.pickle"
+
+
+def load_yaml(path, use_cache=True):
+    """Parse a YAML file, reusing the cached result while its content is unchanged."""
+    raw = Path(path).read_bytes()
+    if not use_cache:
+        return parse(raw)
+    return load_bytes(raw, cache_file_for(path))
+
+
+def load_bytes(raw, cache_file):
+    """Parse YAML content, reusing the result held in cache_file if that was
+    parsed from the same content, and replacing it otherwise."""
+    key = hashlib.sha256(raw + LOADER_VERSION.encode()).hexdigest()
+    start = time.perf_counter()
+    try:
+        with open(cache_file, "rb") as f:
+            entry = pickle.load(f)
+        if entry["key"] == key:
+            stats.hits += 1
+            stats.saved_seconds += max(0.0, entry["parse_seconds"] - (time.perf_counter() - start))
+            return entry["data"]
+    except (OSError, pickle.PickleError, EOFError, KeyError, TypeError):
+        pass
+
+    start = time.perf_counter()
+    data = parse(raw)
+    elapsed = time.perf_counter() - start
+    stats.misses += 1
+    stats.parse_seconds += elapsed
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_file, "wb") as f:
+            pickle.dump({"key": key, "parse_seconds": elapsed, "data": data}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        pass  # read-only checkout: still works, just without caching
+    return data
+
+
+def parse(raw):
+    return yaml.load(raw, Loader=Loader)
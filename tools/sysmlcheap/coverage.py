@@ -0,0 +1,336 @@
+"""
+SysMLcheap Coverage
+Requirements traceability: which requirements are satisfied, verified or
+orphaned, directly or through the requirements derived from / refining them.
+
+The closure of derive/refine/satisfy/verify chains is computed once, bottom
+up over the strongly connected components of the derive/refine graph, and
+stored as one bitset per requirement (a Python int over the interned
+satisfier and test-case columns). Requirements in the same component share
+one bitset object. The matrix is cached on disk by a hash of its inputs, so
+an unchanged model skips the closure entirely.
+"""
+
+import csv
+import hashlib
+import html
+import json
+import os
+import pickle
+from array import array
+
+from . import cache, profile
+from .graph import csr, strongly_connected_components
+from .model import DEFAULT_STATUS
+
+TRACE_FORMAT = 1  # bump whenever TraceMatrix's pickled shape changes
+
+
+class TraceMatrix:
+    """Requirements × (satisfying elements + test cases).
+
+    A row's closure is a set of columns held one of two ways: an int bitset
+    when it is dense, or a frozenset of column numbers when it is sparse. An
+    int costs a bit per column up to its highest one, so a row with two links
+    to late columns would otherwise cost kilobytes; rows derived from by most
+    of the model are where bitsets pay off.
+    """
+
+    def __init__(self, rows, cols, verifies, direct, closure):
+        self.rows = rows          # row → requirement ID, model order
+        self.cols = cols          # column → satisfying element or test case ID
+        self.verifies = verifies  # bytearray: column → 1 for a test case
+        self.direct = direct      # row → sorted tuple of its own link columns
+        self.closure = closure    # row → columns including everything derived from it
+        self._verify_mask = None  # int bitset of the test-case columns, built on first use
+
+    def __getstate__(self):
+        return {**self.__dict__, "_verify_mask": None}
+
+    def counts(self, row):
+        """(satisfier count, verifier count) over a row's closure."""
+        cover = self.closure[row]
+        if isinstance(cover, int):
+            if self._verify_mask is None:
+                self._verify_mask = bitset(
+                    [col for col, flag in enumerate(self.verifies) if flag], len(self.cols))
+            verify = (cover & self._verify_mask).bit_count()
+            return cover.bit_count() - verify, verify
+        verify = sum(self.verifies[col] for col in cover)
+        return len(cover) - verify, verify
+
+    def split(self, columns):
+        """(satisfier IDs, verifier IDs) for a list of columns."""
+        satisfiers, verifiers = [], []
+        for col in columns:
+            (verifiers if self.verifies[col] else satisfiers).append(self.cols[col])
+        return satisfiers, verifiers
+
+
+# ── Building ─────────────────────────────────────────────────────────────────
+
+def gather(model):
+    """The matrix inputs: requirement rows, columns and edges, in model order."""
+    rows, row_of = [], {}
+    for req in model.get("requirements", ()):
+        if req["id"] not in row_of:  # a duplicate ID is the uniqueness rule's problem
+            row_of[req["id"]] = len(rows)
+            rows.append(req["id"])
+    cols, col_of = [], {}
+    verifies = bytearray()
+
+    def column(elem_id, verify):
+        col = col_of.get(elem_id)
+        if col is None:
+            col = col_of[elem_id] = len(cols)
+            cols.append(elem_id)
+            verifies.append(verify)
+        return col
+
+    links = [[] for _ in rows]  # row → [column]
+    # Edges parent row → child row, where the child derives from / refines the parent.
+    parents, children = array("l"), array("l")
+    for req in model.get("requirements", ()):
+        row = row_of[req["id"]]
+        for ref_id in req.get("satisfiedByRefs") or ():
+            links[row].append(column(ref_id, False))
+        for ref_id in req.get("verifiedByRefs") or ():
+            links[row].append(column(ref_id, True))
+        for field in ("deriveRefs", "refineRefs"):
+            for ref_id in req.get(field) or ():
+                parent = row_of.get(ref_id)
+                if parent is not None:
+                    parents.append(parent)
+                    children.append(row)
+    for test in model.get("testCases", ()):
+        for ref_id in test.get("verifiesRefs") or ():
+            if ref_id in row_of:
+                links[row_of[ref_id]].append(column(test["id"], True))
+    return rows, cols, verifies, links, (parents, children)
+
+
+DENSE = 256  # a closure holding ≥ 1/DENSE of all columns is kept as an int bitset
+
+
+def close(n, n_cols, links, edges):
+    """(direct, closure) per row. Components of the parent → child graph are
+    finished children first, so each component unions in the closures of
+    components already done: one pass, one closure object per component."""
+    direct = [tuple(sorted(set(cols))) for cols in links]
+
+    offsets, targets = csr(n, *edges)
+    component = strongly_connected_components(offsets, targets)
+    n_components = max(component, default=-1) + 1
+
+    # Counting sort rows by component.
+    starts = array("l", bytes(array("l").itemsize * (n_components + 1)))
+    for c in component:
+        starts[c + 1] += 1
+    for c in range(n_components):
+        starts[c + 1] += starts[c]
+    members = array("l", bytes(array("l").itemsize * n))
+    fill = array("l", starts)
+    for row, c in enumerate(component):
+        members[fill[c]] = row
+        fill[c] += 1
+
+    empty = frozenset()
+    done = [empty] * n_components
+    threshold = max(1, n_cols // DENSE)
+    for c in range(n_components):
+        sparse, dense = set(), 0
+        for row in members[starts[c]:starts[c + 1]]:
+            sparse.update(direct[row])
+            for child in targets[offsets[row]:offsets[row + 1]]:
+                below = done[component[child]]
+                if isinstance(below, int):
+                    dense |= below
+                elif below:
+                    sparse |= below
+        if dense or len(sparse) >= threshold:
+            done[c] = dense | bitset(sparse, n_cols)
+        elif sparse:
+            done[c] = frozenset(sparse)
+    return direct, [done[c] for c in component]
+
+
+def bitset(columns, n_cols):
+    """Int with the given bits set, built through a bytearray in one pass."""
+    if not columns:
+        return 0
+    buf = bytearray((n_cols + 7) // 8)
+    for col in columns:
+        buf[col >> 3] |= 1 << (col & 7)
+    return int.from_bytes(buf, "little")
+
+
+def build_matrix(model, use_cache=True):
+    """The traceability matrix for a model, from the on-disk cache when its
+    inputs are unchanged."""
+    with profile.span("phase", "trace.gather") as span:
+        rows, cols, verifies, links, edges = gather(model)
+        span.elements = len(rows)
+        digest = hashlib.sha256(pickle.dumps(
+            (TRACE_FORMAT, DENSE, rows, cols, verifies, links, edges), protocol=4)).hexdigest()[:24]
+    cache_file = cache.CACHE_ROOT / f"trace-{digest}.pickle"
+    if use_cache:
+        try:
+            with open(cache_file, "rb") as f:
+                return pickle.load(f)
+        except (OSError, pickle.PickleError, EOFError):
+            pass
+    with profile.span("phase", "trace.closure") as span:
+        direct, closure = close(len(rows), len(cols), links, edges)
+        span.elements = len(rows)
+    matrix = TraceMatrix(rows, cols, verifies, direct, closure)
+    if use_cache:
+        try:
+            cache.CACHE_ROOT.mkdir(exist_ok=True)
+            tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_file, "wb") as f:
+                pickle.dump(matrix, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, cache_file)
+            for stale in cache.CACHE_ROOT.glob("trace-*.pickle"):
+                if stale != cache_file:
+                    stale.unlink(missing_ok=True)
+        except OSError:
+            pass  # read-only checkout: recompute next time
+    return matrix
+
+
+# ── Coverage ─────────────────────────────────────────────────────────────────
+
+def coverage(matrix, model, index, statuses=None):
+    """One row dict per requirement whose status is in `statuses` (all if None).
+
+    satisfied / verified: a satisfy / verify link on the requirement itself
+    or on any requirement derived from or refining it, transitively.
+    orphaned: nothing upstream, i.e. no trace to a source, no derive or refine
+    parent and no use case tracing to it.
+    """
+    reqs = {}
+    for req in model.get("requirements", ()):
+        reqs.setdefault(req["id"], req)
+    for row, req_id in enumerate(matrix.rows):
+        req = reqs[req_id]
+        status = req.get("status") or DEFAULT_STATUS
+        if statuses and status not in statuses:
+            continue
+        satisfiers, verifiers = matrix.split(matrix.direct[row])
+        n_satisfy, n_verify = matrix.counts(row)
+        yield {
+            "id": req_id,
+            "name": req.get("name", ""),
+            "status": status,
+            "kind": req.get("kind", ""),
+            "satisfied": n_satisfy > 0,
+            "verified": n_verify > 0,
+            "orphaned": not (req.get("traceRefs") or req.get("deriveRefs") or req.get("refineRefs")
+                             or index.referrers(req_id, "traceRefs")),
+            "satisfiedBy": satisfiers,
+            "verifiedBy": verifiers,
+            "inheritedSatisfiers": n_satisfy - len(satisfiers),
+            "inheritedVerifiers": n_verify - len(verifiers),
+        }
+
+
+def new_totals():
+    return {"requirements": 0, "satisfied": 0, "verified": 0, "orphaned": 0}
+
+
+def counted(rows, totals):
+    """Pass rows through, counting requirements, satisfied, verified and
+    orphaned into `totals` on the way."""
+    for row in rows:
+        totals["requirements"] += 1
+        totals["satisfied"] += row["satisfied"]
+        totals["verified"] += row["verified"]
+        totals["orphaned"] += row["orphaned"]
+        yield row
+
+
+def summarize(rows):
+    totals = new_totals()
+    for _ in counted(rows, totals):
+        pass
+    return totals
+
+
+# ── Reports ──────────────────────────────────────────────────────────────────
+# Each writer streams rows as coverage() yields them, so a 50k-requirement
+# report never holds more than one row at a time.
+
+REPORT_FORMATS = ("csv", "json", "html")
+CSV_FIELDS = ["id", "name", "status", "kind", "satisfied", "verified", "orphaned",
+              "satisfiedBy", "verifiedBy", "inheritedSatisfiers", "inheritedVerifiers"]
+
+
+def write_report(rows, out, fmt):
+    """Write coverage rows to the text stream `out` as csv, json or html;
+    returns the totals over the rows written."""
+    totals = new_totals()
+    rows = counted(rows, totals)
+    if fmt == "csv":
+        writer = csv.writer(out, lineterminator="\n")
+        writer.writerow(CSV_FIELDS)
+        for row in rows:
+            writer.writerow([csv_value(row[field]) for field in CSV_FIELDS])
+    elif fmt == "json":
+        out.write('{"requirements":[')
+        for i, row in enumerate(rows):
+            out.write(("," if i else "") + "\n" + json.dumps(row, ensure_ascii=False))
+        out.write('\n],"totals":' + json.dumps(totals) + "}\n")
+    elif fmt == "html":
+        out.write(HTML_HEAD)
+        for row in rows:
+            out.write(html_row(row))
+        out.write("</tbody></table>\n<p>" + ", ".join(f"{v} {k}" for k, v in totals.items())
+                  + "</p>\n</body></html>\n")
+    else:
+        raise ValueError(f"unknown report format: {fmt}")
+    return totals
+
+
+def csv_value(value):
+    if isinstance(value, list):
+        return " ".join(value)
+    if isinstance(value, bool):
+        return "yes" if value else "no"
+    return value
+
+
+def html_row(row):
+    def flag(ok, text):
+        return f'<td class="{"yes" if ok else "no"}">{text}</td>'
+
+    def links(ids, inherited):
+        text = html.escape(", ".join(ids))
+        if inherited:
+            text += f" (+{inherited} via derived)"
+        return f"<td>{text}</td>"
+
+    return ("<tr>"
+            f'<td><code>{html.escape(row["id"])}</code></td>'
+            f'<td>{html.escape(row["name"])}</td>'
+            f'<td>{html.escape(row["status"])}</td>'
+            + flag(row["satisfied"], "✓" if row["satisfied"] else "✗")
+            + flag(row["verified"], "✓" if row["verified"] else "✗")
+            + flag(not row["orphaned"], "orphaned" if row["orphaned"] else "✓")
+            + links(row["satisfiedBy"], row["inheritedSatisfiers"])
+            + links(row["verifiedBy"], row["inheritedVerifiers"])
+            + "</tr>\n")
+
+
+HTML_HEAD = """<!doctype html>
+<html><head><meta charset="utf-8"><title>Requirements Traceability</title>
+<style>
+body { font-family: sans-serif; margin: 2em; }
+table { border-collapse: collapse; }
+th, td { border: 1px solid #d0d7de; padding: 4px 8px; text-align: left; vertical-align: top; }
+th { background: #f6f8fa; }
+.yes { color: #1a7f37; } .no { color: #cf222e; }
+</style></head><body>
+<h1>Requirements Traceability</h1>
+<table><thead><tr><th>ID</th><th>Name</th><th>Status</th><th>Satisfied</th><th>Verified</th>
+<th>Upstream</th><th>Satisfied by</th><th>Verified by</th></tr></thead><tbody>
+"""
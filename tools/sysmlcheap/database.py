@@ -0,0 +1,299 @@
+"""
+SysMLcheap Database
+The model mirrored into SQLite, for ad-hoc questions ("logical blocks under
+pkg_logical with no documentation") without re-parsing every YAML file.
+
+Tables:
+
+  files           model file → content hash at its last sync
+  elements        one row per element, nested ones included (parent set),
+                  with the commonly queried fields as columns and the
+                  element's own fields as JSON in `data`
+  ref_<field>     one edge table per relationship field (ownerRef,
+                  traceRefs, typeRef, ...): source, target, position
+  refs            view over every ref_<field> table, with a `field` column
+  search          FTS5 index over name, documentation and text
+
+sync() only rewrites the rows of files whose content hash changed, so
+keeping the database current costs one hash per file.
+"""
+
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+
+from . import cache, profile
+from .model import (
+    DEFAULT_STATUS, KIND_MAP, NESTED_KINDS, REVERSE_REFS, iter_unit, load_file, tag_element,
+)
+
+SCHEMA_VERSION = 1  # bump whenever the tables change; older databases are rebuilt
+DEFAULT_DB = cache.CACHE_ROOT / "model.sqlite"
+
+TABLES = """
+CREATE TABLE files (path TEXT PRIMARY KEY, digest TEXT NOT NULL);
+CREATE TABLE elements (
+    id TEXT NOT NULL, kind TEXT NOT NULL, model_key TEXT NOT NULL,
+    parent TEXT, owner TEXT, file TEXT NOT NULL,
+    name TEXT, status TEXT, stereotype TEXT, documentation TEXT, text TEXT,
+    data TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE search USING fts5 (
+    name, documentation, text, content='elements', content_rowid='rowid'
+);
+"""
+
+# Created after the rows on a full rebuild: bulk-loading into unindexed
+# tables and indexing once is several times faster than indexing per row.
+INDEXES = """
+CREATE INDEX elements_id ON elements (id);
+CREATE INDEX elements_kind ON elements (kind, stereotype);
+CREATE INDEX elements_owner ON elements (owner, kind);
+CREATE INDEX elements_status ON elements (kind, status);
+CREATE INDEX elements_parent ON elements (parent);
+CREATE INDEX elements_file ON elements (file);
+CREATE TRIGGER elements_insert AFTER INSERT ON elements BEGIN
+    INSERT INTO search (rowid, name, documentation, text)
+    VALUES (new.rowid, new.name, new.documentation, new.text);
+END;
+CREATE TRIGGER elements_delete AFTER DELETE ON elements BEGIN
+    INSERT INTO search (search, rowid, name, documentation, text)
+    VALUES ('delete', old.rowid, old.name, old.documentation, old.text);
+END;
+"""
+
+
+def connect(db_path=DEFAULT_DB, rebuild=False):
+    """Open the database for writing, creating it (or recreating it, when its
+    schema is outdated or `rebuild` is set) as needed. A recreated database
+    has no indexes yet; add_indexes() finishes it."""
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    if rebuild or conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+        conn.close()
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+        conn = sqlite3.connect(db_path)
+        conn.executescript(TABLES)
+        for field in ("ownerRef",) + REVERSE_REFS:  # always present, for the named queries
+            create_ref_table(conn, field, indexed=False)
+        rebuild_refs_view(conn)
+        conn.commit()  # user_version stays 0 until add_indexes()
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    return conn
+
+
+def add_indexes(conn):
+    """Index a bulk-loaded database, fill the search index and mark it current."""
+    conn.executescript(INDEXES)
+    for field in ref_fields(conn):
+        index_ref_table(conn, field)
+    conn.execute("INSERT INTO search (search) VALUES ('rebuild')")
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+
+def connect_readonly(db_path=DEFAULT_DB):
+    """Open the database so that ad-hoc queries cannot change it."""
+    return sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+
+
+def ref_fields(conn):
+    return [name[len("ref_"):] for (name,) in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'ref\\_%' ESCAPE '\\' "
+        "ORDER BY name")]
+
+
+def create_ref_table(conn, field, indexed=True):
+    conn.execute(f"CREATE TABLE IF NOT EXISTS ref_{field} "
+                 "(source TEXT NOT NULL, target TEXT NOT NULL, position INTEGER, file TEXT NOT NULL)")
+    if indexed:
+        index_ref_table(conn, field)
+
+
+def index_ref_table(conn, field):
+    conn.execute(f"CREATE INDEX IF NOT EXISTS ref_{field}_source ON ref_{field} (source)")
+    conn.execute(f"CREATE INDEX IF NOT EXISTS ref_{field}_target ON ref_{field} (target)")
+    conn.execute(f"CREATE INDEX IF NOT EXISTS ref_{field}_file ON ref_{field} (file)")
+
+
+def rebuild_refs_view(conn):
+    fields = ref_fields(conn)
+    conn.execute("DROP VIEW IF EXISTS refs")
+    if not fields:
+        conn.execute("CREATE VIEW refs (field, source, target, position) AS "
+                     "SELECT NULL, NULL, NULL, NULL WHERE 0")
+        return
+    conn.execute("CREATE VIEW refs (field, source, target, position) AS "
+                 + " UNION ALL ".join(f"SELECT '{field}', source, target, position FROM ref_{field}"
+                                      for field in fields))
+
+
+# ── Sync ─────────────────────────────────────────────────────────────────────
+
+def own_fields(elem):
+    """An element's own fields: no loader tags, no nested element lists."""
+    return {key: value for key, value in elem.items()
+            if not key.startswith("_") and not (key in NESTED_KINDS and isinstance(value, list))}
+
+
+def file_rows(path, data):
+    """(element rows, field → edge rows) for one parsed model file."""
+    elements, edges = [], {}
+    for key, kind in KIND_MAP.items():
+        for elem in data.get(key) or ():
+            if not isinstance(elem, dict) or "id" not in elem:
+                continue
+            tag_element(elem, kind)
+            for unit in iter_unit(elem):
+                own = own_fields(unit)
+                parent = unit.get("_owner")
+                elements.append((
+                    unit["id"], unit["_kind"], key if parent is None else nested_key(unit),
+                    parent, own.get("ownerRef"), path,
+                    own.get("name"), own.get("status") or DEFAULT_STATUS, own.get("stereotype"),
+                    own.get("documentation"), own.get("text"),
+                    json.dumps(own, ensure_ascii=False, default=str),
+                ))
+                for field, refs in own.items():
+                    if not refs or not field.endswith(("Ref", "Refs")) or not field.isidentifier():
+                        continue
+                    rows = edges.setdefault(field, [])
+                    for position, target in enumerate((refs,) if isinstance(refs, str) else refs):
+                        if isinstance(target, str):
+                            rows.append((unit["id"], target, position, path))
+    return elements, edges
+
+
+_NESTED_KEY_OF = {kind: key for key, kind in NESTED_KINDS.items()}
+
+
+def nested_key(unit):
+    return _NESTED_KEY_OF.get(unit["_kind"], unit["_kind"])
+
+
+def sync(model_dir, db_path=DEFAULT_DB):
+    """Bring the database in line with model_dir; returns (files rewritten,
+    files removed, elements in the database)."""
+    conn = connect(db_path)
+    try:
+        with profile.span("phase", "db.scan") as span:
+            known = dict(conn.execute("SELECT path, digest FROM files"))
+            current = {}
+            for yaml_file in sorted(Path(model_dir).resolve().glob("*.yaml")):
+                current[str(yaml_file)] = hashlib.sha256(yaml_file.read_bytes()).hexdigest()
+            changed = [path for path, digest in current.items() if known.get(path) != digest]
+            removed = [path for path in known if path not in current]
+            span.elements = len(current)
+
+        # Rewriting most of the model: start from empty, unindexed tables.
+        full = len(changed) * 2 >= len(current) and (changed or removed)
+        if full:
+            conn.close()
+            conn = connect(db_path, rebuild=True)
+            changed = list(current)
+
+        if changed or removed:
+            with profile.span("phase", "db.write") as span, conn:
+                fields = set(ref_fields(conn))
+                fields_before = set(fields)
+                for path in ([] if full else changed + removed):
+                    conn.execute("DELETE FROM elements WHERE file = ?", (path,))
+                    for field in fields:
+                        conn.execute(f"DELETE FROM ref_{field} WHERE file = ?", (path,))
+                    conn.execute("DELETE FROM files WHERE path = ?", (path,))
+                for path in changed:
+                    elements, edges = file_rows(path, load_file(path))
+                    conn.executemany("INSERT INTO elements (id, kind, model_key, parent, owner, file, "
+                                     "name, status, stereotype, documentation, text, data) "
+                                     "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", elements)
+                    for field, rows in edges.items():
+                        if field not in fields:
+                            create_ref_table(conn, field, indexed=not full)
+                            fields.add(field)
+                        conn.executemany(f"INSERT INTO ref_{field} VALUES (?, ?, ?, ?)", rows)
+                    conn.execute("INSERT INTO files VALUES (?, ?)", (path, current[path]))
+                    span.elements += len(elements)
+                if fields != fields_before:
+                    rebuild_refs_view(conn)
+                if full:
+                    add_indexes(conn)
+            conn.execute("PRAGMA optimize")
+        total = conn.execute("SELECT count(*) FROM elements").fetchone()[0]
+        return len(changed), len(removed), total
+    finally:
+        conn.close()
+
+
+# ── Queries ──────────────────────────────────────────────────────────────────
+# Named queries: name → (description, SQL with :named parameters, defaults).
+
+PACKAGE_TREE = """WITH RECURSIVE tree(id) AS (
+    SELECT :package UNION
+    SELECT e.id FROM elements e JOIN tree ON e.owner = tree.id WHERE e.kind = 'Package'
+)"""
+
+QUERIES = {
+    "undocumented": (
+        "blocks of a stereotype anywhere under a package with no documentation",
+        PACKAGE_TREE + """
+SELECT id, name, owner FROM elements
+WHERE kind = 'Block' AND (:stereotype = '' OR stereotype = :stereotype)
+  AND owner IN tree AND coalesce(trim(documentation), '') = ''
+ORDER BY id""",
+        {"package": "pkg_logical", "stereotype": "logical"},
+    ),
+    "contents": (
+        "every element anywhere under a package",
+        PACKAGE_TREE + """
+SELECT id, kind, name, owner FROM elements WHERE owner IN tree ORDER BY kind, id""",
+        {"package": "pkg_logical"},
+    ),
+    "search": (
+        "full-text search over names, documentation and requirement text",
+        """SELECT e.id, e.kind, e.name, snippet(search, -1, '[', ']', '…', 10) AS match
+FROM search JOIN elements e ON e.rowid = search.rowid
+WHERE search MATCH :terms ORDER BY rank LIMIT 50""",
+        {},
+    ),
+    "referrers": (
+        "everything that references an element, by relationship field",
+        """SELECT r.field, r.source, e.kind, e.name FROM refs r
+LEFT JOIN elements e ON e.id = r.source WHERE r.target = :id ORDER BY r.field, r.source""",
+        {},
+    ),
+    "dangling": (
+        "references to IDs no element defines",
+        """SELECT r.field, r.source, r.target FROM refs r
+WHERE NOT EXISTS (SELECT 1 FROM elements e WHERE e.id = r.target) ORDER BY r.source""",
+        {},
+    ),
+    "unsatisfied": (
+        "requirements no element satisfies, optionally of one status",
+        """SELECT id, name, status FROM elements e
+WHERE kind = 'Requirement' AND (:status = '' OR status = :status)
+  AND NOT EXISTS (SELECT 1 FROM ref_satisfiedByRefs r WHERE r.source = e.id)
+ORDER BY id""",
+        {"status": ""},
+    ),
+    "kinds": (
+        "element count per kind and status",
+        "SELECT kind, status, count(*) AS elements FROM elements GROUP BY kind, status ORDER BY kind, status",
+        {},
+    ),
+}
+
+
+def run_query(conn, query, params=None):
+    """Run a named query or ad-hoc SQL: returns (column names, rows)."""
+    params = dict(params or {})
+    if query in QUERIES:
+        _, sql, defaults = QUERIES[query]
+        params = {**defaults, **params}
+    else:
+        sql = query
+    cursor = conn.execute(sql, params)
+    columns = [d[0] for d in cursor.description or ()]
+    return columns, cursor.fetchall()
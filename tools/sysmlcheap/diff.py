@@ -0,0 +1,385 @@
+"""
+SysMLcheap Model Diff
+Structural diff of the model between two git revisions, or a revision and
+the working tree, read straight from git's object database with one
+`git cat-file --batch` (no checkouts). Files whose blob IDs match are skipped
+unread; elements of the other files are compared by Merkle hash (own fields,
+then the hashes of the elements nested in them), so an unchanged subtree is
+never walked. The changes are then followed back through every reference to
+the requirements, use cases and diagrams they reach.
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+from collections import defaultdict
+from pathlib import Path
+
+from . import cache, profile
+from .model import KIND_MAP, NESTED_KINDS, iter_unit, tag_element
+
+WORKTREE = None  # the "revision" that is the model files on disk
+# References the impact walk does not follow back: whatever a package owns
+# does not depend on the package.
+UNFOLLOWED = frozenset({"ownerRef"})
+IMPACT_KINDS = ("Requirement", "UseCase")
+
+
+# ── Revisions ────────────────────────────────────────────────────────────────
+
+def git(root, *args, stdin=None):
+    result = subprocess.run(["git", "-C", str(root), *args], input=stdin, capture_output=True)
+    if result.returncode:
+        raise RuntimeError(result.stderr.decode(errors="replace").strip()
+                           or f"git {args[0]} failed")
+    return result.stdout
+
+
+def blob_id(raw):
+    """The ID git gives a blob with this content."""
+    return hashlib.sha1(b"blob %d\0" % len(raw) + raw).hexdigest()
+
+
+def read_blobs(root, blob_ids):
+    """blob ID → content, for all of them through one `git cat-file --batch`."""
+    blob_ids = list(dict.fromkeys(blob_ids))
+    out = git(root, "cat-file", "--batch", stdin="".join(b + "\n" for b in blob_ids).encode())
+    blobs, pos = {}, 0
+    for blob in blob_ids:
+        end = out.index(b"\n", pos)
+        header = out[pos:end].split()
+        if len(header) != 3:
+            raise RuntimeError(f"git cat-file: {out[pos:end].decode(errors='replace')}")
+        size = int(header[2])
+        blobs[blob] = out[end + 1:end + 1 + size]
+        pos = end + 2 + size
+    return blobs
+
+
+class Revision:
+    """The model files of one revision: file name → blob ID, and their data."""
+
+    def __init__(self, model_dir, rev, side="new"):
+        model_dir = os.path.realpath(model_dir)
+        self.side = side  # each side of a diff keeps its own YAML cache entries
+        self.root = Path(git(model_dir, "rev-parse", "--show-toplevel").decode().strip())
+        self.model_dir = Path(model_dir)
+        self.rev = rev
+        self.label = "working tree" if rev is WORKTREE else rev
+        self.raw = {}
+        if rev is WORKTREE:
+            for yaml_file in sorted(self.model_dir.glob("*.yaml")):
+                self.raw[yaml_file.name] = yaml_file.read_bytes()
+            self.files = {name: blob_id(raw) for name, raw in self.raw.items()}
+            return
+        prefix = self.model_dir.relative_to(os.path.realpath(self.root)).as_posix()
+        prefix = "" if prefix == "." else prefix + "/"
+        self.files = {}
+        for entry in git(self.root, "ls-tree", "-z", rev, "--", prefix or ".").split(b"\0"):
+            if not entry:
+                continue
+            meta, _, path = entry.decode().partition("\t")
+            _, kind, blob = meta.split()
+            name = path[len(prefix):]
+            if kind == "blob" and path.startswith(prefix) and "/" not in name and name.endswith(".yaml"):
+                self.files[name] = blob
+
+    def load(self, names):
+        """file name → its model data (model key → elements), parsed through
+        the YAML cache: the working tree shares load_yaml's entries, and
+        revision files have one entry per path and side."""
+        names = sorted(names)
+        if self.rev is WORKTREE:
+            raws = {name: self.raw[name] for name in names}
+        else:
+            blobs = read_blobs(self.root, [self.files[name] for name in names])
+            raws = {name: blobs[self.files[name]] for name in names}
+        loaded = {}
+        for name, raw in raws.items():
+            path = self.model_dir / name
+            slot = cache.cache_file_for(path if self.rev is WORKTREE else f"{path}@{self.side}")
+            data = cache.load_bytes(raw, slot) or {}
+            loaded[name] = {key: data[key] for key in KIND_MAP if data.get(key)}
+        return loaded
+
+
+def units(loaded):
+    """top-level ID → (model key, element, file name), elements tagged."""
+    found = {}
+    for name in sorted(loaded):
+        for key, elems in loaded[name].items():
+            for elem in elems:
+                if isinstance(elem, dict) and "id" in elem:
+                    tag_element(elem, KIND_MAP[key])
+                    found[elem["id"]] = (key, elem, name)
+    return found
+
+
+# ── Hashing ──────────────────────────────────────────────────────────────────
+
+def own_fields(elem):
+    """An element's fields, without the elements nested in it or our tags."""
+    return {field: value for field, value in elem.items()
+            if field not in NESTED_KINDS and not field.startswith("_")}
+
+
+def digest(value):
+    text = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+
+def element_hash(elem, hashes):
+    """Merkle hash of an element and everything nested in it. Records
+    (own fields hash, subtree hash) per element ID in `hashes`."""
+    own = digest(own_fields(elem))
+    tree = hashlib.blake2b(own, digest_size=16)
+    for sub_key in NESTED_KINDS:
+        subs = elem.get(sub_key)
+        if not subs:
+            continue
+        tree.update(sub_key.encode())
+        for sub in subs:
+            tree.update(element_hash(sub, hashes) if isinstance(sub, dict) and "id" in sub
+                        else digest(sub))
+    tree = tree.digest()
+    hashes[elem["id"]] = (own, tree)
+    return tree
+
+
+def edges(elem):
+    """(field, target ID) of every reference an element makes."""
+    found = set()
+    for field, value in elem.items():
+        if value and field.endswith(("Ref", "Refs")):
+            for target in ((value,) if isinstance(value, str) else value):
+                if isinstance(target, str):
+                    found.add((field, target))
+    return found
+
+
+# ── Diff ─────────────────────────────────────────────────────────────────────
+
+class ModelDiff:
+    """Element and edge changes between two revisions, and their impact."""
+
+    def __init__(self, old, new):
+        self.old, self.new = old.label, new.label
+        self.files = {"changed": [], "added": [], "removed": [], "unchanged": 0}
+        self.added = []           # (id, kind, name)
+        self.removed = []
+        self.modified = []        # (id, kind, name, changed field names)
+        self.moved = []           # (id, old file, new file), top-level elements only
+        self.edges_added = []     # (source ID, field, target ID)
+        self.edges_removed = []
+        self.touched_keys = set()  # model keys of the top-level elements changed
+        self.requirements = []    # impacted, not themselves changed: (id, name)
+        self.use_cases = []
+        self.impacted = 0         # elements reached from the changes, changes excluded
+        self.diagrams = []        # output files whose inputs changed
+
+    @property
+    def changed_ids(self):
+        return [row[0] for rows in (self.added, self.removed, self.modified) for row in rows]
+
+    def to_dict(self):
+        return {
+            "old": self.old, "new": self.new, "files": self.files,
+            "added": [dict(zip(("id", "kind", "name"), row)) for row in self.added],
+            "removed": [dict(zip(("id", "kind", "name"), row)) for row in self.removed],
+            "modified": [dict(zip(("id", "kind", "name", "fields"), row)) for row in self.modified],
+            "moved": [dict(zip(("id", "from", "to"), row)) for row in self.moved],
+            "edgesAdded": [dict(zip(("source", "field", "target"), row)) for row in self.edges_added],
+            "edgesRemoved": [dict(zip(("source", "field", "target"), row)) for row in self.edges_removed],
+            "impact": {
+                "elements": self.impacted,
+                "requirements": [dict(zip(("id", "name"), row)) for row in self.requirements],
+                "useCases": [dict(zip(("id", "name"), row)) for row in self.use_cases],
+                "diagrams": self.diagrams,
+            },
+        }
+
+
+def compare(result, old_units, new_units):
+    """Fill result with the element and edge changes between two sets of units."""
+    old_flat, new_flat = {}, {}  # element ID → (element, model key of its top-level element)
+    old_hashes, new_hashes = {}, {}
+    for top_id in old_units.keys() | new_units.keys():
+        before, after = old_units.get(top_id), new_units.get(top_id)
+        if before and after:
+            if before[2] != after[2]:
+                result.moved.append((top_id, before[2], after[2]))
+            if element_hash(before[1], old_hashes) == element_hash(after[1], new_hashes):
+                continue
+        if before:
+            old_flat.update((sub["id"], (sub, before[0])) for sub in iter_unit(before[1]))
+        if after:
+            new_flat.update((sub["id"], (sub, after[0])) for sub in iter_unit(after[1]))
+
+    for elem_id in sorted(old_flat.keys() | new_flat.keys()):
+        before, after = old_flat.get(elem_id), new_flat.get(elem_id)
+        if before is None:
+            sub = after[0]
+            result.added.append((elem_id, sub["_kind"], sub.get("name", "")))
+            old_edges, new_edges = set(), edges(sub)
+        elif after is None:
+            sub = before[0]
+            result.removed.append((elem_id, sub["_kind"], sub.get("name", "")))
+            old_edges, new_edges = edges(sub), set()
+        else:
+            if elem_id not in old_hashes:
+                element_hash(before[0], old_hashes)
+            if elem_id not in new_hashes:
+                element_hash(after[0], new_hashes)
+            if old_hashes[elem_id][0] == new_hashes[elem_id][0]:
+                continue
+            old_own, new_own = own_fields(before[0]), own_fields(after[0])
+            fields = sorted(field for field in old_own.keys() | new_own.keys()
+                            if old_own.get(field) != new_own.get(field))
+            sub = after[0]
+            result.modified.append((elem_id, sub["_kind"], sub.get("name", ""), fields))
+            old_edges, new_edges = edges(before[0]), edges(sub)
+        result.touched_keys.update(side[1] for side in (before, after) if side)
+        result.edges_added += sorted((elem_id, field, target) for field, target in new_edges - old_edges)
+        result.edges_removed += sorted((elem_id, field, target) for field, target in old_edges - new_edges)
+    result.moved.sort()
+
+
+# ── Impact ───────────────────────────────────────────────────────────────────
+
+def reference_index(loaded):
+    """(element ID → (model key, top-level ID, element), target ID → IDs of the
+    elements referencing it) over every element of loaded files, nested ones
+    included, and every ref field except UNFOLLOWED."""
+    where, reverse = {}, defaultdict(list)
+    for name in sorted(loaded):
+        for key, elems in loaded[name].items():
+            for elem in elems:
+                if not isinstance(elem, dict) or "id" not in elem:
+                    continue
+                top_id = elem["id"]
+                for sub in iter_unit(elem):
+                    sub_id = sub["id"]
+                    where[sub_id] = (key, top_id, sub)
+                    for field, value in sub.items():
+                        if not value or not field.endswith(("Ref", "Refs")) or field in UNFOLLOWED:
+                            continue
+                        if isinstance(value, str):
+                            reverse[value].append(sub_id)
+                        else:
+                            for target in value:
+                                if isinstance(target, str):
+                                    reverse[target].append(sub_id)
+    return where, reverse
+
+
+def analyse_impact(result, loaded, diagrams):
+    """Walk the reverse references of the new revision back from every changed
+    element: everything reached is impacted. Requirements and use cases end
+    the walk (they are what the change is reported against; following their
+    trace links onward would reach every requirement), and so does the far
+    end of an edge that appeared or went away. A diagram's inputs changed
+    when it iterates the model key of a changed element or of one
+    referencing it."""
+    where, reverse = reference_index(loaded)
+
+    def reported(elem_id):
+        key, top_id, _ = where[elem_id]
+        return top_id == elem_id and KIND_MAP[key] in IMPACT_KINDS
+
+    changed = set(result.changed_ids)
+    keys = set(result.touched_keys)
+    seen = set(changed)
+    for _, field, target in result.edges_added + result.edges_removed:
+        if field not in UNFOLLOWED and target in where:
+            seen.update((target, where[target][1]))
+    stack = list(changed)
+    while stack:
+        elem_id = stack.pop()
+        for ref_id in reverse.get(elem_id, ()):
+            key, top_id, _ = where[ref_id]
+            if elem_id in changed:
+                keys.add(key)
+            for reached in (ref_id, top_id):
+                if reached not in seen:
+                    seen.add(reached)
+                    if not reported(reached):
+                        stack.append(reached)
+
+    reached = sorted(seen - changed)
+    result.impacted = len(reached)
+    for kind, rows in zip(IMPACT_KINDS, (result.requirements, result.use_cases)):
+        rows += [(elem_id, where[elem_id][2].get("name", "")) for elem_id in reached
+                 if where[elem_id][1] == elem_id and KIND_MAP[where[elem_id][0]] == kind]
+    result.diagrams = [filename for filename, diagram_keys in diagrams if keys.intersection(diagram_keys)]
+
+
+def diff(model_dir, old_rev="HEAD", new_rev=WORKTREE, diagrams=()):
+    """ModelDiff between two revisions of a model directory; `diagrams` is
+    (output file, model keys it iterates) per diagram to check for impact.
+
+    Raises RuntimeError when git cannot read a revision.
+    """
+    with profile.span("phase", "diff.files") as span:
+        old, new = Revision(model_dir, old_rev, "old"), Revision(model_dir, new_rev, "new")
+        result = ModelDiff(old, new)
+        for name in sorted(old.files.keys() | new.files.keys()):
+            if name not in old.files:
+                result.files["added"].append(name)
+            elif name not in new.files:
+                result.files["removed"].append(name)
+            elif old.files[name] != new.files[name]:
+                result.files["changed"].append(name)
+            else:
+                result.files["unchanged"] += 1
+        changed = result.files["changed"] + result.files["added"] + result.files["removed"]
+        span.elements = len(changed)
+    with profile.span("phase", "diff.compare") as span:
+        old_units = units(old.load(name for name in changed if name in old.files))
+        new_loaded = new.load(new.files)
+        new_units = units({name: new_loaded[name] for name in changed if name in new.files})
+        compare(result, old_units, new_units)
+        span.elements = len(result.changed_ids)
+    with profile.span("phase", "diff.impact") as span:
+        if result.changed_ids:
+            analyse_impact(result, new_loaded, diagrams)
+        span.elements = result.impacted
+    return result
+
+
+# ── Report ───────────────────────────────────────────────────────────────────
+
+def print_report(result, out, limit=50):
+    """The human summary: changed files, elements and edges, then the impact;
+    each list cut at `limit` lines."""
+    def listing(title, rows, line):
+        if not rows:
+            return
+        print(f"{title} ({len(rows)}):", file=out)
+        for row in rows[:limit]:
+            print("  " + line(row), file=out)
+        if len(rows) > limit:
+            print(f"  … {len(rows) - limit} more (--format json lists all)", file=out)
+        print(file=out)
+
+    files = result.files
+    print(f"   {result.old} → {result.new}: {len(files['changed'])} files changed, "
+          f"{len(files['added'])} added, {len(files['removed'])} removed, "
+          f"{files['unchanged']} unchanged\n", file=out)
+    listing("➕ ADDED", result.added, lambda r: f"[{r[1]}] {r[0]}  {r[2]}")
+    listing("➖ REMOVED", result.removed, lambda r: f"[{r[1]}] {r[0]}  {r[2]}")
+    listing("✏️  MODIFIED", result.modified, lambda r: f"[{r[1]}] {r[0]}  {r[2]}  ({', '.join(r[3])})")
+    listing("🚚 MOVED", result.moved, lambda r: f"{r[0]}  {r[1]} → {r[2]}")
+    listing("🔗 EDGES ADDED", result.edges_added, lambda r: f"{r[0]} {r[1]} → {r[2]}")
+    listing("✂️  EDGES REMOVED", result.edges_removed, lambda r: f"{r[0]} {r[1]} → {r[2]}")
+    if not result.changed_ids:
+        print("✅ No model elements changed.", file=out)
+        return
+    print(f"🎯 IMPACT: {result.impacted} more elements reached through references\n", file=out)
+    listing("   Requirements", result.requirements, lambda r: f"{r[0]}  {r[1]}")
+    listing("   Use cases", result.use_cases, lambda r: f"{r[0]}  {r[1]}")
+    listing("   Diagrams with changed inputs", result.diagrams, str)
+    print("─" * 60, file=out)
+    print(f"   +{len(result.added)} added | -{len(result.removed)} removed | "
+          f"~{len(result.modified)} modified | {len(result.edges_added)} edges added, "
+          f"{len(result.edges_removed)} removed", file=out)
@@ -0,0 +1,195 @@
+"""
+SysMLcheap Graphs
+Whole-graph reasoning over one relationship type at a time: strongly
+connected components (so cycles), reachability and tree walks, each in time
+linear in nodes plus edges. Everything is iterative, so a 100k-deep package
+tree or generalization chain never meets Python's recursion limit.
+"""
+
+from array import array
+from collections import Counter
+
+
+class Graph:
+    """Directed graph over interned element IDs, edges held in CSR arrays
+    (targets of node v are targets[offsets[v]:offsets[v + 1]]) so that even a
+    graph of millions of edges allocates no per-node objects."""
+
+    def __init__(self):
+        self.ids = []               # node number → element ID
+        self.numbers = {}           # element ID → node number
+        self._sources = array("l")  # edges as added, until the CSR is built
+        self._targets = array("l")
+        self._csr = None
+
+    @classmethod
+    def from_elements(cls, elems, fields):
+        """One node per element, one edge per reference in `fields` to another
+        of the elements (references leaving the set are ignored)."""
+        graph = cls()
+        elems = list(elems)
+        for elem in elems:
+            graph.add_node(elem["id"])
+        numbers, sources, targets = graph.numbers, graph._sources, graph._targets
+        for elem in elems:
+            for field in fields:
+                refs = elem.get(field)
+                if not refs:
+                    continue
+                source = numbers[elem["id"]]
+                for ref_id in ((refs,) if isinstance(refs, str) else refs):
+                    target = numbers.get(ref_id)
+                    if target is not None:
+                        sources.append(source)
+                        targets.append(target)
+        return graph
+
+    def add_node(self, elem_id):
+        number = self.numbers.get(elem_id)
+        if number is None:
+            number = self.numbers[elem_id] = len(self.ids)
+            self.ids.append(elem_id)
+            self._csr = None
+        return number
+
+    def add_edge(self, source_id, target_id):
+        """Add an edge between two existing nodes; False if either is not a node."""
+        source, target = self.numbers.get(source_id), self.numbers.get(target_id)
+        if source is None or target is None:
+            return False
+        self._sources.append(source)
+        self._targets.append(target)
+        self._csr = None
+        return True
+
+    @property
+    def edges(self):
+        """(offsets, targets) CSR adjacency."""
+        if self._csr is None:
+            self._csr = csr(len(self.ids), self._sources, self._targets)
+        return self._csr
+
+    def cycles(self):
+        """Element IDs of every cycle, one list per strongly connected component."""
+        return [[self.ids[n] for n in cycle] for cycle in cycles(*self.edges)]
+
+    def reachable(self, root_ids):
+        """Set of element IDs reachable from the given roots (roots included)."""
+        roots = [self.numbers[r] for r in root_ids if r in self.numbers]
+        seen = reachable(*self.edges, roots)
+        return {elem_id for elem_id, flag in zip(self.ids, seen) if flag}
+
+
+def csr(n, sources, targets):
+    """Counting-sort (source, target) pairs into CSR (offsets, targets) over n
+    nodes; each node's targets keep the order their edges were added in."""
+    offsets = array("l", bytes(array("l").itemsize * (n + 1)))
+    for s in sources:
+        offsets[s + 1] += 1
+    for i in range(n):
+        offsets[i + 1] += offsets[i]
+    fill = array("l", offsets)
+    values = array("l", bytes(array("l").itemsize * len(targets)))
+    for s, t in zip(sources, targets):
+        values[fill[s]] = t
+        fill[s] += 1
+    return offsets, values
+
+
+def strongly_connected_components(offsets, targets):
+    """Tarjan's algorithm without recursion: component number per node.
+
+    Components are numbered in the order Tarjan completes them, which is a
+    reverse topological order of the condensed graph.
+    """
+    n = len(offsets) - 1
+    order = array("l", [-1]) * n   # discovery order, -1 while unvisited
+    low = array("l", bytes(array("l").itemsize * n))
+    next_edge = array("l", offsets[:-1])  # per node: position in targets to resume from
+    component = array("l", [-1]) * n
+    on_stack = bytearray(n)
+    stack, work = array("l"), array("l")
+    counter = components = 0
+    for root in range(n):
+        if order[root] != -1:
+            continue
+        order[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = 1
+        work.append(root)
+        while work:
+            v = work[-1]
+            i = next_edge[v]
+            if i < offsets[v + 1]:
+                next_edge[v] = i + 1
+                w = targets[i]
+                if order[w] == -1:
+                    order[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = 1
+                    work.append(w)
+                elif on_stack[w] and order[w] < low[v]:
+                    low[v] = order[w]
+                continue
+            work.pop()
+            if work and low[v] < low[work[-1]]:
+                low[work[-1]] = low[v]
+            if low[v] == order[v]:
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = 0
+                    component[w] = components
+                    if w == v:
+                        break
+                components += 1
+    return component
+
+
+def cycles(offsets, targets):
+    """Nodes of every component that contains a cycle (two or more nodes, or a
+    self-loop), grouped per component and ordered by their lowest node."""
+    component = strongly_connected_components(offsets, targets)
+    sizes = Counter(component)
+    groups = {}
+    for v, c in enumerate(component):
+        if sizes[c] > 1 or v in targets[offsets[v]:offsets[v + 1]]:
+            groups.setdefault(c, []).append(v)
+    return list(groups.values())
+
+
+def reachable(offsets, targets, roots):
+    """Bytearray flagging every node reachable from roots."""
+    seen = bytearray(len(offsets) - 1)
+    stack = array("l")
+    for root in roots:
+        if not seen[root]:
+            seen[root] = 1
+            stack.append(root)
+    while stack:
+        v = stack.pop()
+        for w in targets[offsets[v]:offsets[v + 1]]:
+            if not seen[w]:
+                seen[w] = 1
+                stack.append(w)
+    return seen
+
+
+def walk_tree(roots, children):
+    """Depth-first ("enter", node, depth) / ("exit", node, depth) events over a
+    tree given as root nodes and a node → children function. A node is entered
+    at most once, so a malformed tree cannot loop."""
+    entered = set()
+    stack = [(node, 0, False) for node in reversed(roots)]
+    while stack:
+        node, depth, done = stack.pop()
+        if done:
+            yield "exit", node, depth
+            continue
+        if id(node) in entered:
+            continue
+        entered.add(id(node))
+        yield "enter", node, depth
+        stack.append((node, depth, True))
+        stack.extend((child, depth + 1, False) for child in reversed(children(node)))
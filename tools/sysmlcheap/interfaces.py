@@ -0,0 +1,229 @@
+"""
+SysMLcheap Interfaces
+Flow compatibility of connectors and the item flows they carry. A connector
+joins two proxy ports; what each end can send and receive follows from the
+flow properties of the interface block typing the port, swapped when the port
+is conjugated. Every signal's generalization closure and every interface
+block's flow signature is worked out once per engine, and verdicts are cached
+per pair of end signatures, so checking a connector is a few dict lookups
+however many connectors share the same interfaces. Each rule is a function of
+its own, run on the blocks owning the connectors and item flows.
+"""
+
+from .issues import Issue
+from .model import iter_refs
+
+LISTED = 4  # signals named in each issue's message
+
+
+def listing(ids):
+    listed = ", ".join(ids[:LISTED])
+    if len(ids) > LISTED:
+        listed += f", … ({len(ids) - LISTED} more)"
+    return listed
+
+
+class InterfaceEngine:
+    """The flow tables the connector and item flow rules share over one index.
+
+    An end is (interface block ID, conjugated); its signature is the pair
+    (signals it sends, signals it receives). An `out` flow property is sent
+    by a plain port and received by a conjugated one; an `inout` one goes
+    both ways. On a delegation connector (one whose end belongs to the block
+    that owns the connector) that end faces inwards, so it counts with its
+    conjugation reversed. A signal is received by an end that receives it or
+    any signal it specializes.
+
+    Everything is read through the index lazily and memoized, so an engine
+    over a RecordingIndex records exactly what its verdicts depended on. The
+    rules get theirs from index.derived, one per index.
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self._ancestors = {}   # signal ID → frozenset of it and every signal it specializes
+        self._signatures = {}  # interface block ID → (sent by a plain port, inout)
+        self._verdicts = {}    # (end, end) → (signals only the first end sends, ...second...)
+        self._conveys = {}     # (end, end, signal) → whether the signal flows between them
+        self._ends = {}        # connector ID → its ends, shared by the item flows it carries
+        self._realizers = {}   # item flow ID → IDs of the connectors realizing it
+
+    # ── Precomputed Tables ───────────────────────────────────────────────────
+
+    def ancestors(self, signal_id):
+        """signal_id and every signal it specializes, transitively. Members of
+        a generalization cycle (GENERALIZATIONCYCLE) see only the part of it
+        walked before the cycle closed."""
+        done = self._ancestors
+        if signal_id in done:
+            return done[signal_id]
+        active, stack = set(), [signal_id]
+        while stack:
+            sid = stack[-1]
+            if sid in done:
+                stack.pop()
+                continue
+            parents = iter_refs(self.index.get(sid) or {}, "generalizationRefs")
+            if sid not in active:
+                active.add(sid)
+                pending = [p for p in parents if p not in done and p not in active]
+                if pending:
+                    stack.extend(pending)
+                    continue
+            stack.pop()
+            closure = {sid}
+            for parent in parents:
+                closure.update(done.get(parent, (parent,)))
+            done[sid] = frozenset(closure)
+        return done[signal_id]
+
+    def signature(self, end):
+        """(signals sent, signals received) at an end."""
+        ib_id, conjugated = end
+        signature = self._signatures.get(ib_id)
+        if signature is None:
+            sends, both = set(), set()
+            for fp in self.index[ib_id].get("flowProperties") or ():
+                if isinstance(fp, dict) and fp.get("typeRef"):
+                    (both if fp.get("direction") == "inout" else sends).add(fp["typeRef"])
+            signature = self._signatures[ib_id] = (frozenset(sends | both), frozenset(both))
+        return signature[::-1] if conjugated else signature
+
+    def receives(self, end, signal_id):
+        return not self.ancestors(signal_id).isdisjoint(self.signature(end)[1])
+
+    def sends(self, end, signal_id):
+        return not self.ancestors(signal_id).isdisjoint(self.signature(end)[0])
+
+    def verdict(self, a, b):
+        """(signals a sends that b cannot receive, and the other way round), sorted."""
+        key = (a, b)
+        verdict = self._verdicts.get(key)
+        if verdict is None:
+            verdict = self._verdicts[key] = (
+                sorted(s for s in self.signature(a)[0] if not self.receives(b, s)),
+                sorted(s for s in self.signature(b)[0] if not self.receives(a, s)),
+            )
+        return verdict
+
+    def conveys(self, a, b, signal_id):
+        """Whether one end can send signal_id and the other receive it."""
+        key = (a, b, signal_id)
+        flows = self._conveys.get(key)
+        if flows is None:
+            flows = self._conveys[key] = (
+                (self.sends(a, signal_id) and self.receives(b, signal_id))
+                or (self.sends(b, signal_id) and self.receives(a, signal_id)))
+        return flows
+
+    # ── Ends ─────────────────────────────────────────────────────────────────
+
+    def end(self, port_id, context):
+        """The end a connector owned by `context` makes of a port, or None when
+        the port or its type does not resolve (the metamodel rules report that)."""
+        port = self.index.get(port_id)
+        if port is None or port["_kind"] != "ProxyPort":
+            return None
+        ib = self.index.get(port.get("typeRef"))
+        if ib is None or ib["_kind"] != "InterfaceBlock":
+            return None
+        inward = (port.get("_owner") or port.get("ownerRef")) == context
+        return ib["id"], bool(port.get("conjugated")) != inward
+
+    def ends(self, conn):
+        """(source end, target end) of a connector, or None if either is unresolved."""
+        conn_id = conn["id"]
+        if conn_id not in self._ends:
+            context = conn.get("ownerRef") or conn.get("_owner")
+            a = self.end(conn.get("sourcePortRef"), context)
+            b = self.end(conn.get("targetPortRef"), context)
+            self._ends[conn_id] = (a, b) if a and b else None
+        return self._ends[conn_id]
+
+    def connectors_of(self, flow):
+        """IDs of the connectors realizing an item flow, in the order found."""
+        flow_id = flow["id"]
+        if flow_id not in self._realizers:
+            found = []
+            candidates = [flow["connectorRef"]] if isinstance(flow.get("connectorRef"), str) else []
+            candidates += self.index.referrers(flow_id, "itemFlowRefs")
+            for conn_id in candidates:
+                conn = self.index.get(conn_id)
+                if conn is not None and conn["_kind"] == "Connector" and conn_id not in found:
+                    found.append(conn_id)
+            self._realizers[flow_id] = found
+        return self._realizers[flow_id]
+
+
+# ── Rules ────────────────────────────────────────────────────────────────────
+# One function per rule ID, each run on a block for the connectors or item
+# flows it owns. They share the engine derived from the index they are given.
+
+def owned(blk, field):
+    return [elem for elem in blk.get(field) or () if isinstance(elem, dict) and "id" in elem]
+
+
+def check_connector_direction(blk, index, issues):
+    """CONNECTORDIRECTION: whatever one end sends, the other must receive."""
+    engine = index.derived(InterfaceEngine)
+    for conn in owned(blk, "connectors"):
+        ends = engine.ends(conn)
+        if not ends:
+            continue
+        source, target = conn["sourcePortRef"], conn["targetPortRef"]
+        to_target, to_source = engine.verdict(*ends)
+        for sender, receiver, unreceived in ((source, target, to_target),
+                                             (target, source, to_source)):
+            if unreceived:
+                issues.append(Issue("CONNECTORDIRECTION", conn["id"], conn.get("name", ""), "error",
+                                   f"Port {sender} sends {listing(unreceived)}, "
+                                   f"which port {receiver} cannot receive"))
+
+
+def check_logical_connector_flows(blk, index, issues):
+    """LOGICALCONNFLOWS: connectors in logical architecture should carry a flow."""
+    for conn in owned(blk, "connectors"):
+        context = index.get(conn.get("ownerRef") or conn.get("_owner"))
+        if (context is not None and context.get("stereotype") == "logical"
+                and not conn.get("itemFlowRefs") and not index.referrers(conn["id"], "connectorRef")):
+            issues.append(Issue("LOGICALCONNFLOWS", conn["id"], conn.get("name", ""), "info",
+                               "Connector in a logical architecture should carry at least one item flow"))
+
+
+def check_flow_connector(blk, index, issues):
+    """FLOWCONNECTOR: an item flow must be realized by a connector."""
+    engine = index.derived(InterfaceEngine)
+    for flow in owned(blk, "itemFlows"):
+        if not engine.connectors_of(flow):
+            issues.append(Issue("FLOWCONNECTOR", flow["id"], flow.get("name", ""), "error",
+                               "Item flow must be realized by a connector"))
+
+
+def check_flow_connectors(blk, index, issues):
+    """FLOWCONNECTORS: ...and by no more than one."""
+    engine = index.derived(InterfaceEngine)
+    for flow in owned(blk, "itemFlows"):
+        connectors = engine.connectors_of(flow)
+        if len(connectors) > 1:
+            issues.append(Issue("FLOWCONNECTORS", flow["id"], flow.get("name", ""), "error",
+                               f"Item flow is realized by {len(connectors)} connectors "
+                               f"({listing(connectors)}); use a flow set for multiple"))
+
+
+def check_convey_type(blk, index, issues):
+    """CONVEYTYPE: each conveyed signal must flow between the ends of the
+    item flow's one connector."""
+    engine = index.derived(InterfaceEngine)
+    for flow in owned(blk, "itemFlows"):
+        connectors = engine.connectors_of(flow)
+        if len(connectors) != 1:
+            continue  # FLOWCONNECTOR / FLOWCONNECTORS
+        ends = engine.ends(index[connectors[0]])
+        if ends is None:
+            continue
+        stray = [s for s in iter_refs(flow, "conveyedSignalRefs")
+                 if isinstance(s, str) and not engine.conveys(*ends, s)]
+        if stray:
+            issues.append(Issue("CONVEYTYPE", flow["id"], flow.get("name", ""), "error",
+                               f"Conveyed {listing(stray)} cannot flow between the ends of "
+                               f"connector {connectors[0]}"))
@@ -0,0 +1,186 @@
+"""
+SysMLcheap Issues
+The Issue record every rule emits, and the sinks that report issues as the
+validator produces them: the grouped console report, JSON Lines, SARIF 2.1.0
+for code-scanning UIs, and JUnit XML for CI test reports. Sinks keep running
+counts per severity, so nobody re-filters a list of issues to summarize it.
+"""
+
+import json
+import shutil
+import sys
+import tempfile
+from xml.sax.saxutils import escape, quoteattr
+
+SEVERITIES = ("error", "warning", "info")
+ICONS = {"error": "❌", "warning": "⚠️", "info": "ℹ️"}
+
+
+class Issue:
+    __slots__ = ("rule", "element_id", "element_name", "severity", "message")
+
+    def __init__(self, rule, element_id, element_name, severity, message):
+        self.rule = rule
+        self.element_id = element_id
+        self.element_name = element_name
+        self.severity = severity  # error, warning, info
+        self.message = message
+
+    def __str__(self):
+        icon = ICONS.get(self.severity, "?")
+        return f"  {icon} [{self.rule}] {self.element_name} ({self.element_id}): {self.message}"
+
+    def to_dict(self):
+        return {"rule": self.rule, "elementId": self.element_id, "elementName": self.element_name,
+                "severity": self.severity, "message": self.message}
+
+
+# ── Sinks ────────────────────────────────────────────────────────────────────
+
+class IssueSink:
+    """Receives issues one at a time; close() finishes the output."""
+
+    def __init__(self, out=None):
+        self.out = out or sys.stdout
+        self.counts = dict.fromkeys(SEVERITIES, 0)
+        self.truncated = False  # set when --max-issues cut the run short
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    def emit(self, issue):
+        self.counts[issue.severity] = self.counts.get(issue.severity, 0) + 1
+        self.write(issue)
+
+    def emit_all(self, issues):
+        for issue in issues:
+            self.emit(issue)
+
+    def write(self, issue):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def exit_code(self):
+        return 1 if self.counts["error"] else 0
+
+
+class ConsoleSink(IssueSink):
+    """The human report: issues grouped by severity, then a summary line.
+    Grouping needs every issue before the first line, so this one sink holds
+    them until close()."""
+
+    def __init__(self, out=None):
+        super().__init__(out)
+        self.groups = {severity: [] for severity in SEVERITIES}
+
+    def write(self, issue):
+        self.groups.setdefault(issue.severity, []).append(issue)
+
+    def close(self):
+        out = self.out
+        for severity, heading in (("error", "❌ ERRORS"), ("warning", "⚠️  WARNINGS"),
+                                  ("info", "ℹ️  INFO")):
+            group = self.groups[severity]
+            if group:
+                print(f"{heading} ({len(group)}):", file=out)
+                for issue in group:
+                    print(issue, file=out)
+                print(file=out)
+
+        print("─" * 60, file=out)
+        if not self.total:
+            print("✅ Model is clean! No issues found.", file=out)
+        else:
+            counts = self.counts
+            print(f"   {counts['error']} errors | {counts['warning']} warnings | {counts['info']} info",
+                  file=out)
+        if self.truncated:
+            print(f"   Stopped after {self.total} issues (--max-issues).", file=out)
+
+
+class JsonLinesSink(IssueSink):
+    """One JSON object per issue per line, written as each issue arrives."""
+
+    def write(self, issue):
+        self.out.write(json.dumps(issue.to_dict(), ensure_ascii=False) + "\n")
+
+
+SARIF_LEVELS = {"error": "error", "warning": "warning", "info": "note"}
+
+
+class SarifSink(IssueSink):
+    """A SARIF 2.1.0 log with one run. Results are written as they arrive;
+    the rule list, which SARIF keeps beside them, is written by close()."""
+
+    def __init__(self, out=None):
+        super().__init__(out)
+        self.rules = {}  # rule ID → its index in the driver's rule list
+        self.out.write('{"$schema":"https://json.schemastore.org/sarif-2.1.0.json",'
+                       '"version":"2.1.0","runs":[{"results":[')
+
+    def write(self, issue):
+        rule_index = self.rules.setdefault(issue.rule, len(self.rules))
+        result = {
+            "ruleId": issue.rule,
+            "ruleIndex": rule_index,
+            "level": SARIF_LEVELS.get(issue.severity, "none"),
+            "message": {"text": issue.message},
+            "locations": [{"logicalLocations": [{
+                "fullyQualifiedName": issue.element_id, "name": issue.element_name or issue.element_id,
+            }]}],
+        }
+        self.out.write(("," if self.total > 1 else "") + "\n"
+                       + json.dumps(result, ensure_ascii=False))
+
+    def close(self):
+        driver = {"name": "SysMLcheap Validator",
+                  "rules": [{"id": rule} for rule in self.rules]}
+        self.out.write('\n],"tool":{"driver":' + json.dumps(driver, separators=(",", ":"))
+                       + '},"properties":{"truncated":' + json.dumps(self.truncated) + "}}]}\n")
+
+
+class JUnitSink(IssueSink):
+    """JUnit XML: one test case per issue, failing for errors. The suite's
+    counts lead the document, so test cases are spooled (to disk once large)
+    until close()."""
+
+    def __init__(self, out=None):
+        super().__init__(out)
+        self.spool = tempfile.SpooledTemporaryFile(max_size=1 << 22, mode="w+", encoding="utf-8")
+
+    def write(self, issue):
+        name = quoteattr(f"{issue.element_id}: {issue.element_name}" if issue.element_name
+                         else str(issue.element_id))
+        text = f"[{issue.rule}] {issue.message}"
+        self.spool.write(f"  <testcase classname={quoteattr(issue.rule)} name={name}>")
+        if issue.severity == "error":
+            self.spool.write(f"<failure type=\"error\" message={quoteattr(issue.message)}>"
+                             f"{escape(text)}</failure>")
+        else:
+            self.spool.write(f"<system-out>{escape(issue.severity + ': ' + text)}</system-out>")
+        self.spool.write("</testcase>\n")
+
+    def close(self):
+        out = self.out
+        tests = self.total or 1
+        out.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        out.write(f'<testsuite name="SysMLcheap Validator" tests="{tests}" '
+                  f'failures="{self.counts["error"]}" errors="0" skipped="0">\n')
+        if self.total:
+            self.spool.seek(0)
+            shutil.copyfileobj(self.spool, out)
+        else:
+            out.write('  <testcase classname="model" name="validate"/>\n')
+        out.write("</testsuite>\n")
+        self.spool.close()
+
+
+SINKS = {
+    "console": ConsoleSink,
+    "jsonl": JsonLinesSink,
+    "sarif": SarifSink,
+    "junit": JUnitSink,
+}
@@ -0,0 +1,313 @@
+"""
+SysMLcheap Model
+The one loader and index shared by every tool: reads model/*.yaml, tags each
+element with its metamodel kind and owner, and indexes nested elements.
+"""
+
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from . import cache, profile
+
+# Top-level model keys, in load order, and the element kind each one holds.
+KIND_MAP = {
+    "packages": "Package",
+    "requirements": "Requirement",
+    "sources": "SourceContent",
+    "actors": "Actor",
+    "useCases": "UseCase",
+    "blocks": "Block",
+    "interfaceBlocks": "InterfaceBlock",
+    "signals": "Signal",
+    "terms": "Term",
+    "testCases": "TestCase",
+    "activities": "Activity",
+    "stateMachines": "StateMachine",
+}
+
+# Nested element lists (at any depth) that are indexed alongside their owner.
+NESTED_KINDS = {
+    "parts": "PartProperty",
+    "ports": "ProxyPort",
+    "flowProperties": "FlowProperty",
+    "operations": "Operation",
+    "parameters": "Parameter",
+    "valueProperties": "ValueProperty",
+    "nodes": "ActivityNode",
+    "inputPins": "Pin",
+    "outputPins": "Pin",
+    "edges": "ActivityEdge",
+    "parameterNodes": "ActivityParameterNode",
+    "states": "State",
+    "transitions": "Transition",
+    "regions": "Region",
+    "connectors": "Connector",
+    "itemFlows": "ItemFlow",
+}
+
+_NESTED_KEYS = frozenset(NESTED_KINDS)
+
+# Every element kind, numbered: the interned kind codes used by the compact
+# store and the bulk reference check.
+KINDS = sorted(set(KIND_MAP.values()) | set(NESTED_KINDS.values()))
+KIND_CODES = {kind: code for code, kind in enumerate(KINDS)}
+
+# ADR-009 status tags; an element without one counts as the metamodel default.
+STATUSES = ("mvp", "future", "commercial", "implemented")
+DEFAULT_STATUS = "mvp"
+
+# Relationship fields whose incoming edges validators query ("who points at me").
+REVERSE_REFS = (
+    "includeRefs", "extendRefs", "traceRefs", "satisfiedByRefs",
+    "realizationRefs", "generalizationRefs", "typeRef", "itemFlowRefs", "connectorRef",
+)
+
+
+# ── Loading ──────────────────────────────────────────────────────────────────
+
+def load_file(yaml_file, use_cache=True):
+    """Load one YAML model file: model key → list of elements it defines."""
+    data = cache.load_yaml(yaml_file, use_cache)
+    if not data:
+        return {}
+    return {key: data[key] for key in KIND_MAP if data.get(key)}
+
+
+def _load_file_in_worker(yaml_file, use_cache):
+    """Process-pool entry point: the file's elements plus this call's cache stats."""
+    cache.stats = cache.CacheStats()
+    return load_file(yaml_file, use_cache), cache.stats
+
+
+def load_files(yaml_files, jobs=1, use_cache=True):
+    """Load several files, in parallel across `jobs` processes when jobs > 1.
+
+    Results always come back in the order of yaml_files, so merging them is
+    deterministic however the work was scheduled.
+    """
+    yaml_files = list(yaml_files)
+    if jobs <= 1 or len(yaml_files) < 2:
+        return [load_file(f, use_cache) for f in yaml_files]
+    chunksize = max(1, len(yaml_files) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        results = list(pool.map(_load_file_in_worker, yaml_files,
+                                [use_cache] * len(yaml_files), chunksize=chunksize))
+    for _, worker_stats in results:
+        cache.stats.merge(worker_stats)
+    return [data for data, _ in results]
+
+
+def load_model(model_dir, jobs=1, use_cache=True):
+    """Load all YAML files from the model directory into a combined dict."""
+    model = {key: [] for key in KIND_MAP}
+    yaml_files = sorted(Path(model_dir).glob("*.yaml"))
+    for data in load_files(yaml_files, jobs, use_cache):
+        for key, elems in data.items():
+            model[key].extend(elems)
+    return model
+
+
+_loaded = {}
+
+
+def load(model_dir, jobs=1, compact=False):
+    """Load and index a model directory once per process: returns (model, index).
+
+    Callers share the same dicts, so treat them as read-only. With compact=True
+    the pair is backed by a sysmlcheap.store.CompactStore instead of dicts.
+    """
+    key = (os.path.abspath(model_dir), compact)
+    if key not in _loaded:
+        if compact:
+            from .store import load_compact
+            with profile.span("phase", "load.store") as span:
+                _loaded[key] = load_compact(key[0])
+                span.elements = len(_loaded[key][1])
+        else:
+            with profile.span("phase", "load.parse") as span:
+                model = load_model(key[0], jobs)
+                span.elements = sum(len(elems) for elems in model.values())
+            with profile.span("phase", "load.index") as span:
+                index = build_index(model)
+                span.elements = len(index)
+            _loaded[key] = (model, index)
+    return _loaded[key]
+
+
+# ── Index ────────────────────────────────────────────────────────────────────
+
+class ModelIndex(dict):
+    """Lookup dict id → element, plus reverse edges per relationship field,
+    an interned id → kind code table, lazily built per-kind views and tables
+    derived from the whole index by the rules that share them."""
+
+    def __init__(self):
+        super().__init__()
+        self.reverse = {field: defaultdict(list) for field in REVERSE_REFS}
+        self.kinds = {}
+        self._by_kind = None
+        self._derived = {}
+
+    def add(self, elem):
+        self[elem["id"]] = elem
+        self.kinds[elem["id"]] = KIND_CODES[elem["_kind"]]
+        self._by_kind = None
+        self._derived = {}
+        for field, incoming in self.reverse.items():
+            for ref_id in iter_refs(elem, field):
+                incoming[ref_id].append(elem["id"])
+
+    def remove(self, elem):
+        del self[elem["id"]]
+        del self.kinds[elem["id"]]
+        self._by_kind = None
+        self._derived = {}
+        for field, incoming in self.reverse.items():
+            for ref_id in iter_refs(elem, field):
+                incoming[ref_id].remove(elem["id"])
+
+    def referrers(self, elem_id, field):
+        """IDs of elements whose `field` references elem_id."""
+        return self.reverse[field].get(elem_id, ())
+
+    def kind_codes(self, ids):
+        """Kind code of each ID, None where it is not defined, in one bulk lookup."""
+        return list(map(self.kinds.get, ids))
+
+    def of_kind(self, kind):
+        """Indexed elements of one kind, nested ones included."""
+        if self._by_kind is None:
+            by_kind = defaultdict(list)
+            for elem in self.values():
+                by_kind[elem["_kind"]].append(elem)
+            self._by_kind = by_kind
+        return self._by_kind.get(kind, [])
+
+    def derived(self, build):
+        """build(self), worked out once and kept until the index next changes."""
+        if build not in self._derived:
+            self._derived[build] = build(self)
+        return self._derived[build]
+
+
+class RecordingIndex:
+    """Read-only view of an index that records what is looked up through it,
+    so callers can tell which edits can change a result. Each read becomes a
+    key in `reads`:
+
+      elem_id                          the element: with `fields`, only whether
+                                       it exists and its kind
+      (elem_id, field)                 one field of it, with `fields`
+      (elem_id, field, "referrers")    the elements whose `field` references it
+
+    With `fields` the index hands out RecordedElement views rather than the
+    elements themselves, so each field read through them is recorded.
+    """
+
+    def __init__(self, index, fields=False):
+        self._index = index
+        self.fields = fields
+        self.reads = set()
+        self._views = {}
+        self._derived = {}
+
+    def _view(self, key):
+        view = self._views.get(key)
+        if view is None:
+            view = self._views[key] = RecordedElement(self._index[key], self.reads)
+        return view
+
+    def __getitem__(self, key):
+        self.reads.add(key)
+        return self._view(key) if self.fields else self._index[key]
+
+    def __contains__(self, key):
+        self.reads.add(key)
+        return key in self._index
+
+    def get(self, key, default=None):
+        self.reads.add(key)
+        if not self.fields:
+            return self._index.get(key, default)
+        return self._view(key) if key in self._index else default
+
+    def referrers(self, elem_id, field):
+        self.reads.add((elem_id, field, "referrers"))
+        return self._index.referrers(elem_id, field)
+
+    def derived(self, build):
+        """As ModelIndex.derived, but built over this view so its reads are recorded."""
+        if build not in self._derived:
+            self._derived[build] = build(self)
+        return self._derived[build]
+
+
+class RecordedElement:
+    """Read-only view of one indexed element that records each field read
+    through it as (element ID, field). Its ID and kind are covered by the
+    element's own key, recorded when it was looked up."""
+
+    __slots__ = ("_elem", "_reads")
+
+    def __init__(self, elem, reads):
+        self._elem = elem
+        self._reads = reads
+
+    def _read(self, field):
+        if field != "id" and field != "_kind":
+            self._reads.add((self._elem["id"], field))
+
+    def __getitem__(self, field):
+        self._read(field)
+        return self._elem[field]
+
+    def __contains__(self, field):
+        self._read(field)
+        return field in self._elem
+
+    def get(self, field, default=None):
+        self._read(field)
+        return self._elem.get(field, default)
+
+
+def iter_refs(elem, field):
+    """Referenced IDs in a ref (single ID) or refs (list) field."""
+    refs = elem.get(field)
+    if not refs:
+        return ()
+    return (refs,) if isinstance(refs, str) else refs
+
+
+def iter_unit(elem):
+    """An element followed by every element nested inside it, depth first."""
+    yield elem
+    if _NESTED_KEYS.isdisjoint(elem):
+        return  # most elements own nothing; skip probing every nested key
+    for sub_key in NESTED_KINDS:
+        for sub in elem.get(sub_key) or ():
+            if isinstance(sub, dict) and "id" in sub:
+                yield from iter_unit(sub)
+
+
+def tag_element(elem, kind):
+    """Add _kind to an element, and _kind/_owner to everything nested inside it."""
+    elem["_kind"] = kind
+    for sub_key, sub_kind in NESTED_KINDS.items():
+        for sub in elem.get(sub_key) or ():
+            if isinstance(sub, dict) and "id" in sub:
+                tag_element(sub, sub_kind)
+                sub["_owner"] = elem["id"]
+
+
+def build_index(model):
+    """Build a lookup dict: id → element (with _kind added) and reverse edges."""
+    index = ModelIndex()
+    for key, kind in KIND_MAP.items():
+        for elem in model.get(key, []):
+            tag_element(elem, kind)
+            # Index nested elements too
+            for sub in iter_unit(elem):
+                index.add(sub)
+    return index
@@ -0,0 +1,201 @@
+"""
+SysMLcheap Source Positions
+Parses a model file into the same data the loader produces plus a map of
+where every element ID is defined and every ID is referenced, from one pass
+of the libyaml parser (compose, then construct from the same node tree).
+Editors need this to turn element IDs into file/line locations; the
+DocumentParser reparses only the list items of a file that changed.
+"""
+
+import re
+from collections import defaultdict
+
+import yaml
+
+from .cache import Loader
+from .model import KIND_MAP, NESTED_KINDS
+
+
+class DocumentMap:
+    """ID definitions and references in one document. Positions are
+    (line, start column, end column), zero-based, in code points."""
+
+    def __init__(self):
+        self.defs = {}   # ID → position of its `id:` value
+        self.refs = []   # (position, target ID, field, referring element ID)
+        self._by_source = None
+
+    def ref_positions(self, target):
+        return [pos for pos, ref_id, _, _ in self.refs if ref_id == target]
+
+    def refs_from(self, elem_id):
+        """(position, target ID) of each reference an element makes."""
+        if self._by_source is None:
+            by_source = defaultdict(list)
+            for pos, ref_id, _, source in self.refs:
+                by_source[source].append((pos, ref_id))
+            self._by_source = by_source
+        return self._by_source.get(elem_id, ())
+
+
+def parse(raw, walk=True):
+    """(model key → elements, DocumentMap) for one file's text or bytes; the
+    map stays empty without `walk`. Raises yaml.YAMLError (with problem_mark)
+    on a syntax error."""
+    loader = Loader(raw)
+    try:
+        node = loader.get_single_node()
+        data = loader.construct_document(node) if node is not None else None
+    finally:
+        loader.dispose()
+    positions = DocumentMap()
+    if not isinstance(data, dict) or not isinstance(node, yaml.MappingNode):
+        return {}, positions
+    for key_node, value_node in node.value if walk else ():
+        if key_node.value in KIND_MAP and isinstance(value_node, yaml.SequenceNode):
+            for item in value_node.value:
+                _walk(item, positions)
+    return {key: data[key] for key in KIND_MAP if data.get(key)}, positions
+
+
+def parse_item(chunk, walk=True):
+    """(element, DocumentMap with lines relative to the chunk) for the text of
+    one top-level list item."""
+    loader = Loader(chunk)
+    try:
+        node = loader.get_single_node()
+        data = loader.construct_document(node)
+    finally:
+        loader.dispose()
+    positions = DocumentMap()
+    if walk:
+        _walk(node.value[0], positions)
+    return data[0], positions
+
+
+# ── Reparsing Edited Files ───────────────────────────────────────────────────
+
+TOP_KEY = re.compile(r"([A-Za-z_]\w*):\s*(#.*)?$")
+ITEM = re.compile(r"( *)- ")
+# Anything that can tie one item's meaning to another's text (documents,
+# directives, anchors, aliases, tags) sends a file down the whole-file path.
+UNSAFE = re.compile(r"^(---|\.\.\.|%)|(^|\s)[&*!]\S", re.M)
+
+
+def split_items(text):
+    """(top-level key, first line, text) of each item of the block-style lists
+    under a file's top-level keys, or None for a file laid out any other way."""
+    if UNSAFE.search(text):
+        return None
+    lines = text.split("\n")
+    items, keys = [], set()
+    key = indent = start = None
+    for n, line in enumerate(lines):
+        stripped = line.lstrip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        item = ITEM.match(line)
+        if line[0] not in " -":
+            match = TOP_KEY.match(line)
+            if not match or match.group(1) in keys:
+                return None
+            if start is not None:
+                items.append((key, start, "\n".join(lines[start:n]) + "\n"))
+            key, indent, start = match.group(1), None, None
+            keys.add(key)
+        elif item and key is not None and indent in (None, len(item.group(1))):
+            if start is not None:
+                items.append((key, start, "\n".join(lines[start:n]) + "\n"))
+            indent, start = len(item.group(1)), n
+        elif start is None or len(line) - len(stripped) <= indent:
+            return None
+    if start is not None:
+        items.append((key, start, "\n".join(lines[start:]) + "\n"))
+    return items
+
+
+class DocumentParser:
+    """Parses successive versions of one file, as parse() does, reusing the
+    element and positions of every list item whose text has not changed, so
+    an edit costs one item's parse rather than the whole file's. Unchanged
+    items come back as the same element dicts. Without `positions` the maps
+    are left empty, for callers that only want the elements."""
+
+    def __init__(self, positions=True):
+        self.positions = positions
+        self.items = {}  # (model key, item text) → (element, DocumentMap relative to the item)
+
+    def parse(self, text):
+        items = split_items(text)
+        if items is not None:
+            try:
+                return self._parse_items(items)
+            except (yaml.YAMLError, IndexError, TypeError, AttributeError):
+                pass  # not what it looked like; the whole-file parse reports any error
+        self.items = {}
+        return parse(text, self.positions)
+
+    def prime(self, text, data):
+        """Take data (model key → elements) as what text parses to, so that
+        the next parse reuses those elements for every item left unchanged.
+        Only for parsers made without positions, as none are known here."""
+        items = split_items(text)
+        if items is None:
+            return
+        chunks = defaultdict(list)
+        for key, _, chunk in items:
+            if key in KIND_MAP:
+                chunks[key].append(chunk)
+        if any(len(chunks.get(key, ())) != len(data.get(key, ())) for key in chunks.keys() | data.keys()):
+            return  # not laid out as expected: the next parse starts from scratch
+        self.items = {(key, chunk): (elem, DocumentMap())
+                      for key, elems in data.items() for chunk, elem in zip(chunks[key], elems)}
+
+    def _parse_items(self, items):
+        data, positions, parsed = {}, DocumentMap(), {}
+        for key, first, chunk in items:
+            # A repeated item is parsed again: every element is its own dict.
+            hit = None if (key, chunk) in parsed else self.items.get((key, chunk))
+            if hit is None:
+                hit = parse_item(chunk, self.positions and key in KIND_MAP)
+            parsed[key, chunk] = hit
+            if key not in KIND_MAP:
+                continue
+            elem, relative = hit
+            data.setdefault(key, []).append(elem)
+            for elem_id, (line, start, end) in relative.defs.items():
+                positions.defs.setdefault(elem_id, (first + line, start, end))
+            positions.refs += [((first + line, start, end), *ref)
+                               for (line, start, end), *ref in relative.refs]
+        self.items = parsed
+        return data, positions
+
+
+def span(node):
+    """Position of a scalar's text, quotes excluded."""
+    start, end = node.start_mark, node.end_mark
+    quoted = node.style in ("'", '"')
+    end_column = end.column - quoted if end.line == start.line else start.column + len(node.value) + quoted
+    return start.line, start.column + quoted, end_column
+
+
+def _walk(node, positions):
+    if not isinstance(node, yaml.MappingNode):
+        return
+    elem_id = None
+    for key_node, value_node in node.value:
+        if key_node.value == "id" and isinstance(value_node, yaml.ScalarNode):
+            elem_id = value_node.value
+            positions.defs.setdefault(elem_id, span(value_node))
+    for key_node, value_node in node.value:
+        field = key_node.value
+        if not isinstance(field, str):
+            continue
+        if field in NESTED_KINDS and isinstance(value_node, yaml.SequenceNode):
+            for item in value_node.value:
+                _walk(item, positions)
+        elif field.endswith(("Ref", "Refs")):
+            scalars = value_node.value if isinstance(value_node, yaml.SequenceNode) else [value_node]
+            for scalar in scalars:
+                if isinstance(scalar, yaml.ScalarNode) and scalar.value:
+                    positions.refs.append((span(scalar), scalar.value, field, elem_id))
@@ -0,0 +1,163 @@
+"""
+SysMLcheap Profiling
+Opt-in instrumentation shared by the tools. Code marks the work it does with
+span(category, name) or record(...); while no profiler is active these are
+no-ops, so the hooks stay in place permanently. A run with a profiler
+collects wall time, elements visited and issues emitted per phase, rule
+family, rule ID and diagram generator, and can write them as JSON or as a
+Chrome trace (chrome://tracing, Perfetto).
+"""
+
+import json
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
+# Table sections, in print order.
+CATEGORIES = ("phase", "family", "rule", "generator", "shard")
+
+
+class Record:
+    def __init__(self, category, name):
+        self.category = category
+        self.name = name
+        self.seconds = 0.0
+        self.elements = 0
+        self.issues = 0
+
+    def to_dict(self):
+        return {"category": self.category, "name": self.name,
+                "seconds": self.seconds, "elements": self.elements, "issues": self.issues}
+
+
+class Span:
+    """Handed out by Profiler.span so the caller can fill in counts as it goes."""
+
+    def __init__(self):
+        self.elements = 0
+        self.issues = 0
+
+
+class Profiler:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.records = {}   # (category, name) → Record, in first-seen order
+        self.events = []    # (category, name, start, seconds, pid) for the trace
+
+    def record(self, category, name, seconds=0.0, elements=0, issues=0, start=None):
+        """Add to one record's totals; with a start time it also becomes a trace event."""
+        rec = self.records.get((category, name))
+        if rec is None:
+            rec = self.records[(category, name)] = Record(category, name)
+        rec.seconds += seconds
+        rec.elements += elements
+        rec.issues += issues
+        if start is not None:
+            self.events.append((category, name, start, seconds, os.getpid()))
+
+    @contextmanager
+    def span(self, category, name):
+        span = Span()
+        start = time.perf_counter()
+        try:
+            yield span
+        finally:
+            self.record(category, name, time.perf_counter() - start,
+                        span.elements, span.issues, start)
+
+    def count_issues(self, issues):
+        """Attribute issues to the rule IDs that raised them."""
+        for rule, n in Counter(issue.rule for issue in issues).items():
+            self.record("rule", rule, issues=n)
+
+    def merge(self, other):
+        """Fold in a profiler filled by a worker process (perf_counter is system-wide)."""
+        for rec in other.records.values():
+            self.record(rec.category, rec.name, rec.seconds, rec.elements, rec.issues)
+        self.events.extend(other.events)
+
+    # ── Output ───────────────────────────────────────────────────────────────
+
+    def print_table(self):
+        wall = time.perf_counter() - self.started
+        print(f"⏱️  Profile ({wall * 1000:.1f} ms wall):")
+        for category in CATEGORIES:
+            recs = [r for r in self.records.values() if r.category == category]
+            if not recs:
+                continue
+            total = sum(r.seconds for r in recs) or 1e-9
+            print(f"   {category:<32}{'ms':>10}{'share':>8}{'elements':>10}{'issues':>8}")
+            for r in sorted(recs, key=lambda r: (-r.seconds, -r.issues, r.name)):
+                ms = f"{r.seconds * 1000:.1f}" if r.seconds else "—"
+                share = f"{r.seconds / total:.0%}" if r.seconds else ""
+                print(f"     {r.name:<30}{ms:>10}{share:>8}{r.elements:>10}{r.issues:>8}")
+            print()
+
+    def to_json(self):
+        return {
+            "wall_seconds": time.perf_counter() - self.started,
+            "records": [r.to_dict() for r in self.records.values()],
+        }
+
+    def write_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_json(), f, indent=2)
+
+    def write_chrome_trace(self, path):
+        """Trace Event Format: one complete ("X") event per span, one row per process."""
+        pid = os.getpid()
+        events = [{
+            "name": name, "cat": category, "ph": "X",
+            "ts": (start - self.started) * 1e6, "dur": seconds * 1e6,
+            "pid": pid, "tid": event_pid,
+        } for category, name, start, seconds, event_pid in self.events]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+active = None  # the running Profiler, or None when profiling is off
+
+
+def start():
+    """Turn profiling on for this process and return the new Profiler."""
+    global active
+    active = Profiler()
+    return active
+
+
+def span(category, name):
+    """Time a block under (category, name) if profiling is on."""
+    if active is None:
+        return nullcontext(Span())
+    return active.span(category, name)
+
+
+# ── Command-line Hooks ───────────────────────────────────────────────────────
+
+def add_arguments(parser):
+    """The --profile options every tool accepts."""
+    parser.add_argument("--profile", action="store_true",
+                        help="print time, elements and issues per phase, rule family, rule and generator")
+    parser.add_argument("--profile-json", metavar="FILE",
+                        help="also write the profile as JSON (implies --profile)")
+    parser.add_argument("--profile-trace", metavar="FILE",
+                        help="also write a Chrome trace of the run (implies --profile)")
+
+
+def start_from_args(args):
+    if args.profile or args.profile_json or args.profile_trace:
+        start()
+
+
+def finish_from_args(args):
+    """Print the profile table and write any requested files."""
+    if active is None:
+        return
+    active.print_table()
+    if args.profile_json:
+        active.write_json(args.profile_json)
+        print(f"   Profile written to {args.profile_json}")
+    if args.profile_trace:
+        active.write_chrome_trace(args.profile_trace)
+        print(f"   Chrome trace written to {args.profile_trace}")
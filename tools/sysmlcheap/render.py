@@ -0,0 +1,193 @@
+"""
+SysMLcheap Rendering
+Renders .puml files to SVG or PNG with a local PlantUML, never a web service.
+Each worker keeps one PlantUML process running in pipe mode and feeds it
+diagram after diagram, so the JVM starts once per worker instead of once per
+file. Rendered images are cached by a hash of the diagram source, output
+format and PlantUML build, so only changed diagrams are ever rendered.
+"""
+
+import hashlib
+import os
+import shutil
+import subprocess
+import threading
+from pathlib import Path
+
+from . import cache
+
+RENDER_DIR = cache.CACHE_ROOT / "render"
+FORMATS = ("svg", "png")
+DELIMITER = b"___SYSMLCHEAP_DIAGRAM_END___"
+
+TOOLS_DIR = Path(__file__).resolve().parents[1]
+# Where a plantuml.jar is looked for when neither --plantuml nor $PLANTUML is set.
+JAR_LOCATIONS = (
+    TOOLS_DIR / "plantuml.jar",
+    Path("/usr/share/plantuml/plantuml.jar"),
+    Path("/usr/share/java/plantuml.jar"),
+    Path("/opt/plantuml/plantuml.jar"),
+)
+
+
+class RenderError(Exception):
+    pass
+
+
+def find_plantuml(path=None):
+    """Command line for a local PlantUML, or None if there is none.
+
+    path (or $PLANTUML) may name a plantuml.jar or a plantuml launcher;
+    otherwise the usual jar locations and a `plantuml` on PATH are tried.
+    """
+    path = path or os.environ.get("PLANTUML")
+    candidates = [Path(path)] if path else list(JAR_LOCATIONS)
+    for candidate in candidates:
+        if not candidate.is_file():
+            continue
+        if candidate.suffix == ".jar":
+            java = shutil.which("java")
+            if java:
+                return [java, "-Djava.awt.headless=true", "-jar", str(candidate)]
+        elif os.access(candidate, os.X_OK):
+            return [str(candidate)]
+    if not path and shutil.which("plantuml"):
+        return [shutil.which("plantuml")]
+    return None
+
+
+def build_key(command):
+    """Identifies the PlantUML build, so upgrading it invalidates cached images."""
+    st = Path(command[-1]).resolve().stat()
+    return f"{Path(command[-1]).resolve()}:{st.st_size}:{st.st_mtime_ns}"
+
+
+class PlantUML:
+    """One long-lived PlantUML process in pipe mode."""
+
+    def __init__(self, command, fmt):
+        self.proc = subprocess.Popen(
+            command + ["-pipe", f"-t{fmt}", "-charset", "UTF-8", "-pipeNoStderr",
+                       "-pipedelimitor", DELIMITER.decode()],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        self.buffer = b""
+
+    def render(self, source):
+        """Render one diagram source and return the image bytes."""
+        try:
+            self.proc.stdin.write(source.encode() + b"\n")
+            self.proc.stdin.flush()
+        except OSError as e:
+            raise RenderError(f"PlantUML exited: {e}") from None
+        # PlantUML writes the image, then the delimiter on its own line.
+        while DELIMITER not in self.buffer:
+            chunk = self.proc.stdout.read1(1 << 16)
+            if not chunk:
+                raise RenderError("PlantUML exited before finishing the diagram")
+            self.buffer += chunk
+        image, _, rest = self.buffer.partition(DELIMITER)
+        self.buffer = rest.lstrip(b"\r\n")
+        if image.startswith(b"ERROR"):
+            raise RenderError(image.decode(errors="replace").strip().replace("\n", " "))
+        return image
+
+    def close(self):
+        try:
+            self.proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+
+
+def write_if_changed(path, data):
+    """Write bytes unless the file already holds them; True if written."""
+    try:
+        if Path(path).read_bytes() == data:
+            return False
+    except OSError:
+        pass
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return True
+
+
+class RenderStats:
+    def __init__(self):
+        self.rendered = 0    # went through PlantUML
+        self.cached = 0      # served from the image cache
+        self.written = 0     # image files actually (re)written
+        self.failed = []     # (puml path, message)
+
+    def summary(self):
+        total = self.rendered + self.cached + len(self.failed)
+        return (f"Rendered {total} diagrams: {self.rendered} by PlantUML, "
+                f"{self.cached} from cache, {self.written} written, {len(self.failed)} failed")
+
+
+def render_files(puml_files, command, fmt="svg", jobs=1):
+    """Render .puml files to images beside them; returns RenderStats."""
+    stats = RenderStats()
+    version = build_key(command)
+    pending = []  # (puml path, source, cache file)
+    for puml in puml_files:
+        source = Path(puml).read_text()
+        key = hashlib.sha256(f"{version}\0{fmt}\0{source}".encode()).hexdigest()
+        cache_file = RENDER_DIR / f"{key}.{fmt}"
+        try:
+            image = cache_file.read_bytes()
+        except OSError:
+            pending.append((puml, source, cache_file))
+            continue
+        stats.cached += 1
+        stats.written += write_if_changed(image_path(puml, fmt), image)
+
+    results = {}
+    work = iter(pending)
+    lock = threading.Lock()
+
+    def worker():
+        renderer = None
+        try:
+            while True:
+                with lock:
+                    item = next(work, None)
+                if item is None:
+                    return
+                puml, source, _ = item
+                if renderer is None:
+                    renderer = PlantUML(command, fmt)
+                try:
+                    results[puml] = renderer.render(source)
+                except RenderError as e:
+                    results[puml] = e
+                    renderer.close()
+                    renderer = None  # a failed diagram may have left the pipe out of step
+        finally:
+            if renderer is not None:
+                renderer.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(min(jobs, len(pending)))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    RENDER_DIR.mkdir(parents=True, exist_ok=True)
+    for puml, _, cache_file in pending:
+        result = results.get(puml, RenderError("not rendered"))
+        if isinstance(result, RenderError):
+            stats.failed.append((puml, str(result)))
+            continue
+        stats.rendered += 1
+        write_if_changed(cache_file, result)
+        stats.written += write_if_changed(image_path(puml, fmt), result)
+    return stats
+
+
+def image_path(puml, fmt):
+    return str(Path(puml).with_suffix(f".{fmt}"))
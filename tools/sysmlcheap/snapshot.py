@@ -0,0 +1,217 @@
+"""
+SysMLcheap Snapshot
+Exports the whole model as one compact, pre-indexed JSON document for the
+GitHub Pages viewers (docs/index.html, docs/diagrams.html), so a page load is
+one fetch and a JSON.parse instead of fetching and YAML-parsing every model
+file and rebuilding lookups in the browser. The snapshot holds:
+
+  elements      model key → elements, as in the YAML (tool tags stripped)
+  ids           element ID → path to it: [key, i] for a top-level element,
+                [key, i, sub_key, j, ...] for a nested one
+  referencedBy  element ID → relationship field → IDs of the referrers
+  views         view name → ready-to-render Mermaid source
+"""
+
+import gzip
+import json
+import os
+
+from .model import KIND_MAP, NESTED_KINDS
+
+try:
+    import brotli
+except ImportError:  # optional: only needed for --brotli
+    brotli = None
+
+SNAPSHOT_FORMAT = 1
+
+
+def strip_tags(elem):
+    """Copy of an element without the loader's _kind/_owner tags."""
+    out = {}
+    for key, value in elem.items():
+        if key.startswith("_"):
+            continue
+        if key in NESTED_KINDS and isinstance(value, list):
+            value = [strip_tags(sub) if isinstance(sub, dict) else sub for sub in value]
+        out[key] = value
+    return out
+
+
+def element_paths(elem, path, ids):
+    """Record the path to elem and to everything nested inside it."""
+    ids[elem["id"]] = path
+    for sub_key in NESTED_KINDS:
+        for j, sub in enumerate(elem.get(sub_key) or ()):
+            if isinstance(sub, dict) and "id" in sub:
+                element_paths(sub, path + [sub_key, j], ids)
+
+
+def build_snapshot(model, index):
+    """Build the snapshot dict for a loaded (model, index) pair."""
+    elements = {key: [strip_tags(elem) for elem in model[key]]
+                for key in KIND_MAP if model.get(key)}
+    ids = {}
+    for key, elems in elements.items():
+        for i, elem in enumerate(elems):
+            if "id" in elem:
+                element_paths(elem, [key, i], ids)
+    referenced_by = {}
+    for field, incoming in index.reverse.items():
+        for target, sources in incoming.items():
+            if sources:
+                referenced_by.setdefault(target, {})[field] = list(sources)
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "elements": elements,
+        "ids": ids,
+        "referencedBy": referenced_by,
+        "views": {
+            "usecase": use_case_view(model),
+            "logical": logical_view(model),
+            "trace": trace_view(model),
+        },
+    }
+
+
+def write_snapshot(snapshot, path, compress=()):
+    """Write the snapshot as compact JSON, plus a .gz / .br copy per requested
+    compression; returns {path: bytes written}."""
+    data = json.dumps(snapshot, separators=(",", ":"), ensure_ascii=False).encode()
+    outputs = {path: data}
+    if "gzip" in compress:
+        outputs[f"{path}.gz"] = gzip.compress(data, compresslevel=9, mtime=0)
+    if "brotli" in compress:
+        if brotli is None:
+            raise RuntimeError("--brotli needs the brotli package (pip install brotli)")
+        outputs[f"{path}.br"] = brotli.compress(data, quality=11)
+    for out_path, payload in outputs.items():
+        tmp_path = f"{out_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, out_path)
+    return {out_path: len(payload) for out_path, payload in outputs.items()}
+
+
+# ── Mermaid Views ────────────────────────────────────────────────────────────
+# Same output as the builders in docs/diagrams.html, which remain the fallback
+# when no snapshot is published.
+
+def safe_id(elem_id):
+    return "".join(c if c.isascii() and (c.isalnum() or c == "_") else "_"
+                   for c in str(elem_id or ""))
+
+
+def safe_label(text):
+    return (str(text or "").replace('"', "'").replace("[", "(")
+            .replace("]", ")").replace("\n", " "))
+
+
+def node(elem_id, label):
+    return f'{safe_id(elem_id)}["{safe_label(label)}"]'
+
+
+def short_label(name, status):
+    s = (status or "").lower()
+    if s in ("future", "commercial"):
+        return f"{name} ({s})"
+    return name
+
+
+def use_case_view(model):
+    actors = model.get("actors") or []
+    ucs = model.get("useCases") or []
+    uc_ids = {u.get("id") for u in ucs}
+    lines = [
+        "flowchart LR",
+        "classDef future fill:#fff8c5,stroke:#9a6700,color:#1f2328",
+        "classDef mvp fill:#dafbe1,stroke:#1a7f37,color:#1f2328",
+        "classDef actor fill:#ddf4ff,stroke:#0969da,color:#1f2328",
+    ]
+    for a in actors:
+        aid = safe_id(a.get("id"))
+        lines.append(f'{aid}(("{safe_label(short_label(a.get("name"), a.get("status")))}"))')
+        lines.append(f"class {aid} actor")
+    lines.append('subgraph soi["Language Questing System (SOI)"]')
+    for u in ucs:
+        uid = safe_id(u.get("id"))
+        lines.append(f'{uid}(["{safe_label(short_label(u.get("name"), u.get("status")))}"])')
+        cls = "future" if (u.get("status") or "").lower() == "future" else "mvp"
+        lines.append(f"class {uid} {cls}")
+    lines.append("end")
+    for a in actors:
+        for ref in a.get("useCaseRefs") or []:
+            if ref in uc_ids:
+                lines.append(f"{safe_id(a.get('id'))} --> {safe_id(ref)}")
+    for u in ucs:
+        for i in u.get("includeRefs") or []:
+            lines.append(f"{safe_id(u.get('id'))} -. include .-> {safe_id(i)}")
+        for e in u.get("extendRefs") or []:
+            lines.append(f"{safe_id(u.get('id'))} -. extend .-> {safe_id(e)}")
+    return "\n".join(lines)
+
+
+def logical_view(model):
+    blocks = model.get("blocks") or []
+    by_id = {b.get("id"): b for b in blocks}
+    ctx = next((b for b in blocks if (b.get("stereotype") or "").lower() == "context"), None)
+    lines = [
+        "flowchart TB",
+        "classDef context fill:#eae6ff,stroke:#6f42c1,color:#1f2328",
+        "classDef logical fill:#dafbe1,stroke:#1a7f37,color:#1f2328",
+        "classDef external fill:#f6f8fa,stroke:#57606a,color:#1f2328",
+    ]
+    if ctx is None:
+        lines.append(node("missing", "No context block found in logical.yaml"))
+        return "\n".join(lines)
+
+    lines.append(node(ctx["id"], ctx.get("name")))
+    lines.append(f"class {safe_id(ctx['id'])} context")
+    for p in ctx.get("parts") or []:
+        target = by_id.get(p.get("typeRef"))
+        if not target:
+            continue
+        tid = safe_id(target["id"])
+        lines.append(node(tid, short_label(target.get("name"), target.get("status"))))
+        st = (target.get("stereotype") or "").lower()
+        lines.append(f"class {tid} {'external' if st == 'external' else 'logical'}")
+        lines.append(f"{safe_id(ctx['id'])} --> {tid}")
+        # One level down for the logical system decomposition.
+        if st == "logical" and isinstance(target.get("parts"), list):
+            for sp in target["parts"]:
+                child = by_id.get(sp.get("typeRef"))
+                if not child:
+                    continue
+                cid = safe_id(child["id"])
+                lines.append(node(cid, short_label(child.get("name"), child.get("status"))))
+                cst = (child.get("stereotype") or "").lower()
+                lines.append(f"class {cid} {'external' if cst == 'external' else 'logical'}")
+                lines.append(f"{tid} --> {cid}")
+    return "\n".join(lines)
+
+
+def trace_view(model):
+    ucs = model.get("useCases") or []
+    req_by_id = {r.get("id"): r for r in model.get("requirements") or []}
+    lines = [
+        "flowchart LR",
+        "classDef uc fill:#ddf4ff,stroke:#0969da,color:#1f2328",
+        "classDef req fill:#fff8c5,stroke:#9a6700,color:#1f2328",
+    ]
+    edge_count = 0
+    for uc in ucs:
+        traces = [t for t in uc.get("traceRefs") or [] if t in req_by_id]
+        if not traces:
+            continue
+        uid = safe_id(uc.get("id"))
+        lines.append(node(uid, short_label(uc.get("name"), uc.get("status"))))
+        lines.append(f"class {uid} uc")
+        for tr in traces:
+            rid = safe_id(req_by_id[tr]["id"])
+            lines.append(node(rid, req_by_id[tr].get("name")))
+            lines.append(f"class {rid} req")
+            lines.append(f"{uid} -->|traces| {rid}")
+            edge_count += 1
+    if edge_count == 0:
+        lines.append(node("none", "No use case -> requirement trace links found"))
+    return "\n".join(lines)
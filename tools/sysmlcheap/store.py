@@ -0,0 +1,230 @@
+"""
+SysMLcheap Compact Store
+A column-oriented alternative to the dict model for very large models.
+
+IDs are interned to integers; kinds, owners and every ref/refs field live in
+typed arrays (one CSR adjacency per relationship field), and each top-level
+element is kept as a pickled blob that is only turned back into dicts when a
+tool actually reads it. StoreModel and StoreIndex expose the same interface
+as the (model, index) pair from sysmlcheap.model, so validators and diagram
+generators run on either.
+"""
+
+import pickle
+from array import array
+from collections.abc import Mapping, Sequence
+from functools import lru_cache
+from pathlib import Path
+
+from .graph import csr
+from .model import KIND_CODES, KIND_MAP, KINDS, iter_unit, load_file, tag_element
+
+MODEL_KEYS = list(KIND_MAP)
+
+UNDEFINED = -1  # kind code / unit for IDs that are referenced but never defined
+
+
+def is_ref_field(field):
+    return field.endswith("Ref") or field.endswith("Refs")
+
+
+class CompactStore:
+    """Interned ID table, per-ID columns, CSR edges and pickled element units."""
+
+    def __init__(self):
+        self.ids = []                  # ID number → ID string
+        self.numbers = {}              # ID string → ID number
+        self.kinds = array("b")        # ID number → kind code (UNDEFINED if never defined)
+        self.owners = array("l")       # ID number → owner's ID number, or UNDEFINED
+        self.unit_of = array("l")      # ID number → unit holding its definition
+        self.units = []                # unit number → pickled top-level element
+        self.unit_keys = array("b")    # unit number → index into MODEL_KEYS
+        self.key_units = {key: array("l") for key in MODEL_KEYS}  # model key → units, load order
+        self._edges = {}               # field → (sources, targets) while loading
+        self.forward = {}              # field → (offsets, targets) CSR by source
+        self._reverse = {}             # field → (offsets, sources) CSR by target, built lazily
+        self._materialize = lru_cache(maxsize=1024)(self._decode_unit)
+
+    # ── Building ─────────────────────────────────────────────────────────────
+
+    @classmethod
+    def from_model_dir(cls, model_dir, use_cache=True):
+        """Build a store one file at a time, so only one file's dicts are ever alive."""
+        store = cls()
+        for yaml_file in sorted(Path(model_dir).glob("*.yaml")):
+            for key, elems in load_file(yaml_file, use_cache).items():
+                for elem in elems:
+                    store.add_unit(key, elem)
+        store.freeze()
+        return store
+
+    def intern(self, elem_id):
+        number = self.numbers.get(elem_id)
+        if number is None:
+            number = len(self.ids)
+            self.numbers[elem_id] = number
+            self.ids.append(elem_id)
+            self.kinds.append(UNDEFINED)
+            self.owners.append(UNDEFINED)
+            self.unit_of.append(UNDEFINED)
+        return number
+
+    def add_unit(self, key, elem):
+        """Add one top-level element (with everything nested in it)."""
+        tag_element(elem, KIND_MAP[key])
+        unit = len(self.units)
+        for sub in iter_unit(elem):
+            number = self.intern(sub["id"])
+            self.kinds[number] = KIND_CODES[sub["_kind"]]
+            self.unit_of[number] = unit
+            if "_owner" in sub:
+                self.owners[number] = self.intern(sub["_owner"])
+            for field, value in sub.items():
+                if not value or not is_ref_field(field):
+                    continue
+                sources, targets = self._edges.setdefault(field, (array("l"), array("l")))
+                for ref_id in ((value,) if isinstance(value, str) else value):
+                    if isinstance(ref_id, str):
+                        sources.append(number)
+                        targets.append(self.intern(ref_id))
+        self.units.append(pickle.dumps(elem, protocol=pickle.HIGHEST_PROTOCOL))
+        self.unit_keys.append(MODEL_KEYS.index(key))
+        self.key_units[key].append(unit)
+
+    def freeze(self):
+        """Turn the per-field edge lists into CSR arrays indexed by source ID."""
+        n = len(self.ids)
+        for field, (sources, targets) in self._edges.items():
+            self.forward[field] = csr(n, sources, targets)
+        self._edges = {}
+        self._reverse = {}
+
+    # ── Queries ──────────────────────────────────────────────────────────────
+
+    def is_defined(self, elem_id):
+        number = self.numbers.get(elem_id)
+        return number is not None and self.kinds[number] != UNDEFINED
+
+    def kind(self, elem_id):
+        number = self.numbers.get(elem_id)
+        if number is None or self.kinds[number] == UNDEFINED:
+            return None
+        return KINDS[self.kinds[number]]
+
+    def targets(self, elem_id, field):
+        """IDs referenced by elem_id's `field`, without materializing anything."""
+        return self._neighbours(self.forward.get(field), self.numbers.get(elem_id))
+
+    def referrers(self, elem_id, field):
+        """IDs of elements whose `field` references elem_id."""
+        if field not in self._reverse:
+            forward = self.forward.get(field)
+            if forward is None:
+                return []
+            offsets, targets = forward
+            sources = array("l", (s for s in range(len(offsets) - 1)
+                                  for _ in range(offsets[s + 1] - offsets[s])))
+            self._reverse[field] = csr(len(self.ids), targets, sources)
+        return self._neighbours(self._reverse[field], self.numbers.get(elem_id))
+
+    def _neighbours(self, csr, number):
+        if csr is None or number is None:
+            return []
+        offsets, values = csr
+        return [self.ids[v] for v in values[offsets[number]:offsets[number + 1]]]
+
+    def element(self, elem_id):
+        """Materialize one element (top-level or nested) as a dict."""
+        number = self.numbers.get(elem_id)
+        if number is None or self.unit_of[number] == UNDEFINED:
+            raise KeyError(elem_id)
+        return self._materialize(self.unit_of[number])[1][elem_id]
+
+    def unit(self, unit):
+        return self._materialize(unit)[0]
+
+    def _decode_unit(self, unit):
+        root = pickle.loads(self.units[unit])
+        return root, {sub["id"]: sub for sub in iter_unit(root)}
+
+
+# ── Accessor API ─────────────────────────────────────────────────────────────
+
+class UnitList(Sequence):
+    """model[key] for a store: materializes elements as they are read."""
+
+    def __init__(self, store, key):
+        self._store = store
+        self._units = store.key_units[key]
+
+    def __len__(self):
+        return len(self._units)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._store.unit(u) for u in self._units[i]]
+        return self._store.unit(self._units[i])
+
+
+class StoreModel(Mapping):
+    """Read-only stand-in for the model dict (model key → list of elements)."""
+
+    def __init__(self, store):
+        self._lists = {key: UnitList(store, key) for key in MODEL_KEYS}
+
+    def __getitem__(self, key):
+        return self._lists[key]
+
+    def __iter__(self):
+        return iter(self._lists)
+
+    def __len__(self):
+        return len(self._lists)
+
+
+class StoreIndex(Mapping):
+    """Read-only stand-in for ModelIndex (id → element, referrers, of_kind)."""
+
+    def __init__(self, store):
+        self.store = store
+        self._derived = {}
+
+    def __getitem__(self, elem_id):
+        return self.store.element(elem_id)
+
+    def __contains__(self, elem_id):
+        return self.store.is_defined(elem_id)
+
+    def __iter__(self):
+        store = self.store
+        return (elem_id for number, elem_id in enumerate(store.ids)
+                if store.kinds[number] != UNDEFINED)
+
+    def __len__(self):
+        return sum(1 for code in self.store.kinds if code != UNDEFINED)
+
+    def referrers(self, elem_id, field):
+        return self.store.referrers(elem_id, field)
+
+    def kind_codes(self, ids):
+        kinds = self.store.kinds
+        return [None if number is None or kinds[number] == UNDEFINED else kinds[number]
+                for number in map(self.store.numbers.get, ids)]
+
+    def of_kind(self, kind):
+        code = KIND_CODES[kind]
+        store = self.store
+        return [store.element(elem_id) for number, elem_id in enumerate(store.ids)
+                if store.kinds[number] == code]
+
+    def derived(self, build):
+        """build(self), worked out once; the store never changes."""
+        if build not in self._derived:
+            self._derived[build] = build(self)
+        return self._derived[build]
+
+
+def load_compact(model_dir, use_cache=True):
+    """Load a model directory into a CompactStore: returns (model, index) views."""
+    store = CompactStore.from_model_dir(model_dir, use_cache)
+    return StoreModel(store), StoreIndex(store)
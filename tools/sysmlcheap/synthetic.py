@@ -0,0 +1,249 @@
+"""
+SysMLcheap Synthetic Models
+Generates metamodel-conformant models of any size for benchmarks. The shape
+knobs stress the structures that matter for scaling: deep package trees,
+wide block decompositions wired by connectors, dense requirement trace webs
+and long include chains. Generated models validate clean, so any issue a benchmark reports
+is a regression, not noise.
+"""
+
+import os
+
+import yaml
+
+# Default shape; every knob can be overridden per call.
+SHAPE = {
+    "depth": 12,    # package nesting depth (a spine of this many nested packages)
+    "fanout": 4,    # child packages per package below the spine
+    "width": 8,     # parts per decomposed block
+    "traces": 4,    # source traces and derived-from links per requirement
+    "chain": 20,    # use cases per include chain
+    "steps": 10,    # actions per activity and states per state machine
+}
+
+
+def synthetic_model(n, n_blocks=None, **shape):
+    """Build an in-memory model with roughly n top-level elements, of which
+    n_blocks (default n // 5) are blocks."""
+    shape = {**SHAPE, **shape}
+    depth, fanout, width = shape["depth"], shape["fanout"], shape["width"]
+    traces, chain, steps = shape["traces"], shape["chain"], shape["steps"]
+
+    n_pkg = max(depth, n // 50)
+    n_src = max(1, n // 40)
+    n_sig = 2 * max(1, n // 50)   # even: signals alternate logical / physical
+    n_ib = 2 * max(1, n // 50)    # even: interface blocks alternate logical / physical
+    n_act = max(1, n // 50)
+    n_blk = max(width + 2, n // 5 if n_blocks is None else n_blocks)
+    n_req = max(2, n * 3 // 10)
+    n_fn = max(1, n // 200)        # activities
+    n_stm = max(1, n // 200)       # state machines
+    n_uc = max(1, n - n_pkg - n_src - n_sig - n_ib - n_act - n_blk - n_req - n_fn - n_stm)
+
+    def owner(i):
+        return f"pkg_{i % n_pkg}"
+
+    # Packages: a spine `depth` deep, the rest hung off it `fanout` at a time.
+    packages = []
+    for i in range(n_pkg):
+        pkg = {"id": f"pkg_{i}", "name": f"Package {i}"}
+        if 0 < i < depth:
+            pkg["ownerRef"] = f"pkg_{i - 1}"
+        elif i >= depth:
+            pkg["ownerRef"] = f"pkg_{(i - depth) // fanout}"
+        packages.append(pkg)
+
+    sources = [{"id": f"src_{i}", "name": f"Source {i}", "fileOrUrl": f"doc_{i}.md",
+                "ownerRef": owner(i)} for i in range(n_src)]
+
+    # Signals: two interleaved taxonomies (even = logical, odd = physical).
+    signals = []
+    for i in range(n_sig):
+        sig = {"id": f"sig_{i}", "name": f"Signal {i}",
+               "documentation": f"Synthetic signal {i}.",
+               "stereotype": "logical" if i % 2 == 0 else "physical",
+               "ownerRef": owner(i)}
+        if i >= 2:
+            sig["generalizationRefs"] = [f"sig_{((i // 2 - 1) // 3) * 2 + i % 2}"]
+        signals.append(sig)
+
+    interface_blocks = []
+    for i in range(n_ib):
+        interface_blocks.append({
+            "id": f"ib_{i}", "name": f"Interface {i}",
+            "stereotype": "logical" if i % 2 == 0 else "physical",
+            "ownerRef": owner(i),
+            "flowProperties": [{
+                "id": f"fp_{i}_{k}", "name": f"flow {k}",
+                "direction": ("out", "inout")[k],
+                "typeRef": f"sig_{(i + 2 * k) % n_sig}",
+            } for k in range(2)],
+        })
+
+    # Blocks: one context block, then logical and physical blocks that each
+    # decompose into `width` parts of the same stereotype (a width-ary tree).
+    # Every block has a port; all but the first of each stereotype also have
+    # a conjugated port typed like the port of the block before it, so each
+    # pair of neighbouring parts is wired port → conjugated port by a
+    # connector in their parent, carrying one item flow.
+    n_phys = (n_blk - 1) // 4
+    n_log = n_blk - 1 - n_phys
+    blocks = [{
+        "id": "blk_0", "name": "System Context",
+        "documentation": "Synthetic system context.",
+        "stereotype": "context", "ownerRef": owner(0),
+        "parts": [{"id": f"pp_0_{k}", "name": f"part {k}", "typeRef": f"blk_{1 + k}"}
+                  for k in range(min(width, n_log))],
+    }]
+    for stereo, first, count in (("logical", 1, n_log), ("physical", 1 + n_log, n_phys)):
+        def port_type(i):
+            return (2 * i + (stereo == "physical")) % n_ib
+
+        for j in range(count):
+            i = first + j
+            blk = {
+                "id": f"blk_{i}", "name": f"Block {i}",
+                "documentation": f"Synthetic {stereo} block {i}.",
+                "stereotype": stereo, "ownerRef": owner(i),
+                "ports": [{"id": f"port_{i}", "name": "port", "typeRef": f"ib_{port_type(i)}"}],
+            }
+            if j:
+                blk["ports"].append({"id": f"cport_{i}", "name": "conjugated port",
+                                     "typeRef": f"ib_{port_type(i - 1)}", "conjugated": True})
+            children = range(j * width + 1, min(j * width + width + 1, count))
+            if children:
+                blk["parts"] = [{"id": f"pp_{i}_{c}", "name": f"part {c}",
+                                 "typeRef": f"blk_{first + c}"} for c in children]
+            if len(children) > 1:
+                wired = [first + c for c in children[:-1]]
+                blk["connectors"] = [{"id": f"conn_{k}", "name": f"link {k}",
+                                      "sourcePortRef": f"port_{k}", "targetPortRef": f"cport_{k + 1}",
+                                      "itemFlowRefs": [f"flow_{k}"]} for k in wired]
+                blk["itemFlows"] = [{"id": f"flow_{k}", "name": f"flow {k}",
+                                     "conveyedSignalRefs": [f"sig_{port_type(k) % n_sig}"],
+                                     "connectorRef": f"conn_{k}"} for k in wired]
+            if stereo == "physical" and n_log:
+                blk["realizationRefs"] = [f"blk_{1 + j % n_log}"]
+            blocks.append(blk)
+
+    # Requirements: every one traces to sources; all but the first derive from
+    # earlier ones, and every tenth is a performance requirement refining its
+    # (functional) predecessor.
+    requirements = []
+    for i in range(n_req):
+        req = {
+            "id": f"req_{i}", "name": f"Requirement {i}",
+            "text": f"The system shall do thing {i}.",
+            "kind": "performance" if i % 10 == 9 else "functional",
+            "ownerRef": owner(i),
+            "traceRefs": sorted({f"src_{(i * 7 + k) % n_src}" for k in range(traces)}),
+        }
+        if i:
+            req["deriveRefs"] = sorted({f"req_{(i * 31 + k * 17) % i}" for k in range(traces)})
+        if i % 10 == 9:
+            req["refineRefs"] = [f"req_{i - 1}"]
+        if n_log:
+            req["satisfiedByRefs"] = [f"blk_{1 + i % n_log}"]
+        requirements.append(req)
+
+    # Use cases: include chains `chain` long; each head has an actor and a trace,
+    # the rest qualify for UCACTOR/UCTRACE through their incoming include.
+    use_cases = []
+    for i in range(n_uc):
+        uc = {"id": f"uc_{i}", "name": f"Use Case {i}",
+              "documentation": f"Synthetic use case {i}.", "ownerRef": owner(i)}
+        if i % chain == 0:
+            uc["actorRefs"] = [f"act_{(i // chain) % n_act}"]
+            uc["traceRefs"] = [f"req_{i % n_req}"]
+        if i + 1 < n_uc and (i + 1) % chain:
+            uc["includeRefs"] = [f"uc_{i + 1}"]
+        use_cases.append(uc)
+
+    n_heads = -(-n_uc // chain)
+    actors = [{
+        "id": f"act_{i}", "name": f"Actor {i}",
+        "documentation": f"Synthetic actor {i}.", "ownerRef": owner(i),
+        "useCaseRefs": [f"uc_{(i % n_heads) * chain}"],
+    } for i in range(n_act)]
+
+    # Activities: initial → `steps` opaque actions → a decision that either
+    # loops back to the first action or ends; each action hands the next an
+    # object through a pin pair alongside the control flow.
+    activities = []
+    for i in range(n_fn):
+        nodes = [{"id": f"an_{i}_init", "kind": "initial"}]
+        edges = [{"id": f"ae_{i}_start", "kind": "controlFlow",
+                  "sourceRef": f"an_{i}_init", "targetRef": f"an_{i}_0"}]
+        for j in range(steps):
+            action = {"id": f"an_{i}_{j}", "name": f"step {j}", "kind": "opaqueAction",
+                      "body": f"do step {j}"}
+            if j:
+                action["inputPins"] = [{"id": f"pin_{i}_{j}_in", "direction": "in",
+                                        "typeRef": f"sig_{j % n_sig}"}]
+            if j + 1 < steps:
+                action["outputPins"] = [{"id": f"pin_{i}_{j}_out", "direction": "out",
+                                         "typeRef": f"sig_{(j + 1) % n_sig}"}]
+                edges.append({"id": f"ae_{i}_{j}_object", "kind": "objectFlow",
+                              "sourceRef": f"pin_{i}_{j}_out", "targetRef": f"pin_{i}_{j + 1}_in"})
+            nodes.append(action)
+            edges.append({"id": f"ae_{i}_{j}", "kind": "controlFlow", "sourceRef": f"an_{i}_{j}",
+                          "targetRef": f"an_{i}_{j + 1}" if j + 1 < steps else f"an_{i}_decide"})
+        nodes += [{"id": f"an_{i}_decide", "name": "again?", "kind": "decision", "decisionName": "again?"},
+                  {"id": f"an_{i}_final", "kind": "activityFinal"}]
+        edges += [{"id": f"ae_{i}_again", "kind": "controlFlow", "guard": "[again]",
+                   "sourceRef": f"an_{i}_decide", "targetRef": f"an_{i}_0"},
+                  {"id": f"ae_{i}_done", "kind": "controlFlow", "guard": "[else]",
+                   "sourceRef": f"an_{i}_decide", "targetRef": f"an_{i}_final"}]
+        activities.append({"id": f"fn_{i}", "name": f"Activity {i}", "ownerRef": owner(i),
+                           "documentation": f"Synthetic activity {i}.",
+                           "nodes": nodes, "edges": edges, "diagrams": [f"fn_{i}_ad"]})
+
+    # State machines: a ring of `steps` signal-triggered states through a
+    # choice that goes round again or on to a final state.
+    state_machines = []
+    for i in range(n_stm):
+        states = [{"id": f"st_{i}_{j}", "name": f"State {j}", "kind": "simple",
+                   "documentation": f"Synthetic state {j}."} for j in range(steps)]
+        states += [{"id": f"st_{i}_choice", "name": "Choice", "kind": "choice",
+                    "documentation": "Go round again?"},
+                   {"id": f"st_{i}_final", "name": "Final", "kind": "final",
+                    "documentation": "Done."}]
+        transitions = [{"id": f"tr_{i}_{j}", "sourceRef": f"st_{i}_{j}",
+                        "targetRef": f"st_{i}_{j + 1}" if j + 1 < steps else f"st_{i}_choice",
+                        "trigger": {"kind": "signal", "signalRef": f"sig_{j % n_sig}"}}
+                       for j in range(steps)]
+        transitions += [{"id": f"tr_{i}_again", "sourceRef": f"st_{i}_choice",
+                         "targetRef": f"st_{i}_0", "guard": "[again]"},
+                        {"id": f"tr_{i}_done", "sourceRef": f"st_{i}_choice",
+                         "targetRef": f"st_{i}_final", "guard": "[else]"}]
+        state_machines.append({"id": f"stm_{i}", "name": f"State Machine {i}",
+                               "ownerRef": f"blk_{1 + i % (n_blk - 1)}",
+                               "states": states, "transitions": transitions})
+
+    return {
+        "packages": packages,
+        "requirements": requirements,
+        "sources": sources,
+        "actors": actors,
+        "useCases": use_cases,
+        "blocks": blocks,
+        "interfaceBlocks": interface_blocks,
+        "signals": signals,
+        "terms": [],
+        "testCases": [],
+        "activities": activities,
+        "stateMachines": state_machines,
+    }
+
+
+def write_model(model, model_dir, n_files):
+    """Split a model across n_files YAML files, round-robin within each key."""
+    files = [{} for _ in range(n_files)]
+    for key, elems in model.items():
+        for i, elem in enumerate(elems):
+            files[i % n_files].setdefault(key, []).append(elem)
+    dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+    for i, data in enumerate(files):
+        with open(os.path.join(model_dir, f"part_{i:04d}.yaml"), "w") as f:
+            yaml.dump(data, f, Dumper=dumper, sort_keys=False)
+    return files
@@ -0,0 +1,176 @@
+"""
+SysMLcheap Views
+A slice of the loaded model, for tools that should only look at one release
+scope (ADR-009 status tags) or one variant (ADR-015 context blocks) of the
+150% model. A view never copies an element: ModelView hands out lists of the
+same dicts, each built the first time its key is read, and IndexView answers
+lookups for the slice's IDs only.
+"""
+
+from collections.abc import Mapping
+
+from . import profile
+from .graph import Graph
+from .model import DEFAULT_STATUS, STATUSES, iter_unit
+
+# References a context slice does not follow: they point from a requirement
+# down to whichever designs satisfy or verify it, and so into other variants.
+DOWNSTREAM_REFS = frozenset({"satisfiedByRefs", "verifiedByRefs"})
+
+
+class ModelView(Mapping):
+    """Read-only stand-in for the model dict, holding only top-level elements
+    whose ID is in `keep`."""
+
+    def __init__(self, model, keep):
+        self._model = model
+        self._keep = keep
+        self._lists = {}
+
+    def __getitem__(self, key):
+        elems = self._lists.get(key)
+        if elems is None:
+            keep = self._keep
+            elems = self._lists[key] = [elem for elem in self._model[key] if elem["id"] in keep]
+        return elems
+
+    def __iter__(self):
+        return iter(self._model)
+
+    def __len__(self):
+        return len(self._model)
+
+
+class IndexView(Mapping):
+    """Read-only stand-in for ModelIndex over the slice's IDs (nested ones
+    included); referrers outside the slice are left out."""
+
+    def __init__(self, index, ids):
+        self._index = index
+        self.ids = ids
+        self._derived = {}
+
+    def __getitem__(self, elem_id):
+        if elem_id not in self.ids:
+            raise KeyError(elem_id)
+        return self._index[elem_id]
+
+    def __contains__(self, elem_id):
+        return elem_id in self.ids
+
+    def __iter__(self):
+        return (elem_id for elem_id in self._index if elem_id in self.ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def referrers(self, elem_id, field):
+        if elem_id not in self.ids:
+            return []
+        return [ref for ref in self._index.referrers(elem_id, field) if ref in self.ids]
+
+    def kind_codes(self, ids):
+        inside = self.ids
+        return [code if elem_id in inside else None
+                for elem_id, code in zip(ids, self._index.kind_codes(ids))]
+
+    def of_kind(self, kind):
+        return [elem for elem in self._index.of_kind(kind) if elem["id"] in self.ids]
+
+    def derived(self, build):
+        """build(self): built over the view, not the whole index, so what it
+        works out only sees the slice."""
+        if build not in self._derived:
+            self._derived[build] = build(self)
+        return self._derived[build]
+
+
+# ── Selecting ────────────────────────────────────────────────────────────────
+
+def with_status(model, statuses):
+    """IDs of the top-level elements whose status is one of `statuses`."""
+    return {elem["id"] for elems in model.values() for elem in elems
+            if (elem.get("status") or DEFAULT_STATUS) in statuses}
+
+
+def top_level(index, elem_id):
+    """The top-level element an element is nested in (itself if top-level)."""
+    elem = index[elem_id]
+    while "_owner" in elem:
+        elem = index[elem["_owner"]]
+    return elem["id"]
+
+
+def in_context(model, index, context_id):
+    """IDs of the top-level elements reachable from a context block through
+    its parts, ports, realizations and onward, following every reference
+    except DOWNSTREAM_REFS and never entering another context block."""
+    graph = Graph()
+    for elems in model.values():
+        for elem in elems:
+            graph.add_node(elem["id"])
+    for elems in model.values():
+        for elem in elems:
+            if elem.get("stereotype") == "context" and elem["id"] != context_id:
+                continue
+            for unit in iter_unit(elem):
+                for field, refs in unit.items():
+                    if not field.endswith(("Ref", "Refs")) or field in DOWNSTREAM_REFS or not refs:
+                        continue
+                    for ref_id in ((refs,) if isinstance(refs, str) else refs):
+                        if ref_id in index:
+                            graph.add_edge(elem["id"], top_level(index, ref_id))
+    return graph.reachable([context_id])
+
+
+def select(model, index, statuses=None, context=None):
+    """(ModelView, IndexView) of the elements matching both filters; a filter
+    left as None keeps everything."""
+    with profile.span("phase", "view.select") as span:
+        keep = None
+        if statuses:
+            keep = with_status(model, statuses)
+        if context:
+            reachable = in_context(model, index, context)
+            keep = reachable if keep is None else keep & reachable
+        if keep is None:
+            keep = {elem["id"] for elems in model.values() for elem in elems}
+        ids = set()
+        for key in model:
+            for elem in model[key]:
+                if elem["id"] in keep:
+                    ids.update(unit["id"] for unit in iter_unit(elem))
+        span.elements = len(keep)
+    return ModelView(model, keep), IndexView(index, ids)
+
+
+# ── Command Line ─────────────────────────────────────────────────────────────
+
+def add_arguments(parser):
+    """The --status / --context options of the tools that can work on a slice."""
+    parser.add_argument("--status", action="append", choices=STATUSES,
+                        help="only consider elements with this status (repeatable)")
+    parser.add_argument("--context", metavar="BLOCK_ID",
+                        help="only consider elements reachable from this context block")
+
+
+def from_args(args, model, index):
+    """(model, index) narrowed by --status / --context; unchanged without them.
+
+    Raises KeyError for a --context that is not a block in the model.
+    """
+    if not args.status and not args.context:
+        return model, index
+    if args.context and (args.context not in index
+                         or index[args.context].get("_kind") != "Block"):
+        raise KeyError(f"--context {args.context}: no such block in the model")
+    sliced, sliced_index = select(model, index, args.status, args.context)
+    total = sum(len(elems) for elems in model.values())
+    scope = []
+    if args.status:
+        scope.append("status " + ", ".join(args.status))
+    if args.context:
+        scope.append(f"context {args.context}")
+    print(f"   Slice: {sum(len(elems) for elems in sliced.values())} of {total} "
+          f"top-level elements ({'; '.join(scope)})")
+    return sliced, sliced_index
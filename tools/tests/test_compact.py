@@ -0,0 +1,74 @@
+"""
+The compact columnar store against the dict one: validating a model held in
+either, whole or sliced, serially or across workers, reports the same issues
+in the same order.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from sysmlcheap import view
+from sysmlcheap.model import build_index, load_model
+from sysmlcheap.store import load_compact
+from sysmlcheap.synthetic import synthetic_model, write_model
+from validate import validate_model
+
+VALIDATE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "validate.py")
+
+
+def as_rows(issues):
+    return [issue.to_dict() for issue in issues]
+
+
+def broken_model(n):
+    """A synthetic model with issues for the reference, interface, graph and
+    behavior rules to find."""
+    model = synthetic_model(n)
+    model["requirements"][0]["traceRefs"].append("src_missing")
+    model["packages"][0]["ownerRef"] = model["packages"][-1]["id"]
+    model["blocks"][1]["ports"][0]["conjugated"] = True
+    model["interfaceBlocks"][0].pop("flowProperties")
+    machine = model["stateMachines"][0]
+    machine["transitions"] = machine["transitions"][1:]
+    return model
+
+
+class CompactStoreValidation(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.model_dir = tempfile.mkdtemp()
+        write_model(broken_model(400), cls.model_dir, 4)
+        model = load_model(cls.model_dir, use_cache=False)
+        cls.model, cls.index = model, build_index(model)
+        cls.expected = as_rows(validate_model(cls.model, cls.index))
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.model_dir)
+
+    def test_model_has_issues_across_families(self):
+        self.assertGreaterEqual(len({row["rule"] for row in self.expected}), 5)
+
+    def test_same_issues(self):
+        model, index = load_compact(self.model_dir, use_cache=False)
+        for jobs in (1, 2):
+            with self.subTest(jobs=jobs):
+                self.assertEqual(as_rows(validate_model(model, index, jobs)), self.expected)
+
+    def test_same_issues_in_a_slice(self):
+        model, index = load_compact(self.model_dir, use_cache=False)
+        expected = validate_model(*view.select(self.model, self.index, context="blk_0"))
+        self.assertTrue(expected)
+        issues = validate_model(*view.select(model, index, context="blk_0"))
+        self.assertEqual(as_rows(issues), as_rows(expected))
+
+    def test_command_line(self):
+        result = subprocess.run([sys.executable, VALIDATE, self.model_dir, "--compact", "--jobs", "2",
+                                 "--format", "jsonl"], capture_output=True, text=True)
+        self.assertEqual(result.returncode, 1, result.stderr)
+        self.assertEqual([json.loads(line) for line in result.stdout.splitlines()], self.expected)
@@ -0,0 +1,190 @@
+"""
+The IncrementalValidator against cold runs: after every scripted edit its
+issues must be the ones a full validate_model over the same files reports,
+in the same order.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import yaml
+
+from sysmlcheap.model import build_index, load_model
+from sysmlcheap.positions import split_items
+from sysmlcheap.synthetic import synthetic_model, write_model
+from validate import IncrementalValidator, validate_model
+
+MODEL_DIR = Path(__file__).resolve().parents[2] / "model"
+
+
+def as_rows(issues):
+    return [issue.to_dict() for issue in issues]
+
+
+def item(text, elem_id):
+    """The text of the top-level list item that defines elem_id."""
+    return next(chunk for _, _, chunk in split_items(text) if chunk.startswith(f"  - id: {elem_id}\n"))
+
+
+class IncrementalTestCase(unittest.TestCase):
+    def setUp(self):
+        self.model_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.model_dir)
+
+    def start(self):
+        self.validator = IncrementalValidator(self.model_dir)
+        self.validator.full_run()
+        self.assertMatchesColdRun()
+
+    def assertMatchesColdRun(self):
+        model = load_model(self.model_dir, use_cache=False)
+        cold = validate_model(model, build_index(model))
+        self.assertEqual(as_rows(self.validator.issues()), as_rows(cold))
+        return cold
+
+    def changed(self, *names):
+        self.validator.update([str(self.model_dir / name) for name in names])
+        return self.assertMatchesColdRun()
+
+
+class ProjectModelEdits(IncrementalTestCase):
+    """Text edits to a copy of the project's model, as an editor makes them."""
+
+    def setUp(self):
+        super().setUp()
+        for path in MODEL_DIR.glob("*.yaml"):
+            shutil.copy(path, self.model_dir)
+        self.start()
+
+    def read(self, name):
+        return (self.model_dir / name).read_text(encoding="utf-8")
+
+    def write(self, name, text):
+        (self.model_dir / name).write_text(text, encoding="utf-8")
+
+    def replace(self, name, old, new, count=1):
+        text = self.read(name)
+        self.assertIn(old, text)
+        self.write(name, text.replace(old, new, count))
+
+    def test_renamed_reference(self):
+        self.replace("behavioral.yaml", "  - id: uc_learn_grammar\n", "  - id: uc_grammar\n")
+        cold = self.changed("behavioral.yaml")
+        self.assertTrue(any("uc_learn_grammar" in issue.message for issue in cold))
+        self.replace("behavioral.yaml", "- uc_learn_grammar\n", "- uc_grammar\n", -1)
+        self.assertEqual(self.changed("behavioral.yaml"), [])
+
+    def test_changed_field(self):
+        self.replace("requirements.yaml", "    kind: functional\n", "    kind: wishful\n")
+        self.assertTrue(self.changed("requirements.yaml"))
+        self.replace("sources.yaml", "  - id: src_design_doc\n    name: Croatian App Design Document\n",
+                     "  - id: src_design_doc\n")
+        self.changed("sources.yaml")
+
+    def test_duplicate_ids(self):
+        packages = self.read("packages.yaml")
+        glossary = item(packages, "pkg_glossary")
+        # Pasted twice: once in the same file, once ahead of it in another.
+        self.write("packages.yaml", packages + glossary)
+        self.changed("packages.yaml")
+        self.write("behavioral.yaml", "packages:\n" + glossary + self.read("behavioral.yaml"))
+        cold = self.changed("behavioral.yaml")
+        self.assertTrue(any(issue.rule == "UNIQUE_ID" for issue in cold))
+        # The copy that wins now has no name.
+        self.replace("behavioral.yaml", "    name: Glossary\n", "")
+        self.changed("behavioral.yaml")
+        self.write("packages.yaml", packages)
+        self.changed("packages.yaml")
+        self.replace("behavioral.yaml", "packages:\n" + glossary.replace("    name: Glossary\n", ""), "")
+        self.assertEqual(self.changed("behavioral.yaml"), [])
+
+    def test_moved_element(self):
+        behavioral = self.read("behavioral.yaml")
+        grammar = item(behavioral, "uc_learn_grammar")
+        self.write("behavioral.yaml", behavioral.replace(grammar, ""))
+        self.write("aa_moved.yaml", "useCases:\n" + grammar)
+        self.changed("behavioral.yaml", "aa_moved.yaml")
+        # Broken where it now stands, then moved again past its old file.
+        self.replace("aa_moved.yaml", "actorRefs: [act_lqs]", "actorRefs: [act_nobody]")
+        self.assertTrue(self.changed("aa_moved.yaml"))
+        os.rename(self.model_dir / "aa_moved.yaml", self.model_dir / "zz_moved.yaml")
+        self.changed("aa_moved.yaml", "zz_moved.yaml")
+
+    def test_deleted_file(self):
+        sources = self.read("sources.yaml")
+        (self.model_dir / "sources.yaml").unlink()
+        cold = self.changed("sources.yaml")
+        self.assertTrue(any("src_design_doc" in issue.message for issue in cold))
+        self.write("sources.yaml", sources)
+        self.assertEqual(self.changed("sources.yaml"), [])
+
+    def test_reordered_and_inserted_items(self):
+        packages = self.read("packages.yaml")
+        logical, physical = item(packages, "pkg_logical"), item(packages, "pkg_physical")
+        self.write("packages.yaml", packages.replace(logical + physical, physical + logical))
+        self.changed("packages.yaml")
+        self.replace("packages.yaml", "packages:\n", "packages:\n  - id: pkg_new\n    ownerRef: pkg_missing\n\n")
+        self.assertTrue(self.changed("packages.yaml"))
+
+    def test_ownership_cycle(self):
+        self.replace("packages.yaml", "    ownerRef: null\n", "    ownerRef: pkg_glossary\n")
+        cold = self.changed("packages.yaml")
+        self.assertTrue(any(issue.element_id == "pkg_root" for issue in cold))
+        self.replace("packages.yaml", "    ownerRef: pkg_glossary\n", "    ownerRef: null\n")
+        self.assertEqual(self.changed("packages.yaml"), [])
+
+
+class SyntheticModelEdits(IncrementalTestCase):
+    """Data edits to a generated model spread over several files, reaching the
+    graph, interface and behavior rules the project's model leaves clean."""
+
+    def setUp(self):
+        super().setUp()
+        self.files = write_model(synthetic_model(300), self.model_dir, 4)
+        self.start()
+
+    def find(self, elem_id):
+        for i, data in enumerate(self.files):
+            for key, elems in data.items():
+                for elem in elems:
+                    if elem["id"] == elem_id:
+                        return i, key, elem
+        raise KeyError(elem_id)
+
+    def save(self, *numbers):
+        numbers = sorted(set(numbers))
+        for i in numbers:
+            with open(self.model_dir / f"part_{i:04d}.yaml", "w") as f:
+                yaml.safe_dump(self.files[i], f, sort_keys=False)
+        return self.changed(*(f"part_{i:04d}.yaml" for i in numbers))
+
+    def test_cycles(self):
+        i, _, uc = self.find("uc_1")
+        j, _, first = self.find("uc_0")
+        uc["includeRefs"] = ["uc_0"]
+        self.assertTrue(self.save(i))
+        first["includeRefs"] = []
+        self.save(j)
+        uc.pop("includeRefs")
+        self.save(i)
+
+    def test_state_machine(self):
+        i, _, machine = self.find("stm_0")
+        transitions = machine["transitions"]
+        machine["transitions"] = transitions[1:]
+        self.assertTrue(self.save(i))
+        machine["transitions"] = transitions
+        self.save(i)
+
+    def test_moved_and_renamed_nested_elements(self):
+        i, key, block = self.find("blk_1")
+        self.files[i][key].remove(block)
+        self.files[0][key].insert(0, block)
+        self.save(i, 0)
+        block["parts"][0]["id"] += "_renamed"
+        self.save(0)
+        self.files[0][key].remove(block)
+        self.save(0)
@@ -0,0 +1,112 @@
+"""
+A scripted editor session with the language server: requests go through
+Server.dispatch and the replies are read back off its framed output.
+"""
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from lsp import Server, read_message, uri_of
+
+MODEL_DIR = Path(__file__).resolve().parents[2] / "model"
+
+
+class LanguageServerSession(unittest.TestCase):
+    def setUp(self):
+        self.model_dir = os.path.realpath(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.model_dir)
+        for path in MODEL_DIR.glob("*.yaml"):
+            shutil.copy(path, self.model_dir)
+        self.out = io.BytesIO()
+        self.server = Server(self.out, self.model_dir)
+        self.next_id = 0
+        self.notifications = []
+
+        reply = self.request("initialize", {"processId": None, "rootUri": None, "capabilities": {}})
+        capabilities = reply["capabilities"]
+        self.assertTrue(capabilities["definitionProvider"])
+        self.assertIn("completionProvider", capabilities)
+        self.notify("initialized", {})
+        self.assertEqual(self.notifications, [])  # the project's model is clean
+
+        self.path = os.path.join(self.model_dir, "behavioral.yaml")
+        self.uri = uri_of(self.path)
+        with open(self.path, encoding="utf-8") as f:
+            self.lines = f.read().split("\n")
+        self.notify("textDocument/didOpen", {"textDocument": {
+            "uri": self.uri, "languageId": "yaml", "version": 1, "text": "\n".join(self.lines)}})
+
+    def messages(self):
+        """Everything the server wrote since the last call."""
+        stream = io.BytesIO(self.out.getvalue())
+        self.out.seek(0)
+        self.out.truncate()
+        messages = []
+        while (message := read_message(stream)) is not None:
+            messages.append(message)
+        return messages
+
+    def notify(self, method, params):
+        self.server.dispatch({"jsonrpc": "2.0", "method": method, "params": params})
+        for message in self.messages():
+            self.assertEqual(message["method"], "textDocument/publishDiagnostics")
+            self.notifications.append(message["params"])
+
+    def request(self, method, params):
+        self.next_id += 1
+        self.server.dispatch({"jsonrpc": "2.0", "id": self.next_id, "method": method, "params": params})
+        replies = self.messages()
+        self.assertEqual([reply["id"] for reply in replies], [self.next_id])
+        self.assertNotIn("error", replies[0])
+        return replies[0]["result"]
+
+    def at(self, line, character):
+        return {"textDocument": {"uri": self.uri}, "position": {"line": line, "character": character}}
+
+    def line_of(self, text):
+        return next(n for n, line in enumerate(self.lines) if line == text)
+
+    def test_completion_offers_only_targets_of_the_field(self):
+        n = self.line_of("      - uc_access_application")
+        items = self.request("textDocument/completion", self.at(n, len("      - uc_acc")))["items"]
+        labels = [item["label"] for item in items]
+        self.assertIn("uc_access_application", labels)
+        self.assertTrue(all(label.startswith("uc_acc") for label in labels))
+        self.assertEqual(items[0]["textEdit"]["range"], {"start": {"line": n, "character": 8},
+                                                         "end": {"line": n, "character": 14}})
+
+        n = self.line_of("    ownerRef: pkg_behavioral")
+        labels = [item["label"] for item in
+                  self.request("textDocument/completion", self.at(n, len("    ownerRef: ")))["items"]]
+        self.assertIn("pkg_behavioral", labels)
+        self.assertTrue(all(label.startswith("pkg_") for label in labels))
+
+    def test_definition(self):
+        n = self.line_of("      - uc_access_application")
+        location = self.request("textDocument/definition", self.at(n, 12))
+        defined = self.line_of("  - id: uc_access_application")
+        self.assertEqual(location, {"uri": self.uri, "range": {"start": {"line": defined, "character": 8},
+                                                               "end": {"line": defined, "character": 29}}})
+        self.assertIsNone(self.request("textDocument/definition", self.at(0, 0)))
+
+    def test_diagnostics_follow_edits(self):
+        n = self.line_of("      - uc_access_application")
+        edited = list(self.lines)
+        edited[n] = "      - uc_nowhere"
+        self.notify("textDocument/didChange", {"textDocument": {"uri": self.uri, "version": 2},
+                                               "contentChanges": [{"text": "\n".join(edited)}]})
+        published = self.notifications.pop()
+        self.assertEqual(published["uri"], self.uri)
+        [diagnostic] = published["diagnostics"]
+        self.assertEqual(diagnostic["code"], "REF_INTEGRITY")
+        self.assertEqual(diagnostic["message"], "Unresolved reference: uc_nowhere")
+        self.assertEqual(diagnostic["range"]["start"], {"line": n, "character": 8})
+
+        self.notify("textDocument/didChange", {"textDocument": {"uri": self.uri, "version": 3},
+                                               "contentChanges": [{"text": "\n".join(self.lines)}]})
+        self.assertEqual(self.notifications.pop(), {"uri": self.uri, "diagnostics": []})
+        self.assertEqual(self.request("shutdown", {}), None)
@@ -5,291 +5,522 @@ Validates YAML model files against the metamodel rules.
 Reverse-engineered from SAIC DE Validation Rules v27.
 """
 
-import yaml
 import sys
 import os
+import time
+import gc
+import argparse
+import contextlib
+import multiprocessing
+import hashlib
+import pickle
+from bisect import bisect_right
 from pathlib import Path
-from collections import defaultdict
-
-# ── Helpers ──────────────────────────────────────────────────────────────────
-
-class Issue:
-    def __init__(self, rule, element_id, element_name, severity, message):
-        self.rule = rule
-        self.element_id = element_id
-        self.element_name = element_name
-        self.severity = severity  # error, warning, info
-        self.message = message
-
-    def __str__(self):
-        icon = {"error": "❌", "warning": "⚠️", "info": "ℹ️"}.get(self.severity, "?")
-        return f"  {icon} [{self.rule}] {self.element_name} ({self.element_id}): {self.message}"
-
-
-def load_model(model_dir):
-    """Load all YAML files from the model directory into a combined dict."""
-    model = {
-        "packages": [],
-        "requirements": [],
-        "sources": [],
-        "actors": [],
-        "useCases": [],
-        "blocks": [],
-        "interfaceBlocks": [],
-        "signals": [],
-        "terms": [],
-        "testCases": [],
-    }
-    for yaml_file in sorted(Path(model_dir).glob("*.yaml")):
-        with open(yaml_file) as f:
-            data = yaml.safe_load(f)
-            if data:
-                for key in model:
-                    if key in data:
-                        model[key].extend(data[key])
-    return model
-
-
-def build_index(model):
-    """Build a lookup dict: id → element (with _kind added)."""
-    index = {}
-    kind_map = {
-        "packages": "Package",
-        "requirements": "Requirement",
-        "sources": "SourceContent",
-        "actors": "Actor",
-        "useCases": "UseCase",
-        "blocks": "Block",
-        "interfaceBlocks": "InterfaceBlock",
-        "signals": "Signal",
-        "terms": "Term",
-        "testCases": "TestCase",
-    }
-    for key, kind in kind_map.items():
-        for elem in model.get(key, []):
-            elem["_kind"] = kind
-            index[elem["id"]] = elem
-            # Index nested elements too
-            for part in elem.get("parts", []):
-                part["_kind"] = "PartProperty"
-                part["_ownerBlock"] = elem["id"]
-                index[part["id"]] = part
-            for port in elem.get("ports", []):
-                port["_kind"] = "ProxyPort"
-                port["_ownerBlock"] = elem["id"]
-                index[port["id"]] = port
-            for fp in elem.get("flowProperties", []):
-                fp["_kind"] = "FlowProperty"
-                index[fp["id"]] = fp
-            for op in elem.get("operations", []):
-                op["_kind"] = "Operation"
-                index[op["id"]] = op
-    return index
-
-
-def ref_exists(index, ref_id):
-    return ref_id in index
-
-
-def check_refs(index, refs, issues, rule, elem):
-    """Check that all refs in a list resolve."""
-    for ref_id in (refs or []):
-        if not ref_exists(index, ref_id):
-            issues.append(Issue(rule, elem["id"], elem.get("name", "?"),
-                               "error", f"Unresolved reference: {ref_id}"))
+from collections import Counter, defaultdict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from sysmlcheap import behavior, cache, interfaces, profile, view
+from sysmlcheap.behavior import check_state_reachability
+from sysmlcheap.graph import Graph
+from sysmlcheap.issues import SINKS, ConsoleSink, Issue
+from sysmlcheap.model import (
+    KIND_MAP, KINDS, REVERSE_REFS, ModelIndex, RecordingIndex, build_index, iter_refs,
+    iter_unit, load, load_files, tag_element,
+)
+
+KEY_RANK = {key: rank for rank, key in enumerate(KIND_MAP)}  # model key → place in a loaded model
+from sysmlcheap.positions import DocumentParser
+
+# ── Metamodel Rule Engine ────────────────────────────────────────────────────
+
+METAMODEL_FILE = Path(__file__).resolve().parent.parent / "metamodel" / "metamodel.yaml"
+PLAN_FORMAT = 3  # bump whenever the shape of compile_metamodel's output changes
+
+# A kind's check plan and its steps. message is the property's `message:`
+# text, or None for the generic wording.
+Plan = namedtuple("Plan", "required enums refs")
+RequiredStep = namedtuple("RequiredStep", "prop rule message")
+EnumStep = namedtuple("EnumStep", "prop values rule message")
+# targets: the kinds a ref step allows, None for any; many: a list of IDs (type refs)
+RefStep = namedtuple("RefStep", "prop targets rule message many")
+STEP_TYPES = Plan(RequiredStep, EnumStep, RefStep)
+
+
+def compile_metamodel(metamodel):
+    """Compile metamodel property declarations into per-kind check plans."""
+    plans = {}
+    for kind, spec in metamodel.items():
+        required, enums, refs = [], [], []
+        for prop, pdef in ((spec or {}).get("properties") or {}).items():
+            if prop == "id" or not isinstance(pdef, dict):
+                continue  # ids are checked by validate_uniqueness
+            rule = pdef.get("rule")
+            message = pdef.get("message")
+            ptype = pdef.get("type")
+            if pdef.get("required"):
+                required.append(RequiredStep(prop, rule or "REQUIRED", message))
+            if ptype == "enum":
+                enums.append(EnumStep(prop, tuple(pdef.get("values", [])), rule or "ENUM", message))
+            elif ptype in ("ref", "refs"):
+                target = pdef.get("target")
+                if isinstance(target, str):
+                    target = [target]
+                refs.append(RefStep(prop, frozenset(target) if target else None,
+                                    rule or "REF_TARGET", message, ptype == "refs"))
+        plans[kind] = Plan(tuple(required), tuple(enums), tuple(refs))
+    return plans
+
+
+def plain_plans(plans):
+    """Plans as plain tuples, for the cache: a pickled named tuple would name
+    the module it came from, which is __main__ when validate.py runs as a script."""
+    return {kind: tuple(tuple(map(tuple, steps)) for steps in plan) for kind, plan in plans.items()}
+
+
+def named_plans(plans):
+    """plain_plans undone."""
+    return {kind: Plan(*(tuple(map(step._make, steps)) for step, steps in zip(STEP_TYPES, plan)))
+            for kind, plan in plans.items()}
+
+
+def load_plans(metamodel_file=METAMODEL_FILE):
+    """Return compiled check plans, cached on disk by metamodel content hash."""
+    raw = Path(metamodel_file).read_bytes()
+    digest = hashlib.sha256(raw + f"plan-v{PLAN_FORMAT}".encode()).hexdigest()[:16]
+    cache_file = cache.CACHE_ROOT / f"plans-{digest}.pickle"
+    try:
+        with open(cache_file, "rb") as f:
+            return named_plans(pickle.load(f))
+    except (OSError, pickle.PickleError, EOFError):
+        pass
+    plans = compile_metamodel(cache.parse(raw))
+    try:
+        cache.CACHE_ROOT.mkdir(exist_ok=True)
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_file, "wb") as f:
+            pickle.dump(plain_plans(plans), f)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        pass  # read-only checkout: compile on every run instead
+    return plans
+
+
+def is_missing(value):
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return not value.strip()
+    if isinstance(value, (list, dict)):
+        return not value
+    return False
+
+
+def check_element(plan, elem, index, issues):
+    """Run one compiled plan against a single element."""
+    kind = elem["_kind"]
+    for step in plan.required:
+        if is_missing(elem.get(step.prop)):
+            issues.append(Issue(step.rule, elem["id"], elem.get("name", ""), "error",
+                               step.message or f"{kind} must have {step.prop}"))
+    for step in plan.enums:
+        value = elem.get(step.prop)
+        if value is not None and value not in step.values:
+            message = step.message or f"{step.prop} must be one of {', '.join(step.values)}"
+            issues.append(Issue(step.rule, elem["id"], elem.get("name", ""), "error",
+                               f"{message} (found: {value})"))
+    for step in plan.refs:
+        value = elem.get(step.prop)
+        if not value:
+            continue
+        for ref_id in (value if isinstance(value, list) else (value,)):
+            target = index.get(ref_id)
+            if target is None or (step.targets is not None and target["_kind"] not in step.targets):
+                issues.append(ref_issue(elem, step, ref_id, target and target["_kind"]))
+
+
+def ref_issue(elem, step, ref_id, found_kind):
+    """The issue for one bad reference: unresolved, or to a kind the ref step
+    does not allow."""
+    if found_kind is None:
+        what = "reference" if step.many else step.prop
+        return Issue("REF_INTEGRITY", elem["id"], elem.get("name", ""), "error",
+                     f"Unresolved {what}: {ref_id}")
+    message = step.message or f"{step.prop} must reference {' | '.join(sorted(step.targets))}"
+    return Issue(step.rule, elem["id"], elem.get("name", ""), "error",
+                 f"{message} (found: {found_kind})")
+
+
+def split_plan(plan):
+    """One single-step plan per step, in plan order: [(rule, plan), ...]."""
+    return ([(step.rule, Plan((step,), (), ())) for step in plan.required]
+            + [(step.rule, Plan((), (step,), ())) for step in plan.enums]
+            + [(step.rule, Plan((), (), (step,))) for step in plan.refs])
+
+
+def profile_metamodel(plans, model, index, issues):
+    """validate_metamodel, timing every compiled step under its rule ID.
+
+    Steps still run in plan order, so the issues come out exactly as in an
+    unprofiled run; only the per-step clock reads are added.
+    """
+    steps = {kind: split_plan(plan) for kind, plan in plans.items()}
+    totals = defaultdict(lambda: [0.0, 0])  # rule → [seconds, elements checked]
+    clock = time.perf_counter
+    for key in model:
+        for elem in model[key]:
+            for sub in iter_unit(elem):
+                for rule, step in steps.get(sub["_kind"], ()):
+                    started = clock()
+                    check_element(step, sub, index, issues)
+                    total = totals[rule]
+                    total[0] += clock() - started
+                    total[1] += 1
+    for rule, (seconds, elements) in totals.items():
+        profile.active.record("rule", rule, seconds, elements)
+
+
+def validate_metamodel(model, index, issues):
+    """Required and enum checks for every element, nested ones included.
+
+    Typed references are left to the bulk pass in validate_references.
+    """
+    plans = {kind: plan._replace(refs=()) for kind, plan in load_plans().items()}
+    if profile.active is not None:
+        return profile_metamodel(plans, model, index, issues)
+    for key in model:
+        for elem in model[key]:
+            for sub in iter_unit(elem):
+                plan = plans.get(sub["_kind"])
+                if plan:
+                    check_element(plan, sub, index, issues)
+
+
+# ── Reference Integrity ──────────────────────────────────────────────────────
+# Every ref/refs property the metamodel declares, checked in one bulk pass
+# instead of element by element. One walk over the model gathers the edges
+# into a flat column per (kind, property); each column's target IDs are then
+# resolved in a single call against the index's interned ID → kind-code table
+# and tested against a byte mask of the kinds the property may reference.
+# Clean columns cost two C-level scans; only the misses become Issues, and
+# those are put back in model order.
+
+class RefColumn:
+    """The edges of one ref/refs property of one kind."""
+
+    def __init__(self, order, step):
+        self.order = order      # position among its kind's ref steps
+        self.step = step        # the RefStep
+        self.prop = step.prop
+        self.mask = bytes(step.targets is None or kind in step.targets for kind in KINDS)
+        self.positions = []     # walk position of each element that sets prop,
+        self.elems = []         # that element,
+        self.starts = []        # and the offset of its first edge in targets
+        self.targets = []       # referenced IDs, all fields back to back
+
+    def misses(self, index):
+        """(walk position, order, element, ref ID, found kind or None) per bad edge."""
+        codes = index.kind_codes(self.targets)
+        if None not in codes and all(map(self.mask.__getitem__, codes)):
+            return []
+        misses = []
+        for i, code in enumerate(codes):
+            if code is None or not self.mask[code]:
+                field = bisect_right(self.starts, i) - 1
+                misses.append((self.positions[field], self.order, self.elems[field],
+                               self.targets[i], None if code is None else KINDS[code]))
+        return misses
+
+
+def validate_references(model, index, issues):
+    """Resolve every declared reference and check the kind of what it points at;
+    returns the number of edges checked."""
+    columns = {kind: [RefColumn(order, step) for order, step in enumerate(plan.refs)]
+               for kind, plan in load_plans().items() if plan.refs}
+    position = 0
+    for key in model:
+        for elem in model[key]:
+            for sub in iter_unit(elem):
+                position += 1
+                for column in columns.get(sub["_kind"], ()):
+                    value = sub.get(column.prop)
+                    if not value:
+                        continue
+                    column.positions.append(position)
+                    column.elems.append(sub)
+                    column.starts.append(len(column.targets))
+                    if isinstance(value, list):
+                        column.targets += value
+                    else:
+                        column.targets.append(value)
+
+    misses = []
+    for kind_columns in columns.values():
+        for column in kind_columns:
+            with profile.span("rule", column.step.rule) as span:
+                misses += column.misses(index)
+                span.elements = len(column.elems)
+    misses.sort(key=lambda miss: miss[:2])  # stable: edges of one field keep their order
+    for _, order, elem, ref_id, found in misses:
+        issues.append(ref_issue(elem, columns[elem["_kind"]][order].step, ref_id, found))
+    return sum(len(column.targets) for kind_columns in columns.values() for column in kind_columns)
 
 
 # ── Validation Rules ─────────────────────────────────────────────────────────
+# Required fields, enums and reference targets come from the metamodel (see
+# validate_metamodel and validate_references); the checks below cover the
+# cross-field rules. Each check_* function raises one rule ID on a single
+# top-level element, so that incremental runs can re-check just the elements
+# affected by an edit and the profiler can time every rule where it is run.
+
+def check_requirement_name(req, index, issues):
+    # REQNAME: a short summary name is recommended
+    if not req.get("name"):
+        issues.append(Issue("REQNAME", req["id"], req["id"], "info",
+                           "Requirement should have a short summary name"))
+
+
+def check_requirement_trace(req, index, issues):
+    # REQTRACE: must have trace, derive, or refine
+    if not (req.get("traceRefs") or req.get("deriveRefs") or req.get("refineRefs")):
+        issues.append(Issue("REQTRACE", req["id"], req.get("name", ""), "error",
+                           "Requirement must have at least one trace, derive, or refine relationship"))
 
-def validate_packages(model, index, issues):
-    for pkg in model.get("packages", []):
-        if not pkg.get("name"):
-            issues.append(Issue("PACKAGENAME", pkg["id"], "", "error", "Package must be named"))
 
+def check_performance_refine(req, index, issues):
+    # PERFORMANCEFUNCTIONREFINE
+    if req.get("kind") == "performance" and not req.get("refineRefs"):
+        issues.append(Issue("PERFORMANCEFUNCTIONREFINE", req["id"], req.get("name", ""), "error",
+                           "Performance requirements must refine at least one functional requirement"))
 
-def validate_sources(model, index, issues):
-    for src in model.get("sources", []):
-        if not src.get("name"):
-            issues.append(Issue("ARTIFACTNAME", src["id"], "", "error", "Source content must be named"))
-        if not src.get("fileOrUrl"):
-            issues.append(Issue("SRCCNT", src["id"], src.get("name", ""), "error",
-                               "Source content must have a file name or URL"))
+
+def check_actor_usecase(actor, index, issues):
+    # ACTORUSECASE: must have use cases or generalizations
+    if not actor.get("useCaseRefs") and not actor.get("generalizationRefs"):
+        issues.append(Issue("ACTORUSECASE", actor["id"], actor.get("name", ""), "error",
+                           "Actor must be associated with at least one use case or specialize another actor"))
+
+
+def check_usecase_actor(uc, index, issues):
+    # UCACTOR: must have actor (unless connected via extend/include/generalization)
+    if (not uc.get("actorRefs") and not index.referrers(uc["id"], "includeRefs")
+            and not uc.get("extendRefs")):
+        issues.append(Issue("UCACTOR", uc["id"], uc.get("name", ""), "error",
+                           "Use case must be associated with at least one actor "
+                           "(unless connected via extend/include)"))
+
+
+def check_usecase_trace(uc, index, issues):
+    # UCTRACE
+    if (not uc.get("traceRefs") and not uc.get("extendRefs")
+            and not index.referrers(uc["id"], "includeRefs")):
+        issues.append(Issue("UCTRACE", uc["id"], uc.get("name", ""), "error",
+                           "Use case must have a trace, extend, refine, or incoming include relationship"))
+
+
+def check_context_ports(blk, index, issues):
+    # CONTEXTPORTS: context blocks may not own ports
+    if blk.get("stereotype") == "context" and blk.get("ports"):
+        issues.append(Issue("CONTEXTPORTS", blk["id"], blk.get("name", ""), "error",
+                           "System context blocks may not own ports"))
+
+
+def check_context_parts(blk, index, issues):
+    # CONTEXTPARTS: context blocks must own at least one part
+    if blk.get("stereotype") == "context" and not blk.get("parts"):
+        issues.append(Issue("CONTEXTPARTS", blk["id"], blk.get("name", ""), "error",
+                           "System context blocks must own at least one part property"))
+
+
+def check_part_layer(blk, index, issues, layer, rule):
+    """Parts of a `layer` block must be typed by blocks of that layer (or
+    external ones); PARTTYPE and unresolved typeRefs are metamodel checks."""
+    if blk.get("stereotype") != layer:
+        return
+    for part in blk.get("parts", []):
+        if part.get("typeRef") in index:
+            found = index[part["typeRef"]].get("stereotype")
+            if found not in (layer, "external"):
+                issues.append(Issue(rule, part["id"], part.get("name", ""), "error",
+                                   f"Part in {layer} block must be typed by {layer} block "
+                                   f"(found: {found})"))
+
+
+def check_logical_parts(blk, index, issues):
+    # LOGICALARCH: logical block parts must be typed by logical blocks
+    check_part_layer(blk, index, issues, "logical", "LOGICALARCH")
+
+
+def check_physical_parts(blk, index, issues):
+    # PHYSICALARCH
+    check_part_layer(blk, index, issues, "physical", "PHYSICALARCH")
+
+
+def check_port_layer(blk, index, issues, layer, rule):
+    """Ports of a `layer` block must be typed by interface blocks of that
+    layer; PROXYPORTTYPE and unresolved typeRefs are metamodel checks."""
+    if blk.get("stereotype") != layer:
+        return
+    for port in blk.get("ports", []):
+        if port.get("typeRef") in index and index[port["typeRef"]].get("stereotype") != layer:
+            issues.append(Issue(rule, port["id"], port.get("name", ""), "error",
+                               f"Port on {layer} block must be typed by {layer} interface block"))
+
+
+def check_logical_ports(blk, index, issues):
+    # LOGICALPORT
+    check_port_layer(blk, index, issues, "logical", "LOGICALPORT")
+
+
+def check_physical_ports(blk, index, issues):
+    # PHYSICALPORT
+    check_port_layer(blk, index, issues, "physical", "PHYSICALPORT")
+
+
+def check_context_part_docs(blk, index, issues):
+    # CONBLOCKDOCUMENTATION: blocks typing context parts must have docs
+    if blk.get("stereotype") != "context":
+        return
+    for part in blk.get("parts") or ():
+        if part.get("typeRef") and part["typeRef"] in index:
+            typed_blk = index[part["typeRef"]]
+            if typed_blk.get("_kind") == "Block" and not typed_blk.get("documentation", "").strip():
+                issues.append(Issue("CONBLOCKDOCUMENTATION", typed_blk["id"],
+                                   typed_blk.get("name", ""), "error",
+                                   "Block typing a context part must have documentation"))
+
+
+def check_interface_block_flow(ib, index, issues):
+    # INTBLOCKFLOW
+    if not ib.get("flowProperties") and not ib.get("ports"):
+        issues.append(Issue("INTBLOCKFLOW", ib["id"], ib.get("name", ""), "error",
+                           "Interface block must own at least one flow property or port"))
+
+
+# Cross-field rules per rule family: (rule ID, check) pairs, run in this order
+# on every top-level element of the family's model key. Where the rules share
+# an analysis of the element, the step working it out comes first under a
+# lower-case name, so a profile does not charge it to the first rule to run.
+REQUIREMENT_RULES = (
+    ("REQNAME", check_requirement_name),
+    ("REQTRACE", check_requirement_trace),
+    ("PERFORMANCEFUNCTIONREFINE", check_performance_refine),
+)
+ACTOR_RULES = (
+    ("ACTORUSECASE", check_actor_usecase),
+)
+USECASE_RULES = (
+    ("UCACTOR", check_usecase_actor),
+    ("UCTRACE", check_usecase_trace),
+)
+BLOCK_RULES = (
+    ("CONTEXTPORTS", check_context_ports),
+    ("CONTEXTPARTS", check_context_parts),
+    ("LOGICALARCH", check_logical_parts),
+    ("PHYSICALARCH", check_physical_parts),
+    ("LOGICALPORT", check_logical_ports),
+    ("PHYSICALPORT", check_physical_ports),
+    ("CONBLOCKDOCUMENTATION", check_context_part_docs),
+)
+INTERFACE_BLOCK_RULES = (
+    ("INTBLOCKFLOW", check_interface_block_flow),
+)
+INTERFACE_RULES = (
+    ("CONNECTORDIRECTION", interfaces.check_connector_direction),
+    ("LOGICALCONNFLOWS", interfaces.check_logical_connector_flows),
+    ("FLOWCONNECTOR", interfaces.check_flow_connector),
+    ("FLOWCONNECTORS", interfaces.check_flow_connectors),
+    ("CONVEYTYPE", interfaces.check_convey_type),
+)
+ACTIVITY_RULES = (
+    ("activity layout", behavior.lay_out_activity),
+    ("ACTIVITYEDGEGUARD", behavior.check_edge_guards),
+    ("GUARDSOURCE", behavior.check_guard_source),
+    ("OBJECTFLOWENDS", behavior.check_object_flow_ends),
+    ("ACTIVITYINITIAL", behavior.check_activity_initial),
+    ("ACTIVITYFINAL", behavior.check_activity_final),
+    ("ACTIVITYFINALINCOMING", behavior.check_final_incoming),
+    ("ACTIVITYEDGEMISMATCH", behavior.check_edge_mismatch),
+    ("GUARDCOVERAGE", behavior.check_decision_coverage),
+    ("ACTIVITYREACHABILITY", behavior.check_activity_reachability),
+    ("ACTIVITYDEADEND", behavior.check_activity_dead_ends),
+)
+STATE_MACHINE_RULES = (
+    ("choice layout", behavior.lay_out_choices),
+    ("TRANSITIONCHOICE", behavior.check_transition_choice),
+    ("GUARDCOVERAGE", behavior.check_choice_coverage),
+)
+
+# Model key → (rule family, its cross-field rules) for each family run on its
+# top-level elements.
+ELEMENT_RULES = {
+    "requirements": (("requirements", REQUIREMENT_RULES),),
+    "actors": (("actors", ACTOR_RULES),),
+    "useCases": (("useCases", USECASE_RULES),),
+    "blocks": (("blocks", BLOCK_RULES), ("interfaces", INTERFACE_RULES)),
+    "interfaceBlocks": (("interfaceBlocks", INTERFACE_BLOCK_RULES),),
+    "activities": (("activities", ACTIVITY_RULES),),
+    "stateMachines": (("stateMachines", STATE_MACHINE_RULES),),
+}
+
+
+def run_rules(rules, elems, index, issues):
+    """Run (rule ID, check) pairs over elements, element by element.
+
+    Every cross-field rule is called from here, so this is where a profiler
+    times each rule ID and counts the elements it visited; a new rule only
+    has to be listed in its family's table to show up in the profile.
+    """
+    if profile.active is None:
+        for elem in elems:
+            for _, check in rules:
+                check(elem, index, issues)
+        return
+    totals = defaultdict(lambda: [0.0, 0])  # rule → [seconds, elements checked]
+    clock = time.perf_counter
+    for elem in elems:
+        for rule, check in rules:
+            started = clock()
+            check(elem, index, issues)
+            total = totals[rule]
+            total[0] += clock() - started
+            total[1] += 1
+    for rule, (seconds, elements) in totals.items():
+        profile.active.record("rule", rule, seconds, elements)
 
 
 def validate_requirements(model, index, issues):
-    for req in model.get("requirements", []):
-        if not req.get("text", "").strip():
-            issues.append(Issue("REQTEXT", req["id"], req.get("name", ""), "error",
-                               "Requirement must have text"))
-        if not req.get("name"):
-            issues.append(Issue("REQNAME", req["id"], req["id"], "info",
-                               "Requirement should have a short summary name"))
-        # REQTRACE: must have trace, derive, or refine
-        has_trace = bool(req.get("traceRefs"))
-        has_derive = bool(req.get("deriveRefs"))
-        has_refine = bool(req.get("refineRefs"))
-        if not (has_trace or has_derive or has_refine):
-            issues.append(Issue("REQTRACE", req["id"], req.get("name", ""), "error",
-                               "Requirement must have at least one trace, derive, or refine relationship"))
-        # PERFORMANCEFUNCTIONREFINE
-        if req.get("kind") == "performance":
-            if not has_refine:
-                issues.append(Issue("PERFORMANCEFUNCTIONREFINE", req["id"], req.get("name", ""), "error",
-                                   "Performance requirements must refine at least one functional requirement"))
-        # Check ref validity
-        check_refs(index, req.get("traceRefs"), issues, "REF_INTEGRITY", req)
-        check_refs(index, req.get("refineRefs"), issues, "REF_INTEGRITY", req)
-        check_refs(index, req.get("deriveRefs"), issues, "REF_INTEGRITY", req)
+    run_rules(REQUIREMENT_RULES, model.get("requirements", []), index, issues)
 
 
 def validate_actors(model, index, issues):
-    for actor in model.get("actors", []):
-        if not actor.get("name"):
-            issues.append(Issue("ACTORNAME", actor["id"], "", "error", "Actor must be named"))
-        if not actor.get("documentation", "").strip():
-            issues.append(Issue("ACTORDOCUMENTATION", actor["id"], actor.get("name", ""), "error",
-                               "Actor must have documentation"))
-        # ACTORUSECASE: must have use cases or generalizations
-        if not actor.get("useCaseRefs") and not actor.get("generalizationRefs"):
-            issues.append(Issue("ACTORUSECASE", actor["id"], actor.get("name", ""), "error",
-                               "Actor must be associated with at least one use case or specialize another actor"))
-        check_refs(index, actor.get("useCaseRefs"), issues, "REF_INTEGRITY", actor)
+    run_rules(ACTOR_RULES, model.get("actors", []), index, issues)
 
 
 def validate_usecases(model, index, issues):
-    for uc in model.get("useCases", []):
-        if not uc.get("name"):
-            issues.append(Issue("USECASENAME", uc["id"], "", "error", "Use case must be named"))
-        if not uc.get("documentation", "").strip():
-            issues.append(Issue("UCDOCUMENTATION", uc["id"], uc.get("name", ""), "error",
-                               "Use case must have documentation"))
-        # UCACTOR: must have actor (unless connected via extend/include/generalization)
-        has_actors = bool(uc.get("actorRefs"))
-        has_include_from = any(
-            uc["id"] in (other.get("includeRefs") or [])
-            for other in model.get("useCases", [])
-        )
-        has_extend = bool(uc.get("extendRefs"))
-        if not has_actors and not has_include_from and not has_extend:
-            issues.append(Issue("UCACTOR", uc["id"], uc.get("name", ""), "error",
-                               "Use case must be associated with at least one actor "
-                               "(unless connected via extend/include)"))
-        # UCTRACE
-        has_trace = bool(uc.get("traceRefs"))
-        has_extend_out = bool(uc.get("extendRefs"))
-        has_include_in = any(
-            uc["id"] in (other.get("includeRefs") or [])
-            for other in model.get("useCases", [])
-        )
-        if not has_trace and not has_extend_out and not has_include_in:
-            issues.append(Issue("UCTRACE", uc["id"], uc.get("name", ""), "error",
-                               "Use case must have a trace, extend, refine, or incoming include relationship"))
-        check_refs(index, uc.get("actorRefs"), issues, "REF_INTEGRITY", uc)
-        check_refs(index, uc.get("traceRefs"), issues, "REF_INTEGRITY", uc)
-        check_refs(index, uc.get("includeRefs"), issues, "REF_INTEGRITY", uc)
+    run_rules(USECASE_RULES, model.get("useCases", []), index, issues)
 
 
 def validate_blocks(model, index, issues):
-    for blk in model.get("blocks", []):
-        if not blk.get("name"):
-            issues.append(Issue("BLOCKNAME", blk["id"], "", "error", "Block must be named"))
-
-        stereo = blk.get("stereotype")
-
-        # LOGICALPHYSICAL: can't have both (enforced by enum, but just in case)
-        # CONTEXTPORTS: context blocks may not own ports
-        if stereo == "context" and blk.get("ports"):
-            issues.append(Issue("CONTEXTPORTS", blk["id"], blk.get("name", ""), "error",
-                               "System context blocks may not own ports"))
-
-        # CONTEXTPARTS: context blocks must own at least one part
-        if stereo == "context" and not blk.get("parts"):
-            issues.append(Issue("CONTEXTPARTS", blk["id"], blk.get("name", ""), "error",
-                               "System context blocks must own at least one part property"))
-
-        # Validate parts
-        for part in blk.get("parts", []):
-            if not part.get("typeRef"):
-                issues.append(Issue("PARTTYPE", part["id"], part.get("name", ""), "error",
-                                   "Part property must be typed"))
-            elif part["typeRef"] in index:
-                part_type = index[part["typeRef"]]
-                # LOGICALARCH: logical block parts must be typed by logical blocks
-                if stereo == "logical" and part_type.get("stereotype") not in ("logical", "external"):
-                    issues.append(Issue("LOGICALARCH", part["id"], part.get("name", ""), "error",
-                                       f"Part in logical block must be typed by logical block "
-                                       f"(found: {part_type.get('stereotype')})"))
-                # PHYSICALARCH
-                if stereo == "physical" and part_type.get("stereotype") not in ("physical", "external"):
-                    issues.append(Issue("PHYSICALARCH", part["id"], part.get("name", ""), "error",
-                                       f"Part in physical block must be typed by physical block "
-                                       f"(found: {part_type.get('stereotype')})"))
-            else:
-                issues.append(Issue("REF_INTEGRITY", part["id"], part.get("name", ""),
-                                   "error", f"Unresolved typeRef: {part['typeRef']}"))
-
-        # Validate ports
-        for port in blk.get("ports", []):
-            if not port.get("typeRef"):
-                issues.append(Issue("PROXYPORTTYPE", port["id"], port.get("name", ""), "error",
-                                   "Proxy port must be typed by an interface block"))
-            elif port["typeRef"] in index:
-                port_type = index[port["typeRef"]]
-                if port_type.get("_kind") != "InterfaceBlock":
-                    issues.append(Issue("PROXYPORTTYPE", port["id"], port.get("name", ""), "error",
-                                       f"Proxy port must be typed by an interface block "
-                                       f"(found: {port_type.get('_kind')})"))
-                # LOGICALPORT
-                if stereo == "logical" and port_type.get("stereotype") != "logical":
-                    issues.append(Issue("LOGICALPORT", port["id"], port.get("name", ""), "error",
-                                       "Port on logical block must be typed by logical interface block"))
-                # PHYSICALPORT
-                if stereo == "physical" and port_type.get("stereotype") != "physical":
-                    issues.append(Issue("PHYSICALPORT", port["id"], port.get("name", ""), "error",
-                                       "Port on physical block must be typed by physical interface block"))
-            else:
-                issues.append(Issue("REF_INTEGRITY", port["id"], port.get("name", ""),
-                                   "error", f"Unresolved typeRef: {port['typeRef']}"))
-
-        # CONBLOCKDOCUMENTATION: blocks typing context parts must have docs
-        if stereo in ("context",) and blk.get("parts"):
-            for part in blk["parts"]:
-                if part.get("typeRef") and part["typeRef"] in index:
-                    typed_blk = index[part["typeRef"]]
-                    if typed_blk.get("_kind") == "Block" and not typed_blk.get("documentation", "").strip():
-                        issues.append(Issue("CONBLOCKDOCUMENTATION", typed_blk["id"],
-                                           typed_blk.get("name", ""), "error",
-                                           "Block typing a context part must have documentation"))
+    run_rules(BLOCK_RULES, model.get("blocks", []), index, issues)
 
 
 def validate_interface_blocks(model, index, issues):
-    for ib in model.get("interfaceBlocks", []):
-        if not ib.get("flowProperties") and not ib.get("ports"):
-            issues.append(Issue("INTBLOCKFLOW", ib["id"], ib.get("name", ""), "error",
-                               "Interface block must own at least one flow property or port"))
-        for fp in ib.get("flowProperties", []):
-            if fp.get("direction") not in ("out", "inout"):
-                issues.append(Issue("FLOWDIRECTION", fp["id"], fp.get("name", ""), "error",
-                                   f"Flow property direction must be 'out' or 'inout' (found: {fp.get('direction')})"))
-            if not fp.get("typeRef"):
-                issues.append(Issue("FLOWTYPE", fp["id"], fp.get("name", ""), "error",
-                                   "Flow property must be typed by a signal"))
-            elif fp["typeRef"] in index:
-                if index[fp["typeRef"]].get("_kind") != "Signal":
-                    issues.append(Issue("FLOWTYPE", fp["id"], fp.get("name", ""), "error",
-                                       "Flow property must be typed by a signal"))
-            else:
-                issues.append(Issue("REF_INTEGRITY", fp["id"], fp.get("name", ""),
-                                   "error", f"Unresolved typeRef: {fp['typeRef']}"))
-
-
-def validate_signals(model, index, issues):
-    for sig in model.get("signals", []):
-        if not sig.get("name"):
-            issues.append(Issue("SIGNALNAME", sig["id"], "", "error", "Signal must be named"))
-        if not sig.get("documentation", "").strip():
-            issues.append(Issue("SIGNALDOCUMENTATION", sig["id"], sig.get("name", ""), "error",
-                               "Signal must have documentation"))
+    run_rules(INTERFACE_BLOCK_RULES, model.get("interfaceBlocks", []), index, issues)
+
+
+def validate_interfaces(model, index, issues):
+    """Connector and item flow rules for every block. They share the index's
+    InterfaceEngine, so each signal closure, interface signature and end
+    pairing is worked out once per run rather than once per connector."""
+    run_rules(INTERFACE_RULES, model.get("blocks", []), index, issues)
+
+
+def validate_activities(model, index, issues):
+    run_rules(ACTIVITY_RULES, model.get("activities", []), index, issues)
+
+
+def validate_state_machines(model, index, issues):
+    run_rules(STATE_MACHINE_RULES, model.get("stateMachines", []), index, issues)
 
 
 def validate_uniqueness(model, index, issues):
@@ -304,66 +535,685 @@ def validate_uniqueness(model, index, issues):
             seen[eid] = key
 
 
+# ── Graph Rules ──────────────────────────────────────────────────────────────
+# Rules that need the whole graph of one relationship type rather than one
+# element at a time. Each graph is built once per run over interned IDs and
+# analysed with the iterative, linear-time algorithms in sysmlcheap.graph.
+
+# (rule, what the cycle is called, model keys holding the nodes, edge fields)
+CYCLE_RULES = [
+    ("GENERALIZATIONCYCLE", "Generalization", ("actors", "blocks", "signals"), ("generalizationRefs",)),
+    ("INCLUDECYCLE", "Include", ("useCases",), ("includeRefs",)),
+    ("EXTENDCYCLE", "Extend", ("useCases",), ("extendRefs",)),
+    ("OWNERCYCLE", "Ownership", tuple(KIND_MAP), ("ownerRef",)),
+]
+
+CYCLE_LISTED = 6  # cycle members named in each issue's message
+
+
+def check_cycles(model, index, rule, noun, keys, fields, issues):
+    with profile.span("rule", rule) as span:
+        graph = Graph.from_elements((elem for key in keys for elem in model.get(key, ())), fields)
+        span.elements = len(graph.ids)
+        for cycle in graph.cycles():
+            listed = ", ".join(cycle[:CYCLE_LISTED])
+            if len(cycle) > CYCLE_LISTED:
+                listed += f", … ({len(cycle) - CYCLE_LISTED} more)"
+            for elem_id in cycle:
+                issues.append(Issue(rule, elem_id, index[elem_id].get("name", ""), "error",
+                                   f"{noun} cycle through {len(cycle)} element(s): {listed}"))
+
+
+GRAPH_RULES = [rule for rule, _, _, _ in CYCLE_RULES] + ["STATEREACHABILITY"]
+
+
+def validate_graphs(model, index, issues, rules=GRAPH_RULES):
+    """Cycle rules per relationship type, then state reachability per machine
+    (only those in `rules`)."""
+    for rule, noun, keys, fields in CYCLE_RULES:
+        if rule in rules:
+            check_cycles(model, index, rule, noun, keys, fields, issues)
+    if "STATEREACHABILITY" in rules:
+        with profile.span("rule", "STATEREACHABILITY") as span:
+            for machine in model.get("stateMachines", ()):
+                span.elements += 1
+                check_state_reachability(machine, issues)
+
+
+# ── Rule Scheduler ───────────────────────────────────────────────────────────
+# Rule families are read-only over the model and independent of each other.
+# Each family names the model keys it walks; those families are split into
+# (key, start, stop) chunks so a large family can spread over several workers,
+# while families listed with keys=None always run as one task over the whole
+# model. Issues are merged back in family, key and chunk order, so the result
+# is identical to a sequential run whatever the scheduling.
+
+RULE_FAMILIES = [
+    # (name, validator, model keys it can be split over)
+    ("uniqueness", validate_uniqueness, None),
+    ("metamodel", validate_metamodel, tuple(KIND_MAP)),
+    ("references", validate_references, tuple(KIND_MAP)),
+    ("requirements", validate_requirements, ("requirements",)),
+    ("actors", validate_actors, ("actors",)),
+    ("useCases", validate_usecases, ("useCases",)),
+    ("blocks", validate_blocks, ("blocks",)),
+    ("interfaceBlocks", validate_interface_blocks, ("interfaceBlocks",)),
+    ("interfaces", validate_interfaces, ("blocks",)),
+    ("activities", validate_activities, ("activities",)),
+    ("stateMachines", validate_state_machines, ("stateMachines",)),
+    ("graphs", validate_graphs, None),
+]
+
+VALIDATORS = [validator for _, validator, _ in RULE_FAMILIES]
+
+MIN_CHUNK = 256  # smallest slice of a family worth shipping to a worker
+
+
+def plan_tasks(model, jobs):
+    """Split every rule family into tasks: (family position, key, start, stop)."""
+    total = sum(len(model[key]) for key in model)
+    chunk = max(MIN_CHUNK, -(-total // (jobs * 4)))
+    tasks = []
+    for position, (_, _, keys) in enumerate(RULE_FAMILIES):
+        if keys is None:
+            tasks.append((position, None, 0, 0))
+            continue
+        for key in keys:
+            size = len(model.get(key, ()))
+            for start in range(0, size, chunk):
+                tasks.append((position, key, start, min(start + chunk, size)))
+    return tasks
+
+
+class IssueLimit(Exception):
+    """Raised by BoundedIssues once it holds as many issues as allowed."""
+
+
+class BoundedIssues(list):
+    """Issue list that stops the rule filling it at `limit` issues, for --max-issues."""
+
+    def __init__(self, limit):
+        super().__init__()
+        self.limit = limit
+
+    def append(self, issue):
+        super().append(issue)
+        if len(self) >= self.limit:
+            raise IssueLimit
+
+
+def run_task(model, index, task, limit=None):
+    """Run one task and return its issues, timed under the family's name; with
+    a limit the task stops as soon as it has found that many."""
+    position, key, start, stop = task
+    name, validator, keys = RULE_FAMILIES[position]
+    if key is not None:
+        model = {key: model[key][start:stop]}
+    issues = [] if limit is None else BoundedIssues(limit)
+    with profile.span("family", name) as span:
+        try:
+            validator(model, index, issues)
+        except IssueLimit:
+            pass
+        span.elements = sum(len(model.get(k, ())) for k in (keys or model))
+        span.issues = len(issues)
+    return list(issues) if limit is not None else issues
+
+
+_snapshot = None  # (model, index) inherited by forked rule workers
+
+
+def _init_rule_worker(model, index, limit):
+    global _snapshot
+    _snapshot = (model, index, limit)
+
+
+def _run_task_in_worker(task):
+    """Process-pool entry point: the task's issues plus what it profiled, if anything."""
+    model, index, limit = _snapshot
+    if profile.active is None:
+        return run_task(model, index, task, limit), None
+    profile.active = profile.Profiler()  # not the copy forked from the parent
+    return run_task(model, index, task, limit), profile.active
+
+
+def iter_issues(model, index, jobs=1, limit=None):
+    """Yield each task's issues as soon as the task is done, in rule-family
+    order, across `jobs` processes when jobs > 1. With a limit, stops once
+    that many issues have been yielded (the last batch is cut to fit).
+
+    Workers are forked so they share the loaded model copy-on-write instead of
+    receiving a pickled copy; where fork is unavailable the rules run in this
+    process.
+    """
+    remaining = limit
+    if jobs > 1 and "fork" in multiprocessing.get_all_start_methods():
+        pool = ProcessPoolExecutor(max_workers=jobs,
+                                   mp_context=multiprocessing.get_context("fork"),
+                                   initializer=_init_rule_worker,
+                                   initargs=(model, index, limit))
+        results = pool.map(_run_task_in_worker, plan_tasks(model, jobs))
+
+        def batches():
+            for task_issues, worker_profile in results:
+                if worker_profile is not None:
+                    profile.active.merge(worker_profile)
+                yield task_issues
+    else:
+        pool = None
+
+        def batches():
+            for position in range(len(RULE_FAMILIES)):
+                yield run_task(model, index, (position, None, 0, 0), remaining)
+
+    try:
+        for task_issues in batches():
+            if remaining is not None:
+                task_issues = task_issues[:remaining]
+                remaining -= len(task_issues)
+            if profile.active is not None:
+                profile.active.count_issues(task_issues)
+            if task_issues:
+                yield task_issues
+            if remaining == 0:
+                return
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+
+def validate_model(model, index, jobs=1):
+    """Run every rule family and return all issues, in rule-family order."""
+    return [issue for task_issues in iter_issues(model, index, jobs) for issue in task_issues]
+
+
+# ── Incremental Validation ───────────────────────────────────────────────────
+
+# Rule families a full run makes of each element's checks, in their order. The
+# rest are model-wide: uniqueness, and the cycle rules of the graphs family
+# (whose STATEREACHABILITY, after the cycles, is per state machine).
+UNIT_FAMILIES = [name for name, _, keys in RULE_FAMILIES if keys is not None]
+
+
+def split_plans(plans):
+    """Each kind's plan as (its required and enum steps, its ref steps): its
+    shares of the metamodel and references families."""
+    return {kind: (plan._replace(refs=()), Plan((), (), plan.refs)) for kind, plan in plans.items()}
+
+
+def check_unit(key, elem, index, plans):
+    """Every check owned by one top-level element: metamodel plans (as split by
+    split_plans) for it and its nested elements, its cross-field rules and, for
+    a state machine, its reachability. Returns {rule family: issues} for the
+    families that found any, each as a full run would list them."""
+    found = defaultdict(list)
+    for sub in iter_unit(elem):
+        split = plans.get(sub["_kind"])
+        if split:
+            check_element(split[0], sub, index, found["metamodel"])
+            check_element(split[1], sub, index, found["references"])
+    for family, rules in ELEMENT_RULES.get(key, ()):
+        run_rules(rules, (elem,), index, found[family])
+    if key == "stateMachines":
+        check_state_reachability(elem, found["graphs"])
+    return {family: issues for family, issues in found.items() if issues}
+
+
+MISSING = object()  # tells a field that is absent from one set to None
+
+
+def changed_keys(old, new):
+    """RecordingIndex keys whose value differs between the old and new versions
+    of the edited (model key, element) units, reverse edges aside: the ID of
+    an element that appears, disappears or changes kind, and (ID, field) for
+    each field that changed on one that stays."""
+    before = {sub["id"]: sub for _, elem in old for sub in iter_unit(elem)}
+    after = {sub["id"]: sub for _, elem in new for sub in iter_unit(elem)}
+    keys = set()
+    for eid in before.keys() | after.keys():
+        was, now = before.get(eid), after.get(eid)
+        if was is None or now is None or was["_kind"] != now["_kind"]:
+            keys.add(eid)
+            continue
+        keys.update((eid, field) for field in was.keys() | now.keys()
+                    if was.get(field, MISSING) != now.get(field, MISSING))
+    return keys
+
+
+def reverse_targets(units):
+    """(field, target ID) for every reverse-indexed reference in the units."""
+    return {(field, ref_id) for _, elem in units for sub in iter_unit(elem)
+            for field in REVERSE_REFS for ref_id in iter_refs(sub, field)}
+
+
+def changed_cycle_rules(old, new):
+    """Cycle rules whose graph differs between the old and new versions of the
+    edited (model key, element) units; only those need recomputing."""
+    def inputs(units, keys, fields):
+        return Counter((elem["id"], tuple(repr(elem.get(field)) for field in fields))
+                       for key, elem in units if key in keys)
+
+    return [rule for rule, _, keys, fields in CYCLE_RULES
+            if inputs(old, keys, fields) != inputs(new, keys, fields)]
+
+
+def cycles_of(issues):
+    """A cycle rule's issues split per cycle: one cycle's issues are listed
+    together and share its message."""
+    cycles = []
+    for issue in issues:
+        if cycles and cycles[-1][0].message == issue.message:
+            cycles[-1].append(issue)
+        else:
+            cycles.append([issue])
+    return cycles
+
+
+class IncrementalValidator:
+    """Keeps the parsed model, index and per-element results resident.
+
+    Each top-level element is checked as a unit (see check_unit) through a
+    RecordingIndex, so we know which IDs, fields and reverse edges its result
+    depends on. A unit is known by where it is defined, (path, item number),
+    so every definition of a duplicated ID is checked as a cold run would.
+    When a file changes only its edited list items are reparsed, and only the
+    edited elements plus the units that read what the edit changed are
+    re-checked: a unit that merely resolved a reference to an element is left
+    alone unless that element comes, goes or changes kind.
+    """
+
+    def __init__(self, model_dir, jobs=1):
+        self.model_dir = Path(model_dir)
+        self.jobs = jobs
+        self.plans = load_plans()
+        self.unit_plans = split_plans(self.plans)
+        self.stats = {}                      # path → (mtime_ns, size) at last scan
+        self.files = {}                      # path → [(model key, element)]
+        self.parsers = {}                    # path → DocumentParser for reparsing it
+        self.units = {}                      # (path, position) → (model key, element)
+        self.id_counts = Counter()           # id → number of definitions (incl. nested)
+        self.index = ModelIndex()
+        self.results = {}                    # unit → {rule family: issues} from check_unit (non-empty only)
+        self.order = {}                      # top-level id → unit of its first definition
+        self.deps = {}                       # unit → RecordingIndex keys read while checking
+        self.dependents = defaultdict(set)   # key → units that read it
+        self.unique_issues = []
+        self.graph_issues = {}               # cycle rule → its issues
+
+    def scan(self):
+        """Return model files added, changed or removed since the last scan."""
+        current = {}
+        for yaml_file in sorted(self.model_dir.glob("*.yaml")):
+            st = yaml_file.stat()
+            current[str(yaml_file)] = (st.st_mtime_ns, st.st_size)
+        changed = sorted(p for p in current.keys() | self.stats.keys()
+                         if current.get(p) != self.stats.get(p))
+        self.stats = current
+        return changed
+
+    def model(self):
+        """The combined model dict, in the same order load_model produces."""
+        model = {key: [] for key in KIND_MAP}
+        for path in sorted(self.files):
+            for key, elem in self.files[path]:
+                model[key].append(elem)
+        return model
+
+    def full_run(self):
+        """Cold start: parse every file, build the index and check every element."""
+        self.scan()
+        paths = sorted(self.stats)
+        self.files = {path: self._units(data)
+                      for path, data in zip(paths, load_files(paths, self.jobs))}
+        self._prime(paths)
+        self._rebuild()
+        # Everything loaded so far is long-lived; keep the cyclic GC from
+        # re-traversing it on every later allocation burst.
+        gc.freeze()
+        return self.issues()
+
+    def update(self, paths, contents=None):
+        """Re-validate after the given files changed; returns how many elements were re-checked.
+
+        `contents` maps paths to already-parsed file data (an editor's unsaved
+        buffer, say), used instead of reading those files from disk.
+        """
+        contents = contents or {}
+        before = {}  # unit → (model key, element), for the edited files as they were
+        for path in paths:
+            for i, unit in enumerate(self.files.pop(path, [])):
+                before[path, i] = unit
+        for path in paths:  # after every pop, so an element moving between files is paired
+            if path in contents:
+                self.files[path] = self._units(contents[path])
+            elif os.path.exists(path):
+                self.files[path] = self._parse(path)
+        after = {(path, i): unit for path in paths
+                 for i, unit in enumerate(self.files.get(path, ()))}
+
+        # Pair each new item with the old element it leaves unchanged, if any: the
+        # very dict the parser reused, else an equal one, which then replaces it so
+        # the index keeps its object. Each old element pairs with one item only,
+        # so a pasted copy of an element is new.
+        unpaired = defaultdict(list)  # ID → old units not yet paired
+        for was, (key, elem) in before.items():
+            unpaired[elem["id"]].append(was)
+        paired = {}                   # new unit → the old unit it leaves unchanged
+        for by_identity in (True, False):
+            for unit, (key, elem) in after.items():
+                if unit in paired:
+                    continue
+                candidates = unpaired.get(elem["id"], ())
+                for j, was in enumerate(candidates):
+                    if (before[was][1] is elem) if by_identity else (before[was] == (key, elem)):
+                        paired[unit] = candidates.pop(j)
+                        self.files[unit[0]][unit[1]] = after[unit] = before[was]
+                        break
+        kept = set(paired.values())
+        old = [before[was] for was in before if was not in kept]
+        new = [after[unit] for unit in after if unit not in paired]
+
+        touched = Counter(sub["id"] for _, elem in old for sub in iter_unit(elem))
+        added = Counter(sub["id"] for _, elem in new for sub in iter_unit(elem))
+        counts = {eid: self.id_counts[eid] for eid in touched | added}
+        self.id_counts.subtract(touched)
+        self.id_counts.update(added)
+        moves = {unit: was for unit, was in paired.items() if unit != was}
+        if (any(n > 1 for n in counts.values()) or any(self.id_counts[eid] > 1 for eid in counts)
+                or any(self.id_counts[after[unit][1]["id"]] > 1 for unit in moves)):
+            # Duplicate IDs make "which definition wins" order-dependent; rebuild.
+            self._rebuild()
+            return len(self.units)
+
+        # Units keep their results across a move; the edited ones lose theirs.
+        saved = {was: self._forget(was) for was in before if was not in kept or was in moves.values()}
+        for unit, was in moves.items():
+            self._remember(unit, *saved[was])
+        for was in before:
+            del self.units[was]
+        self.units.update(after)
+        for _, elem in old:
+            self.order.pop(elem["id"], None)
+        for unit in after.keys() - paired.keys() | moves.keys():
+            self.order[after[unit][1]["id"]] = unit
+        if not old and not new:
+            return 0
+
+        dirty = changed_keys(old, new)
+        dirty.update(eid for eid, count in counts.items() if self.id_counts[eid] != count)
+        targets = reverse_targets(old) | reverse_targets(new)
+        referrers = {target: list(self.index.referrers(target[1], target[0])) for target in targets}
+        for key, elem in old:
+            for sub in iter_unit(elem):
+                self.index.remove(sub)
+        for key, elem in new:
+            for sub in iter_unit(elem):
+                self.index.add(sub)
+        dirty.update((ref_id, field, "referrers") for (field, ref_id), listed in referrers.items()
+                     if list(self.index.referrers(ref_id, field)) != listed)
+
+        recheck = {unit for unit in after if unit not in paired}
+        for dirty_key in dirty:
+            recheck |= self.dependents.get(dirty_key, set())
+        for unit in recheck:
+            self._check(unit)
+        edited = {elem["id"] for _, elem in old + new}
+        for rule in changed_cycle_rules(old, new):
+            self._recheck_cycles(rule, edited, old)
+        return len(recheck)
+
+    def issues(self):
+        """Every issue, in the order a full run over the same files lists them."""
+        issues = list(self.unique_issues)
+        units = sorted(self.results, key=self.rank)
+        for family in UNIT_FAMILIES:
+            for unit in units:
+                issues.extend(self.results[unit].get(family, ()))
+        for rule, _, _, _ in CYCLE_RULES:
+            issues.extend(self.graph_issues[rule])
+        for unit in units:
+            issues.extend(self.results[unit].get("graphs", ()))
+        return issues
+
+    def rank(self, unit):
+        """Where a full run meets a unit: by model key, then file, then position."""
+        return KEY_RANK[self.units[unit][0]], unit
+
+    def _prime(self, paths):
+        """Give each loaded file a DocumentParser that knows its items, so even
+        its first edit reparses only the items that changed."""
+        for path in paths:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    text = f.read()
+                st = os.stat(path)
+            except (OSError, UnicodeDecodeError):
+                continue
+            if (st.st_mtime_ns, st.st_size) != self.stats[path]:
+                continue  # changed since the scan: the next update parses it whole
+            data = defaultdict(list)
+            for key, elem in self.files[path]:
+                data[key].append(elem)
+            self.parsers[path] = parser = DocumentParser(positions=False)
+            parser.prime(text, data)
+
+    def _parse(self, path):
+        """Reparse an edited file; list items whose text is unchanged come back
+        as the elements already loaded."""
+        parser = self.parsers.setdefault(path, DocumentParser(positions=False))
+        with open(path, encoding="utf-8") as f:
+            data, _ = parser.parse(f.read())
+        return self._units(data)
+
+    @staticmethod
+    def _units(data):
+        units = []
+        for key, elems in data.items():
+            for elem in elems:
+                if elem.get("_kind") != KIND_MAP[key]:  # reparsed items come back tagged
+                    tag_element(elem, KIND_MAP[key])
+                units.append((key, elem))
+        return units
+
+    def _rebuild(self):
+        model = self.model()
+        self.index = build_index(model)
+        self.units, self.order = {}, {}
+        self.id_counts = Counter()
+        for path in sorted(self.files):
+            for i, (key, elem) in enumerate(self.files[path]):
+                self.units[path, i] = (key, elem)
+                self.id_counts.update(sub["id"] for sub in iter_unit(elem))
+        for unit in sorted(self.units, key=self.rank):
+            self.order.setdefault(self.units[unit][1]["id"], unit)
+        self.results, self.deps = {}, {}
+        self.dependents = defaultdict(set)
+        for unit in self.units:
+            self._check(unit)
+        self.unique_issues = []
+        validate_uniqueness(model, self.index, self.unique_issues)
+        self.graph_issues = {}
+        for rule, noun, keys, fields in CYCLE_RULES:
+            self.graph_issues[rule] = []
+            check_cycles(model, self.index, rule, noun, keys, fields, self.graph_issues[rule])
+
+    def _check(self, unit):
+        key, elem = self.units[unit]
+        self._forget(unit)
+        recorder = RecordingIndex(self.index, fields=True)
+        found = check_unit(key, elem, recorder, self.unit_plans)
+        self._remember(unit, found, recorder.reads)
+
+    def _recheck_cycles(self, rule, edited, old):
+        """Redo one cycle rule around the edited elements only.
+
+        A cycle that gains or loses an edge runs through an edited element, and
+        every member of an old one is reachable from the targets the edited
+        elements used to reference; so finding the components of the subgraph
+        reachable from both covers every cycle that can have changed. Nodes
+        are taken in model order, so members are listed as a full run would,
+        and cycles are put back in the order of their first member.
+        """
+        _, noun, keys, fields = next(spec for spec in CYCLE_RULES if spec[0] == rule)
+        units, order = self.units, self.order
+
+        def node(eid):
+            unit = order.get(eid)
+            return unit is not None and units[unit][0] in keys
+
+        def place(eid):
+            unit = order[eid]
+            return keys.index(units[unit][0]), unit
+
+        seeds = {eid for eid in edited if node(eid)}
+        for key, elem in old:
+            if key in keys:
+                seeds.update(ref_id for field in fields for ref_id in iter_refs(elem, field)
+                             if node(ref_id))
+        seen, stack = set(seeds), list(seeds)
+        while stack:
+            elem = units[order[stack.pop()]][1]
+            for field in fields:
+                for ref_id in iter_refs(elem, field):
+                    if ref_id not in seen and node(ref_id):
+                        seen.add(ref_id)
+                        stack.append(ref_id)
+
+        issues = [issue for issue in self.graph_issues[rule] if issue.element_id not in seen]
+        region = {key: [] for key in keys}
+        for eid in sorted(seen, key=place):
+            key, elem = units[order[eid]]
+            region[key].append(elem)
+        check_cycles(region, self.index, rule, noun, keys, fields, issues)
+        cycles = sorted(cycles_of(issues), key=lambda cycle: place(cycle[0].element_id))
+        self.graph_issues[rule] = [issue for cycle in cycles for issue in cycle]
+
+    def _forget(self, unit):
+        """Drop a unit's results and dependencies; returns them."""
+        found, reads = self.results.pop(unit, {}), self.deps.pop(unit, ())
+        for dep in reads:
+            self.dependents[dep].discard(unit)
+        return found, reads
+
+    def _remember(self, unit, found, reads):
+        if found:
+            self.results[unit] = found
+        self.deps[unit] = reads
+        for dep in reads:
+            self.dependents[dep].add(unit)
+
+
+def watch(model_dir, jobs=1, interval=0.5):
+    """Validate once, then re-validate incrementally whenever a model file changes."""
+    validator = IncrementalValidator(model_dir, jobs)
+    start = time.perf_counter()
+    issues = validator.full_run()
+    print(f"   Loaded {len(validator.units)} top-level elements "
+          f"in {(time.perf_counter() - start) * 1000:.0f} ms\n")
+    report(issues)
+    print(f"   {cache.stats.summary()}")
+    print("\n👀 Watching for changes (Ctrl+C to stop)...")
+    try:
+        while True:
+            time.sleep(interval)
+            changed = validator.scan()
+            if not changed:
+                continue
+            start = time.perf_counter()
+            rechecked = validator.update(changed)
+            issues = validator.issues()
+            elapsed = (time.perf_counter() - start) * 1000
+            names = ", ".join(os.path.basename(p) for p in changed)
+            print(f"\n🔁 {names} changed — re-checked {rechecked} elements in {elapsed:.1f} ms\n")
+            report(issues)
+    except KeyboardInterrupt:
+        return 0
+
+
 # ── Main ─────────────────────────────────────────────────────────────────────
 
+def report(issues, sink=None):
+    """Send issues to a sink (the console report by default) and close it;
+    returns the exit code."""
+    sink = sink or ConsoleSink()
+    sink.emit_all(issues)
+    sink.close()
+    return sink.exit_code()
+
+
 def main():
-    model_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), "..", "model")
-    model_dir = os.path.abspath(model_dir)
+    parser = argparse.ArgumentParser(description="Validate SysMLcheap YAML model files.")
+    parser.add_argument("model_dir", nargs="?",
+                        default=os.path.join(os.path.dirname(__file__), "..", "model"))
+    parser.add_argument("--watch", action="store_true",
+                        help="stay resident and re-validate incrementally when model files change")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="parse model files and run rule families across N worker processes")
+    parser.add_argument("--compact", action="store_true",
+                        help="hold the model in the compact columnar store (large models)")
+    parser.add_argument("--format", choices=SINKS, default="console",
+                        help="issue output: the console report (default), JSON Lines, SARIF 2.1.0 or JUnit XML")
+    parser.add_argument("--output", "-o", metavar="FILE",
+                        help="write issues here instead of stdout")
+    parser.add_argument("--max-issues", type=int, metavar="N",
+                        help="stop validating once N issues have been found")
+    view.add_arguments(parser)
+    profile.add_arguments(parser)
+    args = parser.parse_args()
+    model_dir = os.path.abspath(args.model_dir)
+    if args.watch and (args.status or args.context):
+        parser.error("--status / --context cannot be combined with --watch")
+    if args.watch and (args.format != "console" or args.max_issues):
+        parser.error("--watch only reports to the console")
+    if args.max_issues is not None and args.max_issues < 1:
+        parser.error("--max-issues must be at least 1")
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    # Machine-readable issues on stdout get it to themselves; progress goes to stderr.
+    chatter = sys.stderr if args.format != "console" and not args.output else sys.stdout
+    try:
+        with contextlib.redirect_stdout(chatter):
+            print(f"🔍 SysMLcheap Validator v0.1")
+            print(f"   Model directory: {model_dir}\n")
+
+            if args.watch:
+                return watch(model_dir, args.jobs)
 
-    print(f"🔍 SysMLcheap Validator v0.1")
-    print(f"   Model directory: {model_dir}\n")
+            profile.start_from_args(args)
+            model, index = load(model_dir, args.jobs, args.compact)
+            try:
+                # Only the slice is checked; its references still resolve model-wide.
+                model, _ = view.from_args(args, model, index)
+            except KeyError as e:
+                print(f"❌ {e.args[0]}")
+                return 1
+            sink = SINKS[args.format](out)
+            exit_code = run(model, index, args.jobs, sink, args.max_issues)
+            if args.output:
+                print(f"   {sink.total} issues written to {args.output}")
+            print(f"   {cache.stats.summary()}")
+            profile.finish_from_args(args)
+            return exit_code
+    finally:
+        if args.output:
+            out.close()
 
-    model = load_model(model_dir)
-    index = build_index(model)
 
-    # Count elements
+def run(model, index, jobs=1, sink=None, max_issues=None):
+    """Validate an already loaded model, streaming issues into a sink (the
+    console report by default); returns the exit code."""
     total = sum(len(v) for v in model.values())
     print(f"   Loaded {total} top-level elements across {len(model)} categories\n")
 
-    issues = []
-
-    # Run all validators
-    validate_uniqueness(model, index, issues)
-    validate_packages(model, index, issues)
-    validate_sources(model, index, issues)
-    validate_requirements(model, index, issues)
-    validate_actors(model, index, issues)
-    validate_usecases(model, index, issues)
-    validate_blocks(model, index, issues)
-    validate_interface_blocks(model, index, issues)
-    validate_signals(model, index, issues)
-
-    # Report
-    errors = [i for i in issues if i.severity == "error"]
-    warnings = [i for i in issues if i.severity == "warning"]
-    infos = [i for i in issues if i.severity == "info"]
-
-    if errors:
-        print(f"❌ ERRORS ({len(errors)}):")
-        for issue in errors:
-            print(issue)
-        print()
-
-    if warnings:
-        print(f"⚠️  WARNINGS ({len(warnings)}):")
-        for issue in warnings:
-            print(issue)
-        print()
-
-    if infos:
-        print(f"ℹ️  INFO ({len(infos)}):")
-        for issue in infos:
-            print(issue)
-        print()
-
-    # Summary
-    print("─" * 60)
-    if not issues:
-        print("✅ Model is clean! No issues found.")
-    else:
-        print(f"   {len(errors)} errors | {len(warnings)} warnings | {len(infos)} info")
-
-    return 1 if errors else 0
+    sink = sink or ConsoleSink()
+    with profile.span("phase", "validate") as span:
+        for task_issues in iter_issues(model, index, jobs, max_issues):
+            sink.emit_all(task_issues)
+        sink.truncated = max_issues is not None and sink.total >= max_issues
+        span.elements, span.issues = total, sink.total
+    with profile.span("phase", "report"):
+        sink.close()
+    return sink.exit_code()
 
 
 if __name__ == "__main__":